@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # первым, чтобы полное время включало остальные middleware
+    'shop.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,7 +59,8 @@ ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с учётом времени рендеринга в метриках запроса
+        'BACKEND': 'shop.instrumentation.InstrumentedTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,6 +90,72 @@ DATABASES = {
     }
 }
 
+# Локальная разработка и замеры без PostgreSQL: SHOP_DATABASE=sqlite
+# переключает проект на файл db.sqlite3 в корне проекта.
+
+if os.environ.get('SHOP_DATABASE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+
+# имя базы для дочерних процессов benchmark_import: импорт пишет во временную
+# тестовую базу, а не в рабочую
+if os.environ.get('SHOP_DATABASE_NAME'):
+    DATABASES['default']['NAME'] = os.environ['SHOP_DATABASE_NAME']
+
+
+# Authentication
+# Профиль пользователя загружается вместе с пользователем (см. shop.backends)
+
+AUTHENTICATION_BACKENDS = [
+    'shop.backends.ProfileModelBackend',
+]
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Кэш фрагментов строк каталога (shop.caching). В продакшене с несколькими
+# процессами стоит заменить на общий бэкенд (Redis, Memcached).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shop',
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    }
+}
+
+
+# Async-представления каталога (shop.async_views) вместо синхронных.
+# core/asgi.py включает их при запуске под ASGI-сервером.
+
+SHOP_ASYNC_VIEWS = os.environ.get('SHOP_ASYNC_VIEWS') == '1'
+
+
+# Метрики запросов (shop.instrumentation): число SQL-запросов, время БД,
+# шаблонов и ответа по каждому представлению; сводка — /internal/stats/
+# (только для сотрудников). Заголовок Server-Timing раскрывает внутренние
+# тайминги, поэтому по умолчанию включён только в режиме отладки.
+
+SHOP_METRICS_ENABLED = True
+SHOP_METRICS_SAMPLES = 1000
+SHOP_SERVER_TIMING = DEBUG
+
+
+# Аналитика остатков (shop.analytics): скорость продаж считается за последние
+# SHOP_ANALYTICS_SALES_DAYS дней; «заканчивается» — товар, которого при этой
+# скорости хватит меньше чем на SHOP_LOW_STOCK_DAYS дней. Сводка старше
+# SHOP_ANALYTICS_MAX_AGE минут помечается устаревшей; открытие страницы её не
+# обновляет — обновление ставится в очередь кнопкой «Обновить сводку» или
+# POST /api/inventory/ (выполняет run_jobs) либо командой refresh_inventory.
+
+SHOP_ANALYTICS_SALES_DAYS = 30
+SHOP_LOW_STOCK_DAYS = 14
+SHOP_ANALYTICS_MAX_AGE = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -1,6 +1,27 @@
 from django.contrib import admin
-
-from .models import Category, Manufacturer, Supplier, Product, UserProfile, Order, OrderItem
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from .bulk import apply_bulk_update
+from .forms import BulkUpdateForm
+from .models import (
+    Category,
+    Job,
+    JobStatus,
+    Manufacturer,
+    Order,
+    OrderItem,
+    Product,
+    Supplier,
+    UserProfile,
+)
+from .orders import filter_by_product, parse_id, resolve_customer_id, resolve_product_id
+from .pagination import EstimatedCountPaginator
+from .search import search_products
 
 
 @admin.register(Category)
@@ -25,7 +46,48 @@ class SupplierAdmin(admin.ModelAdmin):
 class ProductAdmin(admin.ModelAdmin):
     list_display = ("name", "category", "manufacturer", "supplier", "price", "stock_quantity", "discount_percent")
     list_filter = ("category", "supplier", "manufacturer")
-    search_fields = ("name", "description")
+    list_select_related = ("category", "manufacturer", "supplier")
+    search_fields = ("sku", "name", "description")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["bulk_update"]
+
+    def get_search_results(self, request, queryset, search_term):
+        # icontains по трём полям — полный просмотр таблицы; поиск каталога
+        # идёт по индексу (pg_trgm или таблица FTS5 с триграммами в SQLite),
+        # артикул ищется точным совпадением по уникальному индексу
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        matched = search_products(Product.objects.all(), term).values("pk")
+        return queryset.filter(Q(pk__in=matched) | Q(sku=term)), False
+
+    @admin.action(description="Изменить цену, скидку или остаток", permissions=["change"])
+    def bulk_update(self, request, queryset):
+        # «выбрать все» передаёт сюда отфильтрованный queryset списка, и
+        # изменение по поставщику целиком выполняется одним UPDATE
+        form = BulkUpdateForm(request.POST if "apply" in request.POST else None)
+        if form.is_valid():
+            try:
+                updated = apply_bulk_update(
+                    queryset, form.cleaned_data["operation"], form.cleaned_data["value"]
+                )
+            except ValidationError as exc:
+                form.add_error("value", exc)
+            else:
+                self.message_user(request, f"Изменено товаров: {updated}")
+                return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "Массовое изменение товаров",
+            "opts": self.model._meta,
+            "form": form,
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+        }
+        return TemplateResponse(request, "admin/shop/product/bulk_update.html", context)
 
 
 @admin.register(UserProfile)
@@ -38,13 +100,98 @@ class UserProfileAdmin(admin.ModelAdmin):
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 1
+    # обычный <select> выводил бы все товары каталога в каждой строке
+    autocomplete_fields = ("product",)
+
+    def get_queryset(self, request):
+        # заголовок строки (OrderItem.__str__) выводит название товара
+        return super().get_queryset(request).select_related("product")
+
+
+class OrderProductFilter(admin.SimpleListFilter):
+    # товаров слишком много для списка вариантов: значение (ID или артикул)
+    # передаётся параметром ?product=, а в боковой панели показывается выбранный товар
+    title = "Товар"
+    parameter_name = "product"
+
+    def lookups(self, request, model_admin):
+        product_id = resolve_product_id(self.value())
+        if product_id is None:
+            return []
+        product = Product.objects.filter(pk=product_id).only("name").first()
+        return [(self.value(), product.name)] if product else []
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        product_id = resolve_product_id(self.value())
+        return filter_by_product(queryset, product_id) if product_id else queryset.none()
+
+
+class OrderCustomerFilter(admin.SimpleListFilter):
+    # RelatedOnlyFieldListFilter строил список через DISTINCT по всем заказам:
+    # клиент (ID или логин) передаётся параметром ?customer=
+    title = "Клиент"
+    parameter_name = "customer"
+
+    def lookups(self, request, model_admin):
+        customer_id = resolve_customer_id(self.value())
+        if customer_id is None:
+            return []
+        customer = get_user_model().objects.filter(pk=customer_id).only("username").first()
+        return [(self.value(), customer.username)] if customer else []
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        customer_id = resolve_customer_id(self.value())
+        return queryset.filter(customer_id=customer_id) if customer_id else queryset.none()
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ("id", "customer", "created_at")
-    list_filter = ("created_at",)
+    # без date_hierarchy: список лет — DISTINCT по всей таблице заказов;
+    # фильтр по дате создания задаёт диапазоны по индексу
+    list_filter = ("created_at", OrderCustomerFilter, OrderProductFilter)
+    list_select_related = ("customer",)
+    list_per_page = 50
     search_fields = ("customer__username",)
+    search_help_text = "Номер заказа или логин клиента"
+    autocomplete_fields = ("customer",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = [OrderItemInline]
 
-
+    def get_search_results(self, request, queryset, search_term):
+        # точные совпадения по индексам вместо icontains по логину через JOIN
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        customers = get_user_model().objects.filter(username=term).values("pk")
+        condition = Q(customer__in=customers)
+        order_id = parse_id(term)
+        if order_id is not None:
+            condition |= Q(pk=order_id)
+        return queryset.filter(condition), False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_after", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("attempts", "locked_at", "finished_at", "last_error", "created_at")
+    actions = ["retry"]
+
+    @admin.action(description="Повторить выбранные задачи")
+    def retry(self, request, queryset):
+        updated = queryset.exclude(status=JobStatus.RUNNING).update(
+            status=JobStatus.PENDING, attempts=0, run_after=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"Возвращено в очередь задач: {updated}")
@@ -0,0 +1,369 @@
+"""
+Аналитика остатков: стоимость склада, товары без остатка и скорость продаж
+по категориям, поставщикам и производителям.
+
+Страница и API читают готовую сводку (InventorySummary), а не сканируют
+Product и OrderItem на каждый запрос. Сводка пересчитывается задачей
+refresh_inventory_summary (или командой refresh_inventory):
+
+* продажи за окно SHOP_ANALYTICS_SALES_DAYS сворачиваются в ProductDailySales
+  инкрементально — обрабатываются только позиции заказов, добавленные после
+  прошлого обновления, дни за пределами окна удаляются;
+* остатки считаются одним проходом по Product с группировкой по
+  (категория, поставщик, производитель), разрезы собираются в Python.
+"""
+
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Q, Sum, Value
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import (
+    AnalyticsCheckpoint,
+    Category,
+    InventorySummary,
+    Job,
+    JobStatus,
+    Manufacturer,
+    OrderItem,
+    Product,
+    ProductDailySales,
+    Supplier,
+    SummaryDimension,
+)
+
+CHECKPOINT_NAME = "inventory"
+REFRESH_JOB = "refresh_inventory_summary"
+ROLLUP_CHUNK = 100_000
+# позиции заказов моложе этого не сворачиваются: транзакция с меньшим id
+# могла ещё не зафиксироваться, и её строки были бы пропущены навсегда
+ROLLUP_LAG = timedelta(minutes=5)
+LOW_STOCK_LIMIT = 200
+PRODUCT_CHUNK = 1000
+# строк продаж на одно чтение и запись при сложении с уже свёрнутыми днями
+MERGE_BATCH = 500
+
+DIMENSIONS = {
+    SummaryDimension.CATEGORY: ("category_id", Category),
+    SummaryDimension.SUPPLIER: ("supplier_id", Supplier),
+    SummaryDimension.MANUFACTURER: ("manufacturer_id", Manufacturer),
+}
+GROUP_FIELDS = [field for field, _ in DIMENSIONS.values()]
+
+
+@dataclass
+class RefreshReport:
+    order_items: int = 0
+    summary_rows: int = 0
+    low_stock: int = 0
+    seconds: float = 0.0
+
+
+def sales_window_days() -> int:
+    return settings.SHOP_ANALYTICS_SALES_DAYS
+
+
+def _line_total():
+    return ExpressionWrapper(
+        F("price_at_order")
+        * F("quantity")
+        * (Value(100) - F("discount_percent_at_order"))
+        * Value(Decimal("0.01")),
+        output_field=DecimalField(max_digits=16, decimal_places=2),
+    )
+
+
+def _merge_sales(rows: list[dict]) -> None:
+    for start in range(0, len(rows), MERGE_BATCH):
+        _merge_sales_batch(rows[start : start + MERGE_BATCH])
+
+
+def _merge_sales_batch(rows: list[dict]) -> None:
+    # читаются только строки пар (товар, день) этой пачки — по уникальному
+    # индексу, а не все товары за каждый день диапазона
+    products_by_day = defaultdict(list)
+    for row in rows:
+        products_by_day[row["day"]].append(row["product_id"])
+    pairs = Q()
+    for day, product_ids in products_by_day.items():
+        pairs |= Q(day=day, product_id__in=product_ids)
+    existing = {
+        (product_id, day): (quantity, revenue)
+        for product_id, day, quantity, revenue in ProductDailySales.objects.filter(
+            pairs
+        ).values_list("product_id", "day", "quantity", "revenue")
+    }
+    merged = []
+    for row in rows:
+        quantity, revenue = existing.get((row["product_id"], row["day"]), (0, Decimal(0)))
+        merged.append(
+            ProductDailySales(
+                product_id=row["product_id"],
+                day=row["day"],
+                quantity=quantity + row["units"],
+                revenue=revenue + (row["revenue"] or 0),
+            )
+        )
+    ProductDailySales.objects.bulk_create(
+        merged,
+        update_conflicts=True,
+        unique_fields=["product", "day"],
+        update_fields=["quantity", "revenue"],
+    )
+
+
+def rollup_sales(
+    checkpoint: AnalyticsCheckpoint,
+    since,
+    lag: timedelta = ROLLUP_LAG,
+    chunk_size: int | None = ROLLUP_CHUNK,
+) -> int:
+    """
+    Добавляет в ProductDailySales позиции заказов с id больше
+    checkpoint.last_order_item_id. Хранятся только дни окна продаж: позиции
+    более ранних заказов пропускаются. Возвращает число учтённых позиций.
+
+    Позиции обрабатываются диапазонами id по chunk_size; каждый диапазон
+    складывается с уже свёрнутыми днями. При chunk_size=None — один проход
+    (для пустой таблицы при полном пересчёте складывать не с чем).
+    """
+    start = checkpoint.last_order_item_id
+    cutoff = timezone.now() - lag
+    last_id = OrderItem.objects.filter(id__gt=start, order__created_at__lte=cutoff).aggregate(
+        last=Max("id")
+    )["last"]
+    if last_id is None:
+        return 0
+
+    # сравнение с началом дня, а не created_at__date: на SQLite __date —
+    # функция Python, вызываемая для каждой строки
+    window_start = timezone.make_aware(datetime.combine(since, datetime.min.time()))
+    processed = 0
+    while start < last_id:
+        end = min(start + chunk_size, last_id) if chunk_size else last_id
+        rows = list(
+            OrderItem.objects.filter(id__gt=start, id__lte=end, order__created_at__gte=window_start)
+            .values("product_id", day=TruncDate("order__created_at"))
+            .annotate(items=Count("id"), units=Sum("quantity"), revenue=Sum(_line_total()))
+            .order_by()
+        )
+        processed += sum(row["items"] for row in rows)
+        _merge_sales(rows)
+        start = end
+    checkpoint.last_order_item_id = last_id
+    return processed
+
+
+def _stock_groups() -> list[dict]:
+    stock_value = ExpressionWrapper(
+        F("stock_quantity") * F("final_price"),
+        output_field=DecimalField(max_digits=18, decimal_places=2),
+    )
+    return list(
+        Product.objects.values(*GROUP_FIELDS)
+        .annotate(
+            product_count=Count("id"),
+            out_of_stock_count=Count("id", filter=Q(stock_quantity=0)),
+            total_stock=Sum("stock_quantity"),
+            stock_value=Sum(stock_value),
+        )
+        .order_by()
+    )
+
+
+def _sales_groups(since) -> list[dict]:
+    return list(
+        ProductDailySales.objects.filter(day__gte=since)
+        .values(*(f"product__{field}" for field in GROUP_FIELDS))
+        .annotate(units_sold=Sum("quantity"), revenue=Sum("revenue"))
+        .order_by()
+    )
+
+
+def _dimension_rows(since) -> list[InventorySummary]:
+    totals = {dimension: defaultdict(lambda: defaultdict(int)) for dimension in DIMENSIONS}
+    for group in _stock_groups():
+        for dimension, (field, _) in DIMENSIONS.items():
+            row = totals[dimension][group[field]]
+            row["product_count"] += group["product_count"]
+            row["out_of_stock_count"] += group["out_of_stock_count"]
+            row["stock_quantity"] += group["total_stock"] or 0
+            row["stock_value"] += group["stock_value"] or 0
+    for group in _sales_groups(since):
+        for dimension, (field, _) in DIMENSIONS.items():
+            row = totals[dimension][group[f"product__{field}"]]
+            row["units_sold"] += group["units_sold"] or 0
+            row["revenue"] += group["revenue"] or 0
+
+    rows = []
+    for dimension, (_, model) in DIMENSIONS.items():
+        names = dict(model.objects.values_list("id", "name"))
+        for object_id, values in totals[dimension].items():
+            rows.append(
+                InventorySummary(
+                    dimension=dimension,
+                    object_id=object_id,
+                    name=names.get(object_id, str(object_id)),
+                    **values,
+                )
+            )
+    return rows
+
+
+def _low_stock_rows(since, days: int) -> list[InventorySummary]:
+    """
+    Товары, которых при текущей скорости продаж хватит меньше чем на
+    SHOP_LOW_STOCK_DAYS дней (в том числе закончившиеся, но продававшиеся).
+    Рассматриваются только товары с продажами за период, поэтому Product
+    целиком не сканируется.
+    """
+    sales = {
+        product_id: (units, revenue)
+        for product_id, units, revenue in ProductDailySales.objects.filter(day__gte=since)
+        .values("product_id")
+        .annotate(units=Sum("quantity"), revenue=Sum("revenue"))
+        .order_by()
+        .values_list("product_id", "units", "revenue")
+    }
+    threshold = settings.SHOP_LOW_STOCK_DAYS
+    candidates = []
+    product_ids = list(sales)
+    for offset in range(0, len(product_ids), PRODUCT_CHUNK):
+        products = Product.objects.filter(
+            pk__in=product_ids[offset : offset + PRODUCT_CHUNK]
+        ).values_list("id", "name", "stock_quantity", "final_price")
+        for pk, name, stock, final_price in products:
+            units, revenue = sales[pk]
+            # остаток / (продано / дней) < порога, без деления
+            if units and stock * days < units * threshold:
+                cover = stock * days / units
+                candidates.append((cover, pk, name, stock, final_price, units, revenue))
+    candidates.sort()
+    return [
+        InventorySummary(
+            dimension=SummaryDimension.PRODUCT,
+            object_id=pk,
+            name=name,
+            product_count=1,
+            out_of_stock_count=int(stock == 0),
+            stock_quantity=stock,
+            stock_value=stock * final_price,
+            units_sold=units,
+            revenue=revenue,
+        )
+        for _, pk, name, stock, final_price, units, revenue in candidates[:LOW_STOCK_LIMIT]
+    ]
+
+
+def refresh_inventory_summary(full: bool = False, lag: timedelta = ROLLUP_LAG) -> RefreshReport:
+    """
+    Пересчитывает сводку. full=True сворачивает продажи заново — нужно после
+    удаления заказов, которое инкрементальное обновление не замечает.
+    """
+    started = time.perf_counter()
+    report = RefreshReport()
+    days = sales_window_days()
+    since = timezone.localdate() - timedelta(days=days - 1)
+    with transaction.atomic():
+        # select_for_update не даёт двум обработчикам свернуть одни позиции дважды
+        checkpoint, _ = AnalyticsCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+        checkpoint = AnalyticsCheckpoint.objects.select_for_update().get(pk=checkpoint.pk)
+        if full:
+            ProductDailySales.objects.all().delete()
+            checkpoint.last_order_item_id = 0
+        else:
+            ProductDailySales.objects.filter(day__lt=since).delete()
+        report.order_items = rollup_sales(
+            checkpoint, since, lag=lag, chunk_size=None if full else ROLLUP_CHUNK
+        )
+
+        rows = _dimension_rows(since)
+        low_stock = _low_stock_rows(since, days)
+        InventorySummary.objects.all().delete()
+        InventorySummary.objects.bulk_create([*rows, *low_stock], batch_size=1000)
+        report.summary_rows = len(rows)
+        report.low_stock = len(low_stock)
+
+        report.seconds = time.perf_counter() - started
+        checkpoint.refreshed_at = timezone.now()
+        checkpoint.duration = report.seconds
+        checkpoint.save()
+    return report
+
+
+def summary_is_stale(checkpoint: AnalyticsCheckpoint | None) -> bool:
+    max_age = timedelta(minutes=settings.SHOP_ANALYTICS_MAX_AGE)
+    refreshed_at = checkpoint.refreshed_at if checkpoint else None
+    return not refreshed_at or refreshed_at <= timezone.now() - max_age
+
+
+def refresh_pending() -> bool:
+    return Job.objects.filter(
+        name=REFRESH_JOB, status__in=[JobStatus.PENDING, JobStatus.RUNNING]
+    ).exists()
+
+
+def request_refresh_if_stale() -> bool:
+    """
+    Ставит обновление сводки в очередь, если она устарела и задачи ещё нет.
+    Вызывается из POST-запросов страницы и API, а не из inventory_report:
+    чтение сводки ничего не записывает.
+    """
+    checkpoint = AnalyticsCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+    if not summary_is_stale(checkpoint) or refresh_pending():
+        return False
+    enqueue(REFRESH_JOB)
+    return True
+
+
+def _row_dict(row: InventorySummary, days: int) -> dict:
+    velocity = row.units_sold / days
+    return {
+        "id": row.object_id,
+        "name": row.name,
+        "product_count": row.product_count,
+        "out_of_stock_count": row.out_of_stock_count,
+        "stock_quantity": row.stock_quantity,
+        "stock_value": row.stock_value,
+        "units_sold": row.units_sold,
+        "revenue": row.revenue,
+        "units_per_day": round(velocity, 2),
+        # на сколько дней хватит остатка; None — продаж за период не было
+        "days_of_stock": round(row.stock_quantity / velocity, 1) if velocity else None,
+    }
+
+
+def inventory_report() -> dict:
+    """
+    Сводка для страницы и API: разрезы по убыванию стоимости остатка и
+    заканчивающиеся товары. Только чтение: обновление устаревшей сводки
+    запрашивает request_refresh_if_stale.
+    """
+    checkpoint = AnalyticsCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+    stale = summary_is_stale(checkpoint)
+    days = sales_window_days()
+    sections = {dimension.value: [] for dimension in SummaryDimension}
+    rows = InventorySummary.objects.order_by("-stock_value", "name")
+    for row in rows:
+        sections[row.dimension].append(_row_dict(row, days))
+    # заканчивающиеся товары — по возрастанию запаса в днях
+    sections[SummaryDimension.PRODUCT].sort(key=lambda row: (row["days_of_stock"], row["name"]))
+    return {
+        "refreshed_at": checkpoint.refreshed_at if checkpoint else None,
+        "stale": stale,
+        "refresh_pending": stale and refresh_pending(),
+        "sales_window_days": days,
+        "low_stock_days": settings.SHOP_LOW_STOCK_DAYS,
+        "categories": sections[SummaryDimension.CATEGORY],
+        "suppliers": sections[SummaryDimension.SUPPLIER],
+        "manufacturers": sections[SummaryDimension.MANUFACTURER],
+        "low_stock": sections[SummaryDimension.PRODUCT],
+    }
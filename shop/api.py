@@ -0,0 +1,121 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import ProductFilter
+from .models import Product
+from .pagination import PRODUCT_ORDERINGS, PRODUCTS_PER_PAGE, InvalidCursor, KeysetPaginator
+from .serializers import PRODUCT_FIELDS, ProductListSerializer, parse_fields
+
+API_MAX_PAGE_SIZE = 500
+
+
+def product_ordering(key: str, queryset) -> tuple[str, ...]:
+    # без поиска нет search_rank, сортировка по релевантности невозможна
+    if key == "relevance" and "search_rank" not in queryset.query.annotations:
+        key = ""
+    return PRODUCT_ORDERINGS.get(key, PRODUCT_ORDERINGS[""])
+
+
+def parse_page_size(value: str | None) -> int:
+    if not value:
+        return PRODUCTS_PER_PAGE
+    try:
+        size = int(value)
+    except ValueError:
+        raise ValidationError({"page_size": "Ожидается целое число"})
+    return max(1, min(size, API_MAX_PAGE_SIZE))
+
+
+def product_api_queryset(fields: list[str], ordering_key: str = ""):
+    specs = [PRODUCT_FIELDS[name] for name in fields]
+    columns = {column for spec in specs for column in spec.columns}
+    related = {name for spec in specs for name in spec.related}
+    # поля сортировки нужны для курсора, даже если клиент их не запросил;
+    # search_rank — аннотация, а не колонка
+    ordering = PRODUCT_ORDERINGS.get(ordering_key, PRODUCT_ORDERINGS[""])
+    columns.update(
+        order.lstrip("-") for order in ordering + PRODUCT_ORDERINGS[""] if order != "-search_rank"
+    )
+    queryset = Product.objects.all()
+    if related:
+        queryset = queryset.select_related(*sorted(related))
+    return queryset.only(*sorted(columns))
+
+
+class ProductCursorPagination(BasePagination):
+    """
+    Курсорная пагинация API поверх KeysetPaginator, общего с HTML-каталогом.
+    Размер страницы задаётся ?page_size= (не больше API_MAX_PAGE_SIZE).
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request) -> int:
+        return parse_page_size(request.query_params.get(self.page_size_query_param))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(
+            queryset,
+            product_ordering(request.query_params.get("ordering", ""), queryset),
+            self.get_page_size(request),
+        )
+        try:
+            self.page = paginator.get_page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise NotFound("Некорректный курсор")
+        return self.page.object_list
+
+    def _link(self, cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, cursor
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self._link(self.page.next_cursor),
+                "previous": self._link(self.page.previous_cursor),
+                "results": data,
+            }
+        )
+
+
+class ProductAPIMixin:
+    serializer_class = ProductListSerializer
+    permission_classes = [AllowAny]
+
+    def get_fields(self) -> list[str]:
+        if not hasattr(self, "_fields"):
+            self._fields = parse_fields(self.request.query_params.get("fields"))
+        return self._fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_fields()
+        return context
+
+    def get_queryset(self):
+        return product_api_queryset(self.get_fields(), self.request.query_params.get("ordering", ""))
+
+
+class ProductListAPIView(ProductAPIMixin, generics.ListAPIView):
+    pagination_class = ProductCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ProductFilter
+
+
+class ProductDetailAPIView(ProductAPIMixin, generics.RetrieveAPIView):
+    pass
+
+
+product_list_api = ProductListAPIView.as_view()
+product_detail_api = ProductDetailAPIView.as_view()
@@ -6,4 +6,5 @@ class ShopConfig(AppConfig):
     name = "shop"
     verbose_name = "Канцелярские товары"
 
-
+    def ready(self):
+        from . import signals, tasks  # noqa: F401
@@ -0,0 +1,168 @@
+"""
+Async-версии представлений каталога для запуска под ASGI (uvicorn, daphne).
+
+Запросы выполняются через async ORM, поэтому во время ожидания БД event loop
+обслуживает другие запросы. Всё, что шаблон или сообщения могли бы лениво
+догрузить из БД, загружается заранее: в event loop синхронный доступ к ORM
+запрещён (SynchronousOnlyOperation).
+"""
+
+from functools import wraps
+
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.urls import replace_query_param
+
+from .api import parse_page_size, product_api_queryset, product_ordering
+from .caching import (
+    GUEST_PAGE_TIMEOUT,
+    acatalogue_state,
+    guest_page_key,
+    render_product_rows,
+)
+from .filters import ProductFilter
+from .models import Product, Supplier, UserRole
+from .pagination import PRODUCT_ORDERINGS, InvalidCursor, KeysetPaginator
+from .serializers import ProductListSerializer, parse_fields
+from .views import (
+    _filter_products,
+    _get_user_full_name,
+    _get_user_role,
+    _catalogue_state,
+    _guest_catalogue_etag,
+    _guest_catalogue_last_modified,
+    _is_shared_guest_request,
+)
+
+
+def _with_user(view):
+    # request.user — ленивый объект, который при первом обращении делает
+    # синхронный запрос; подменяем его пользователем из request.auser()
+    # (вместе с профилем, см. ProfileModelBackend.aget_user)
+    @wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _with_catalogue_state(view):
+    # condition вызывает функции ETag и Last-Modified синхронно, а в event loop
+    # синхронный доступ к ORM запрещён: состояние каталога читается заранее
+    @wraps(view)
+    async def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        request.catalogue_state = await acatalogue_state()
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+async def _paginate_products(request: HttpRequest, products, ordering: str = ""):
+    paginator = KeysetPaginator(products, PRODUCT_ORDERINGS.get(ordering, PRODUCT_ORDERINGS[""]))
+    try:
+        return await paginator.aget_page(request.GET.get("cursor"))
+    except InvalidCursor:
+        return await paginator.aget_page(None)
+
+
+@_with_user
+@_with_catalogue_state
+@condition(etag_func=_guest_catalogue_etag, last_modified_func=_guest_catalogue_last_modified)
+async def product_list_guest(request: HttpRequest) -> HttpResponse:
+    shared = _is_shared_guest_request(request)
+    if shared:
+        # LocMemCache не делает ввода-вывода, поэтому синхронные вызовы кэша
+        # здесь допустимы; для Redis/Memcached стоит перейти на cache.aget/aset
+        page_key = guest_page_key(request.get_full_path(), _catalogue_state(request).modified)
+        content = cache.get(page_key)
+        if content is not None:
+            response = HttpResponse(content)
+            patch_cache_control(response, max_age=0, must_revalidate=True)
+            return response
+
+    products = Product.objects.select_related("category", "manufacturer", "supplier")
+    page = await _paginate_products(request, products)
+    context = {
+        "products": page,
+        "product_rows": render_product_rows(page, UserRole.GUEST, _catalogue_state(request).version),
+        "role": UserRole.GUEST,
+        "user_full_name": "Гость",
+        "show_filters": False,
+    }
+    response = render(request, "shop/product_list.html", context)
+    if shared:
+        cache.set(page_key, response.content, GUEST_PAGE_TIMEOUT)
+        patch_cache_control(response, max_age=0, must_revalidate=True)
+    return response
+
+
+@_with_user
+@login_required
+async def product_list(request: HttpRequest) -> HttpResponse:
+    role = _get_user_role(request.user)
+    products = Product.objects.select_related("category", "manufacturer", "supplier")
+
+    show_filters = role in (UserRole.MANAGER, UserRole.ADMIN)
+
+    suppliers = None
+    ordering = ""
+    if show_filters:
+        suppliers = [supplier async for supplier in Supplier.objects.order_by("name")]
+        products, ordering = _filter_products(request, products)
+
+    page = await _paginate_products(request, products, ordering)
+    context = {
+        "products": page,
+        "product_rows": render_product_rows(page, role, (await acatalogue_state()).version),
+        "role": role,
+        "user_full_name": _get_user_full_name(request.user),
+        "show_filters": show_filters,
+        "suppliers": suppliers,
+    }
+    return render(request, "shop/product_list.html", context)
+
+
+async def product_list_api(request: HttpRequest) -> HttpResponse:
+    """Async-аналог shop.api.ProductListAPIView с тем же форматом ответа."""
+    if request.method != "GET":
+        return JsonResponse({"detail": f'Метод "{request.method}" не разрешён.'}, status=405)
+    try:
+        fields = parse_fields(request.GET.get("fields"))
+        page_size = parse_page_size(request.GET.get("page_size"))
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, status=400)
+
+    ordering_key = request.GET.get("ordering", "")
+    filterset = ProductFilter(request.GET, product_api_queryset(fields, ordering_key))
+    if not filterset.is_valid():
+        return JsonResponse(
+            {name: list(errors) for name, errors in filterset.errors.items()}, status=400
+        )
+    products = filterset.qs
+
+    paginator = KeysetPaginator(products, product_ordering(ordering_key, products), page_size)
+    try:
+        page = await paginator.aget_page(request.GET.get("cursor"))
+    except InvalidCursor:
+        return JsonResponse({"detail": "Некорректный курсор"}, status=404)
+
+    def link(cursor: str | None) -> str | None:
+        if cursor is None:
+            return None
+        return replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+
+    serializer = ProductListSerializer(page.object_list, many=True, context={"fields": fields})
+    return JsonResponse(
+        {
+            "next": link(page.next_cursor),
+            "previous": link(page.previous_cursor),
+            "results": serializer.data,
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
@@ -0,0 +1,273 @@
+"""
+Замеры производительности магазина на синтетических данных (shop.synthetic).
+
+Каждый замер — функция без аргументов, которую BenchmarkRunner выполняет
+несколько раундов после прогрева и сводит в статистику в духе
+pytest-benchmark: min/max/mean/median/stddev и число SQL-запросов за вызов.
+Страницы запрашиваются тестовым клиентом Django, поэтому в замер входят
+middleware, шаблоны и сессии, но не сеть.
+"""
+
+import io
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import django
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Product, Supplier, UserRole
+from .pagination import PRODUCT_ORDERINGS
+from .synthetic import SyntheticData, write_import_file
+
+BENCHMARK_GROUPS: dict[str, Callable] = {}
+
+
+class BenchmarkFailed(RuntimeError):
+    pass
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    group: str
+    rounds: int
+    queries: int
+    timings: list[float] = field(repr=False)
+
+    def as_dict(self) -> dict:
+        def ms(value: float) -> float:
+            return round(value * 1000, 3)
+
+        return {
+            "name": self.name,
+            "group": self.group,
+            "rounds": self.rounds,
+            "queries": self.queries,
+            "min_ms": ms(min(self.timings)),
+            "max_ms": ms(max(self.timings)),
+            "mean_ms": ms(statistics.fmean(self.timings)),
+            "median_ms": ms(statistics.median(self.timings)),
+            "stddev_ms": ms(statistics.stdev(self.timings)) if len(self.timings) > 1 else 0.0,
+            "ops": round(len(self.timings) / sum(self.timings), 1) if sum(self.timings) else None,
+        }
+
+
+class BenchmarkRunner:
+    def __init__(self, rounds: int = 5, warmup: int = 1):
+        self.rounds = rounds
+        self.warmup = warmup
+        self.results: list[BenchmarkResult] = []
+
+    def __call__(self, name: str, func: Callable, group: str = "", setup: Callable | None = None):
+        """
+        Замер func: прогрев, один вызов с подсчётом SQL-запросов и rounds
+        вызовов с замером времени. setup выполняется перед каждым вызовом
+        и в замер не входит (например, сброс кэша).
+        """
+        for _ in range(self.warmup):
+            if setup:
+                setup()
+            func()
+
+        if setup:
+            setup()
+        # журнал запросов ограничен по длине: заполненный, он не растёт,
+        # и CaptureQueriesContext насчитал бы ноль
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            func()
+        # следующий запрос тестового клиента очистит журнал
+        queries = len(captured)
+
+        timings = []
+        for _ in range(self.rounds):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        result = BenchmarkResult(name, group, self.rounds, queries, timings)
+        self.results.append(result)
+        return result
+
+
+@dataclass
+class BenchmarkContext:
+    data: SyntheticData
+    workdir: Path
+    import_rows: int = 1000
+    clients: dict[str, Client] = field(default_factory=dict)
+
+    def client(self, role: str) -> Client:
+        if role not in self.clients:
+            client = Client()
+            if role != UserRole.GUEST:
+                client.force_login(self.data.users[role])
+            self.clients[role] = client
+        return self.clients[role]
+
+
+def benchmark_group(name: str):
+    def register(func):
+        BENCHMARK_GROUPS[name] = func
+        return func
+
+    return register
+
+
+def page(client: Client, url: str) -> Callable:
+    def call():
+        response = client.get(url)
+        if response.status_code != 200:
+            raise BenchmarkFailed(f"{url}: HTTP {response.status_code}")
+
+    return call
+
+
+def catalogue_queries() -> dict[str, str]:
+    """Фильтры и сортировки каталога: подпись замера → строка запроса."""
+    supplier = Supplier.objects.order_by("pk").values_list("pk", flat=True).first()
+    queries = {"default": ""}
+    for key in PRODUCT_ORDERINGS:
+        # сортировка по релевантности имеет смысл только вместе с поиском
+        if key and key != "relevance":
+            queries[f"ordering={key}"] = f"ordering={key}"
+    queries.update(
+        {
+            "supplier": f"supplier={supplier}",
+            "search": "search=Товар+1",
+            "search+relevance": "search=Товар+1&ordering=relevance",
+            "price": "price_min=100&price_max=500",
+            "discounted": "discounted=1",
+            "combined": f"supplier={supplier}&search=Товар&ordering=price_desc",
+        }
+    )
+    return queries
+
+
+@benchmark_group("catalogue")
+def bench_catalogue(bench: BenchmarkRunner, context: BenchmarkContext) -> None:
+    url = reverse("shop:product_list")
+    client = context.client(UserRole.MANAGER)
+    for label, query in catalogue_queries().items():
+        bench(f"product_list[{label}]", page(client, f"{url}?{query}"), group="catalogue")
+    bench("product_list[client]", page(context.client(UserRole.CLIENT), url), group="catalogue")
+
+
+@benchmark_group("guest")
+def bench_guest(bench: BenchmarkRunner, context: BenchmarkContext) -> None:
+    call = page(context.client(UserRole.GUEST), reverse("shop:product_list_guest"))
+    # без кэша страница и строки каталога рендерятся заново
+    bench("product_list_guest[cold]", call, group="guest", setup=cache.clear)
+    bench("product_list_guest[warm]", call, group="guest")
+
+
+@benchmark_group("orders")
+def bench_orders(bench: BenchmarkRunner, context: BenchmarkContext) -> None:
+    url = reverse("shop:order_list")
+    product = Product.objects.order_by("pk").values_list("pk", flat=True).first()
+    for role in (UserRole.MANAGER, UserRole.ADMIN):
+        bench(f"order_list[{role}]", page(context.client(role), url), group="orders")
+    bench(
+        "order_list[product]",
+        page(context.client(UserRole.MANAGER), f"{url}?product={product}"),
+        group="orders",
+    )
+
+
+@benchmark_group("import")
+def bench_import(bench: BenchmarkRunner, context: BenchmarkContext) -> None:
+    path = context.workdir / f"products_{context.import_rows}.csv"
+    if not path.exists():
+        write_import_file(path, context.import_rows)
+
+    def run(upsert: bool) -> Callable:
+        def call():
+            # откат после каждого раунда: все раунды импортируют в одинаковую БД
+            with transaction.atomic():
+                call_command(
+                    "import_products",
+                    path=str(path),
+                    workers=1,
+                    upsert=upsert,
+                    skip_thumbnails=True,
+                    stdout=io.StringIO(),
+                )
+                transaction.set_rollback(True)
+
+        return call
+
+    bench(f"import_products[{context.import_rows}]", run(upsert=False), group="import")
+    bench(f"import_products[{context.import_rows},upsert]", run(upsert=True), group="import")
+
+
+@benchmark_group("admin")
+def bench_admin(bench: BenchmarkRunner, context: BenchmarkContext) -> None:
+    client = context.client(UserRole.ADMIN)
+    for model in admin.site._registry:
+        opts = model._meta
+        url = reverse(f"admin:{opts.app_label}_{opts.model_name}_changelist")
+        bench(f"admin:{opts.app_label}.{opts.model_name}", page(client, url), group="admin")
+
+
+def run_benchmarks(
+    bench: BenchmarkRunner, context: BenchmarkContext, groups: list[str] | None = None
+) -> list[BenchmarkResult]:
+    cache.clear()
+    for name in groups or BENCHMARK_GROUPS:
+        BENCHMARK_GROUPS[name](bench, context)
+    return bench.results
+
+
+def machine_info() -> dict:
+    return {
+        "python": sys.version.split()[0],
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "database": connection.vendor,
+    }
+
+
+def report(bench: BenchmarkRunner, dataset: dict) -> dict:
+    """Результаты в JSON-совместимом виде для сохранения и сравнения запусков."""
+    return {
+        "datetime": timezone.now().isoformat(),
+        "machine_info": machine_info(),
+        "dataset": dataset,
+        "options": {"rounds": bench.rounds, "warmup": bench.warmup},
+        "benchmarks": [result.as_dict() for result in bench.results],
+    }
+
+
+def compare(current: dict, previous: dict) -> list[dict]:
+    """Изменение медианы и числа запросов относительно прошлого запуска."""
+    before = {item["name"]: item for item in previous.get("benchmarks", [])}
+    rows = []
+    for item in current["benchmarks"]:
+        old = before.get(item["name"])
+        if old is None:
+            continue
+        change = (item["median_ms"] - old["median_ms"]) / old["median_ms"] if old["median_ms"] else None
+        rows.append(
+            {
+                "name": item["name"],
+                "median_ms": item["median_ms"],
+                "previous_median_ms": old["median_ms"],
+                "change_percent": round(change * 100, 1) if change is not None else None,
+                "queries": item["queries"],
+                "previous_queries": old["queries"],
+            }
+        )
+    return rows
@@ -0,0 +1,97 @@
+"""
+Массовое изменение цены, скидки и остатка у набора товаров.
+
+Набор (поставщик, категория, выделение в админке) меняется одним
+UPDATE ... SET поле = выражение над F(), без загрузки и save() каждого
+товара: на 100 тыс. товаров это один запрос, а не 100 тыс.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, Max, Min, Value
+from django.db.models.functions import Round
+
+from .caching import bump_catalogue_version
+from .models import Product
+from .validators import validate_discount_percent, validate_price, validate_stock_quantity
+
+BULK_OPERATIONS = {
+    "set_discount": "Установить скидку, %",
+    "adjust_discount": "Изменить скидку на, п. п.",
+    "change_price": "Изменить цену на, %",
+    "set_stock": "Установить остаток, шт.",
+    "adjust_stock": "Изменить остаток на, шт.",
+}
+
+CENT = Decimal("0.01")
+CONCURRENT_CHANGE_ERROR = "Товары изменились во время операции, ничего не изменено. Повторите попытку."
+
+
+def _validate_new_price(price: Decimal) -> None:
+    validate_price(price)
+    # ограничение max_digits поля: в форме его проверяет сам DecimalField
+    Product._meta.get_field("price").run_validators(price.quantize(CENT, ROUND_HALF_UP))
+
+
+def _check_bounds(queryset, field: str, new_value, validate) -> bool:
+    # новое значение монотонно по старому: достаточно проверить крайние,
+    # одним агрегатным запросом вместо проверки каждого товара
+    bounds = queryset.order_by().aggregate(low=Min(field), high=Max(field))
+    if bounds["low"] is None:
+        return False
+    validate(new_value(bounds["low"]))
+    validate(new_value(bounds["high"]))
+    return True
+
+
+def apply_bulk_update(queryset, operation: str, value) -> int:
+    """
+    Применяет операцию BULK_OPERATIONS ко всем товарам queryset и
+    возвращает число изменённых товаров.
+
+    Результат проверяется теми же правилами, что и в форме товара;
+    при нарушении выбрасывается ValidationError и ничего не меняется.
+    save() и сигналы post_save не вызываются: поисковый документ от цены,
+    скидки и остатка не зависит, а кэш каталога сбрасывается целиком.
+    """
+    queryset = queryset.order_by()
+    if operation == "set_discount":
+        field, expression = "discount_percent", Value(validate_discount_percent(value))
+    elif operation == "set_stock":
+        field, expression = "stock_quantity", Value(validate_stock_quantity(value))
+    elif operation == "adjust_discount":
+        if not _check_bounds(queryset, "discount_percent", lambda old: old + value, validate_discount_percent):
+            return 0
+        field, expression = "discount_percent", F("discount_percent") + value
+    elif operation == "adjust_stock":
+        if not _check_bounds(queryset, "stock_quantity", lambda old: old + value, validate_stock_quantity):
+            return 0
+        field, expression = "stock_quantity", F("stock_quantity") + value
+    elif operation == "change_price":
+        factor = (100 + Decimal(value)) / 100
+        if not _check_bounds(queryset, "price", lambda old: old * factor, _validate_new_price):
+            return 0
+        field = "price"
+        expression = Round(
+            F("price") * Value(factor),
+            2,
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        )
+    else:
+        raise ValueError(f"Неизвестная операция: {operation}")
+
+    try:
+        # крайние значения проверены отдельным запросом: пока он шёл, заказ мог
+        # уменьшить остаток, и UPDATE нарушит ограничение БД (остаток >= 0);
+        # точка сохранения оставляет внешнюю транзакцию рабочей
+        with transaction.atomic():
+            updated = queryset.update(**{field: expression})
+    except IntegrityError:
+        raise ValidationError(CONCURRENT_CHANGE_ERROR) from None
+    # строки каталога всех затронутых товаров устарели; сброс версии
+    # каталога — одна запись в кэш вместо записи на каждый товар
+    if updated:
+        transaction.on_commit(bump_catalogue_version)
+    return updated
@@ -0,0 +1,122 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import F, Subquery
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .models import CatalogueVersion, Product, UserRole
+
+CATALOGUE_VERSION_NAME = "catalogue"
+GUEST_PAGE_KEY = "shop:guest-page:{modified}:{query}"
+GUEST_PAGE_TIMEOUT = 60 * 60 * 24
+PRODUCT_ROW_KEY = "shop:product-row:{variant}:{pk}:{version}:{catalogue}"
+PRODUCT_ROW_TEMPLATE = "shop/includes/product_row.html"
+PRODUCT_ROW_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class CatalogueState:
+    version: int
+    modified: datetime
+
+
+# версии и отметка изменения хранятся в БД, а не в кэше: кэш у каждого
+# процесса свой, и правки из import_products или run_jobs иначе не увидели
+# бы веб-процессы
+def _catalogue_state_query():
+    last_product = Product.objects.order_by("-updated_at").values("updated_at")[:1]
+    return CatalogueVersion.objects.filter(name=CATALOGUE_VERSION_NAME).annotate(
+        products_modified=Subquery(last_product)
+    )
+
+
+def _state(catalogue: CatalogueVersion) -> CatalogueState:
+    # отметка изменения — позднейшая из отметки каталога и updated_at товаров
+    # (по индексу): изменение товара не пишет в общую строку каталога
+    products_modified = getattr(catalogue, "products_modified", None)
+    modified = max(catalogue.modified_at, products_modified or catalogue.modified_at)
+    return CatalogueState(version=catalogue.version, modified=modified)
+
+
+def catalogue_state() -> CatalogueState:
+    catalogue = _catalogue_state_query().first()
+    if catalogue is None:
+        catalogue, _ = CatalogueVersion.objects.get_or_create(name=CATALOGUE_VERSION_NAME)
+    return _state(catalogue)
+
+
+async def acatalogue_state() -> CatalogueState:
+    catalogue = await _catalogue_state_query().afirst()
+    if catalogue is None:
+        catalogue, _ = await CatalogueVersion.objects.aget_or_create(name=CATALOGUE_VERSION_NAME)
+    return _state(catalogue)
+
+
+def mark_catalogue_modified() -> None:
+    catalogue = CatalogueVersion.objects.filter(name=CATALOGUE_VERSION_NAME)
+    if not catalogue.update(modified_at=timezone.now()):
+        CatalogueVersion.objects.get_or_create(name=CATALOGUE_VERSION_NAME)
+
+
+def bump_catalogue_version() -> None:
+    catalogue = CatalogueVersion.objects.filter(name=CATALOGUE_VERSION_NAME)
+    if not catalogue.update(version=F("version") + 1, modified_at=timezone.now()):
+        CatalogueVersion.objects.get_or_create(name=CATALOGUE_VERSION_NAME, defaults={"version": 1})
+
+
+def bump_product_versions(pks) -> None:
+    # версия строки товара — его updated_at; update() сам его не меняет
+    Product.objects.filter(pk__in=list(pks)).update(updated_at=timezone.now())
+
+
+def guest_page_etag(path: str, modified: datetime) -> str:
+    digest = hashlib.blake2b(f"{modified.isoformat()}|{path}".encode(), digest_size=12)
+    return digest.hexdigest()
+
+
+def guest_page_key(path: str, modified: datetime) -> str:
+    return GUEST_PAGE_KEY.format(
+        modified=modified.timestamp(), query=hashlib.blake2b(path.encode(), digest_size=12).hexdigest()
+    )
+
+
+def row_variant(role: str) -> str:
+    # у администратора в строке есть кнопки изменения и удаления
+    return "admin" if role == UserRole.ADMIN else "default"
+
+
+def render_product_rows(products, role: str, catalogue: int | None = None) -> list[str]:
+    """
+    HTML строк таблицы товаров из кэша фрагментов.
+
+    Ключ строки включает updated_at товара и версию каталога (catalogue,
+    по умолчанию читается из БД), поэтому устаревшие строки просто
+    перестают запрашиваться и вытесняются по таймауту.
+    """
+    products = list(products)
+    variant = row_variant(role)
+    if catalogue is None:
+        catalogue = catalogue_state().version
+    keys = [
+        PRODUCT_ROW_KEY.format(
+            variant=variant, pk=product.pk, version=product.updated_at.isoformat(), catalogue=catalogue
+        )
+        for product in products
+    ]
+    cached = cache.get_many(keys)
+
+    rows, fresh = [], {}
+    for product, key in zip(products, keys):
+        row = cached.get(key)
+        if row is None:
+            row = fresh[key] = render_to_string(
+                PRODUCT_ROW_TEMPLATE, {"product": product, "role": role}
+            )
+        rows.append(mark_safe(row))
+    if fresh:
+        cache.set_many(fresh, PRODUCT_ROW_TIMEOUT)
+    return rows
@@ -0,0 +1,311 @@
+"""
+Потоковая выгрузка каталога и заказов в CSV и XLSX.
+
+Строки читаются из БД через .iterator(), а файл отдаётся частями по мере
+формирования, поэтому память не зависит от числа строк, а первые байты
+уходят клиенту сразу. XLSX собирается вручную поверх zipfile: openpyxl,
+даже в режиме write_only, пишет архив только при сохранении книги целиком.
+Выгрузка каталога использует колонки файла импорта и загружается обратно
+командой import_products.
+"""
+
+import csv
+import re
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import OrderItem, Product
+
+EXPORT_CHUNK_SIZE = 2000
+# строк в одной порции ответа: отправлять каждую строку отдельно слишком дорого
+ROWS_PER_CHUNK = 500
+IMAGE_PREFIX = "products/"
+CSV_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+ORDER_HEADERS = [
+    "Номер заказа",
+    "Дата",
+    "Клиент",
+    "Артикул",
+    "Наименование товара",
+    "Количество",
+    "Цена на момент заказа",
+    "Скидка, %",
+    "Сумма",
+]
+
+# символы, недопустимые в XML 1.0 (управляющие, кроме табуляции и переводов строки)
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+def product_rows(queryset):
+    """Строки каталога в порядке колонок файла импорта (IMPORT_HEADERS)."""
+    units = dict(Product.UNIT_CHOICES)
+    rows = queryset.values_list(
+        "sku",
+        "category__name",
+        "name",
+        "manufacturer__name",
+        "supplier__name",
+        "price",
+        "unit",
+        "stock_quantity",
+        "discount_percent",
+        "description",
+        "image",
+    )
+    for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        sku, category, name, manufacturer, supplier, price = row[:6]
+        unit, stock, discount, description, image = row[6:]
+        yield [
+            sku or "",
+            category,
+            name,
+            manufacturer,
+            supplier,
+            price,
+            units.get(unit, unit),
+            stock,
+            discount,
+            description,
+            # импорт сам добавляет каталог products/ к имени файла
+            (image or "").removeprefix(IMAGE_PREFIX),
+        ]
+
+
+def order_rows(orders):
+    """По строке на позицию заказа; orders — отфильтрованный queryset заказов."""
+    items = (
+        OrderItem.objects.filter(order__in=orders.order_by().values("pk"))
+        .order_by("-order__created_at", "-order_id", "id")
+        .values_list(
+            "order_id",
+            "order__created_at",
+            "order__customer__username",
+            "product__sku",
+            "product__name",
+            "quantity",
+            "price_at_order",
+            "discount_percent_at_order",
+        )
+    )
+    # часовой пояс берётся один раз: timezone.localtime на каждую строку заметно дороже
+    tz = timezone.get_current_timezone()
+    for row in items.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        order_id, created_at, customer, sku, name, quantity, price, discount = row
+        total = (price * quantity * (100 - discount) / 100).quantize(Decimal("0.01"))
+        yield [
+            order_id,
+            created_at.astimezone(tz).replace(tzinfo=None),
+            customer,
+            sku or "",
+            name,
+            quantity,
+            price,
+            discount,
+            total,
+        ]
+
+
+class _Buffer:
+    """Приёмник для csv.writer и zipfile: накопленное забирается порциями."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data) -> int:
+        self.parts.append(data.encode() if isinstance(data, str) else bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def _chunked(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= ROWS_PER_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_value(value):
+    return value.strftime(CSV_DATETIME_FORMAT) if isinstance(value, datetime) else value
+
+
+def stream_csv(headers: list[str], rows):
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    # BOM: без него Excel открывает UTF-8 как однобайтовую кодировку
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    yield buffer.drain()
+    for chunk in _chunked(rows):
+        writer.writerows([_csv_value(value) for value in row] for row in chunk)
+        yield buffer.drain()
+
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    "</Types>"
+)
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name={name} sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    "</Relationships>"
+)
+# стиль 1 — дата и время (встроенный формат 22)
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="22" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    "</cellXfs>"
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    "</styleSheet>"
+)
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = "</sheetData></worksheet>"
+
+
+def _column_letter(index: int) -> str:
+    # 0 -> A, 25 -> Z, 26 -> AA
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref: str, value) -> str:
+    # у каждой ячейки явный адрес r: без него пропущенная пустая ячейка
+    # сдвигает все следующие значения строки на колонку влево
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{ref}" t="n"><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        serial = (value - EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}" s="1"><v>{serial:.6f}</v></c>'
+    text = escape(ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number: int, row, columns: list[str]) -> str:
+    cells = "".join(_xlsx_cell(f"{column}{number}", value) for column, value in zip(columns, row))
+    return f'<row r="{number}">{cells}</row>'
+
+
+def stream_xlsx(headers: list[str], rows, sheet_name: str):
+    """
+    Книга из одного листа; строки пишутся в архив сразу, архив отдаётся
+    порциями (zipfile умеет писать в поток без seek, с дескрипторами данных).
+    """
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        archive.writestr("_rels/.rels", ROOT_RELS_XML)
+        archive.writestr("xl/workbook.xml", WORKBOOK_XML.format(name=quoteattr(sheet_name)))
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS_XML)
+        archive.writestr("xl/styles.xml", STYLES_XML)
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            columns = [_column_letter(index) for index in range(len(headers))]
+            sheet.write((SHEET_START + _xlsx_row(1, headers, columns)).encode())
+            yield buffer.drain()
+            number = 1
+            for chunk in _chunked(rows):
+                parts = []
+                for row in chunk:
+                    number += 1
+                    parts.append(_xlsx_row(number, row, columns))
+                sheet.write("".join(parts).encode())
+                yield buffer.drain()
+            sheet.write(SHEET_END.encode())
+    yield buffer.drain()
+
+
+async def _aiterate(chunks):
+    # под ASGI синхронный итератор StreamingHttpResponse был бы прочитан
+    # целиком в память; порции берутся по одной в потоке для работы с БД
+    iterator = iter(chunks)
+    while True:
+        chunk = await sync_to_async(next)(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def export_response(request, fmt: str, filename: str, headers: list[str], rows, sheet_name: str):
+    if fmt == "xlsx":
+        chunks = stream_xlsx(headers, rows, sheet_name)
+    else:
+        fmt = "csv"
+        chunks = stream_csv(headers, rows)
+    if isinstance(request, ASGIRequest):
+        chunks = _aiterate(chunks)
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[fmt])
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M")
+    response["Content-Disposition"] = f'attachment; filename="{filename}-{stamp}.{fmt}"'
+    return response
@@ -0,0 +1,38 @@
+import django_filters
+
+from .models import Product
+from .pagination import PRODUCT_ORDERINGS
+from .search import search_products
+
+
+class ProductFilter(django_filters.FilterSet):
+    supplier = django_filters.NumberFilter(field_name="supplier_id")
+    category = django_filters.NumberFilter(field_name="category_id")
+    manufacturer = django_filters.NumberFilter(field_name="manufacturer_id")
+    search = django_filters.CharFilter(method="filter_search")
+    price_min = django_filters.NumberFilter(field_name="final_price", lookup_expr="gte")
+    price_max = django_filters.NumberFilter(field_name="final_price", lookup_expr="lte")
+    discounted = django_filters.BooleanFilter(method="filter_discounted")
+    # сортировку применяет пагинация (ключ курсора зависит от неё),
+    # здесь значение только проверяется
+    ordering = django_filters.ChoiceFilter(
+        choices=[(key, key) for key in PRODUCT_ORDERINGS if key],
+        method="filter_ordering",
+    )
+
+    class Meta:
+        model = Product
+        fields = []
+
+    def filter_search(self, queryset, name, value):
+        return search_products(queryset, value)
+
+    def filter_discounted(self, queryset, name, value):
+        if value is None:
+            return queryset
+        if value:
+            return queryset.filter(discount_percent__gt=0)
+        return queryset.filter(discount_percent=0)
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset
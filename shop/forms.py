@@ -1,7 +1,9 @@
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm
 
-from .models import Product
+from .bulk import BULK_OPERATIONS
+from .models import Category, Manufacturer, Product, Supplier
+from .validators import validate_discount_percent, validate_price, validate_stock_quantity
 
 
 class LoginForm(AuthenticationForm):
@@ -20,6 +22,7 @@ class ProductForm(forms.ModelForm):
         model = Product
         fields = [
             "image",
+            "sku",
             "name",
             "category",
             "description",
@@ -31,6 +34,7 @@ class ProductForm(forms.ModelForm):
             "discount_percent",
         ]
         widgets = {
+            "sku": forms.TextInput(attrs={"class": "form-control"}),
             "name": forms.TextInput(attrs={"class": "form-control"}),
             "category": forms.Select(attrs={"class": "form-select"}),
             "description": forms.Textarea(attrs={"class": "form-control", "rows": 3}),
@@ -43,23 +47,71 @@ class ProductForm(forms.ModelForm):
         }
 
     def clean_price(self):
-        price = self.cleaned_data["price"]
-        if price < 0:
-            raise forms.ValidationError("Цена не может быть отрицательной.")
-        return price
+        return validate_price(self.cleaned_data["price"])
 
     def clean_stock_quantity(self):
-        quantity = self.cleaned_data["stock_quantity"]
-        if quantity < 0:
-            raise forms.ValidationError("Количество на складе не может быть отрицательным.")
-        return quantity
+        return validate_stock_quantity(self.cleaned_data["stock_quantity"])
 
     def clean_discount_percent(self):
-        discount = self.cleaned_data["discount_percent"]
-        if discount < 0:
-            raise forms.ValidationError("Скидка не может быть отрицательной.")
-        if discount > 100:
-            raise forms.ValidationError("Скидка не может превышать 100%.")
-        return discount
+        return validate_discount_percent(self.cleaned_data["discount_percent"])
 
 
+class BulkUpdateForm(forms.Form):
+    """Операция над набором товаров; набор задаёт админка или BulkProductUpdateForm."""
+
+    operation = forms.ChoiceField(
+        label="Операция",
+        choices=BULK_OPERATIONS.items(),
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    value = forms.DecimalField(
+        label="Значение",
+        max_digits=10,
+        decimal_places=2,
+        help_text="Для изменения на величину — со знаком: -5 уменьшает, 5 увеличивает.",
+        widget=forms.NumberInput(attrs={"class": "form-control", "step": "0.01"}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        operation, value = cleaned_data.get("operation"), cleaned_data.get("value")
+        if operation is None or value is None:
+            return cleaned_data
+        if operation != "change_price":
+            if value != value.to_integral_value():
+                self.add_error("value", "Значение должно быть целым числом.")
+                return cleaned_data
+            cleaned_data["value"] = int(value)
+        return cleaned_data
+
+
+class BulkProductUpdateForm(BulkUpdateForm):
+    supplier = forms.ModelChoiceField(
+        label="Поставщик",
+        queryset=Supplier.objects.order_by("name"),
+        required=False,
+        empty_label="Все поставщики",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    category = forms.ModelChoiceField(
+        label="Категория",
+        queryset=Category.objects.order_by("name"),
+        required=False,
+        empty_label="Все категории",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    manufacturer = forms.ModelChoiceField(
+        label="Производитель",
+        queryset=Manufacturer.objects.order_by("name"),
+        required=False,
+        empty_label="Все производители",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    field_order = ["supplier", "category", "manufacturer", "operation", "value"]
+
+    def filter_products(self, queryset):
+        for name in ("supplier", "category", "manufacturer"):
+            if self.cleaned_data.get(name):
+                queryset = queryset.filter(**{name: self.cleaned_data[name]})
+        return queryset
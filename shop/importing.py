@@ -0,0 +1,582 @@
+import csv
+import glob
+import multiprocessing
+from contextlib import contextmanager
+from dataclasses import astuple, dataclass
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Iterator
+from zipfile import BadZipFile
+
+import django
+from django.db import connections, transaction
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from .caching import bump_catalogue_version
+from .models import Category, Manufacturer, Product, Supplier
+from .search import index_search_documents, product_search_document
+
+COLUMN_HEADERS = {
+    "category": "Категория товара",
+    "name": "Наименование товара",
+    "manufacturer": "Производитель",
+    "supplier": "Поставщик",
+    "price": "Цена",
+    "unit": "Единица измерения",
+    "stock": "Кол-во на складе",
+    "discount": "Действующая скидка",
+    "description": "Описание товара",
+    "image": "Фото",
+}
+
+# необязательные колонки: в старых выгрузках их может не быть
+OPTIONAL_COLUMN_HEADERS = {
+    "sku": "Артикул",
+}
+
+# порядок колонок в файлах, которые создаёт сам проект (выгрузка каталога,
+# синтетические файлы для замеров)
+IMPORT_HEADERS = [OPTIONAL_COLUMN_HEADERS["sku"], *COLUMN_HEADERS.values()]
+
+UPSERT_FIELDS = [
+    "name",
+    "category",
+    "manufacturer",
+    "supplier",
+    "description",
+    "price",
+    "unit",
+    "stock_quantity",
+    "discount_percent",
+    "image",
+    "sku",
+    "search_document",
+]
+
+# поля, по которым строка файла сравнивается с товаром в БД: сравниваются
+# текущие значения, поэтому правки из формы, админки, массовых операций и
+# списание остатков заказами тоже считаются отличием от файла
+COMPARED_FIELDS = [
+    "name",
+    "category_id",
+    "manufacturer_id",
+    "supplier_id",
+    "description",
+    "price",
+    "unit",
+    "stock_quantity",
+    "discount_percent",
+    "sku",
+]
+
+UNIT_MAP = {
+    "шт": "pcs",
+    "шт.": "pcs",
+    "уп": "pack",
+    "уп.": "pack",
+    "набор": "set",
+}
+
+DEFAULT_CATEGORY = "Без категории"
+DEFAULT_MANUFACTURER = "Без производителя"
+DEFAULT_SUPPLIER = "Без поставщика"
+
+
+SOURCE_SUFFIXES = (".xlsx", ".xlsm", ".csv", ".tsv", ".txt")
+
+# строк в пачке и пачек в очереди одного файла при разборе в нескольких процессах
+SOURCE_BATCH_SIZE = 1000
+SOURCE_QUEUE_BATCHES = 8
+
+CSV_DELIMITERS = {
+    ".csv": ",",
+    ".tsv": "\t",
+    ".txt": "\t",
+}
+
+
+class HeaderNotFound(LookupError):
+    pass
+
+
+class SheetNotFound(LookupError):
+    def __init__(self, header: str, available: dict):
+        # оба аргумента в args: исключение должно переживать pickle из процесса-воркера
+        super().__init__(header, available)
+        self.header = header
+        self.available = available
+
+
+class ImportSourceError(ValueError):
+    pass
+
+
+@dataclass
+class SourceTable:
+    title: str
+    headers: list
+    rows: Iterator[tuple]
+
+
+@dataclass(frozen=True)
+class ProductRow:
+    name: str
+    category: str
+    manufacturer: str
+    supplier: str
+    price: Decimal
+    unit: str
+    stock_quantity: int
+    discount_percent: int
+    description: str
+    image: str | None
+    sku: str | None = None
+
+
+def normalize_header(value) -> str:
+    return str(value).strip().lower()
+
+
+def get_index(headers, name: str) -> int:
+    normalized_target = normalize_header(name)
+    for idx, header in enumerate(headers):
+        if header is None:
+            continue
+        if normalize_header(header) == normalized_target:
+            return idx
+    raise HeaderNotFound(name)
+
+
+def column_indexes(headers) -> dict[str, int]:
+    indexes = {key: get_index(headers, header) for key, header in COLUMN_HEADERS.items()}
+    for key, header in OPTIONAL_COLUMN_HEADERS.items():
+        try:
+            indexes[key] = get_index(headers, header)
+        except HeaderNotFound:
+            pass
+    return indexes
+
+
+def _text(value, default: str = "") -> str:
+    return str(value).strip() if value is not None else default
+
+
+def _decimal(value) -> Decimal:
+    if value is None or value == "":
+        return Decimal("0")
+    try:
+        return Decimal(str(value).strip().replace(",", ".")).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return Decimal("0")
+
+
+def _int(value) -> int:
+    if value is None or value == "":
+        return 0
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    # в CSV числа приходят строками, в том числе «15.0»
+    try:
+        return int(Decimal(str(value).strip().replace(",", ".")))
+    except (InvalidOperation, ValueError):
+        return 0
+
+
+def _padded(rows, width: int) -> Iterator[tuple]:
+    for row in rows:
+        if len(row) < width:
+            row = tuple(row) + (None,) * (width - len(row))
+        yield row
+
+
+def _is_header_row(headers, target: str) -> bool:
+    normalized_target = normalize_header(target)
+    return any(
+        header is not None and normalize_header(header) == normalized_target for header in headers
+    )
+
+
+@contextmanager
+def open_workbook_table(path: Path, target_header: str):
+    # read_only: строки читаются потоково из XML листа, память не зависит от размера файла
+    wb = load_workbook(filename=str(path), read_only=True, data_only=True)
+    try:
+        available = {}
+        for ws in wb.worksheets:
+            first_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            headers = list(first_row)
+            if _is_header_row(headers, target_header):
+                rows = ws.iter_rows(min_row=2, values_only=True)
+                yield SourceTable(ws.title, headers, _padded(rows, len(headers)))
+                return
+            available[ws.title] = headers
+        raise SheetNotFound(target_header, available)
+    finally:
+        wb.close()
+
+
+@contextmanager
+def open_csv_table(path: Path, target_header: str):
+    delimiter = CSV_DELIMITERS.get(path.suffix.lower(), ",")
+    with path.open(newline="", encoding="utf-8-sig") as handle:
+        reader = csv.reader(handle, delimiter=delimiter)
+        headers = next(reader, [])
+        if not _is_header_row(headers, target_header):
+            raise SheetNotFound(target_header, {path.name: headers})
+        yield SourceTable(path.name, headers, _padded((tuple(row) for row in reader), len(headers)))
+
+
+def open_table(path: Path, target_header: str = COLUMN_HEADERS["category"]):
+    if path.suffix.lower() not in SOURCE_SUFFIXES:
+        raise ImportSourceError(
+            f"Неподдерживаемый формат файла {path.name!r}: ожидается {', '.join(SOURCE_SUFFIXES)}"
+        )
+    if path.suffix.lower() in CSV_DELIMITERS:
+        return open_csv_table(path, target_header)
+    return open_workbook_table(path, target_header)
+
+
+def iter_product_rows(table: SourceTable, indexes: dict[str, int]) -> Iterator[ProductRow]:
+    for row in table.rows:
+        product_row = parse_row(row, indexes)
+        if product_row is not None:
+            yield product_row
+
+
+def resolve_source_paths(spec: str) -> list[Path]:
+    # порядок файлов фиксирован, чтобы результат импорта не зависел от ФС и воркеров
+    path = Path(spec)
+    if path.is_dir():
+        candidates = path.iterdir()
+    elif path.exists():
+        return [path]
+    else:
+        candidates = (Path(match) for match in glob.glob(spec))
+    return sorted(
+        candidate
+        for candidate in candidates
+        if candidate.is_file()
+        and candidate.suffix.lower() in SOURCE_SUFFIXES
+        and not candidate.name.startswith("~$")
+    )
+
+
+@contextmanager
+def read_source(path: Path):
+    try:
+        with open_table(path) as table:
+            try:
+                indexes = column_indexes(table.headers)
+            except HeaderNotFound as exc:
+                available = ", ".join(str(h) for h in table.headers)
+                raise ImportSourceError(
+                    f"В файле {path.name!r} на листе {table.title!r} нет колонки с заголовком: "
+                    f"{exc.args[0]!r}. Найденные заголовки: {available}"
+                ) from exc
+            yield iter_product_rows(table, indexes)
+    except SheetNotFound as exc:
+        raise ImportSourceError(
+            f"В файле {path.name!r} не удалось найти лист с колонкой заголовка {exc.header!r}. "
+            f"Найденные заголовки по листам: {exc.available}"
+        ) from exc
+    except (InvalidFileException, BadZipFile, UnicodeDecodeError) as exc:
+        raise ImportSourceError(f"Не удалось прочитать файл {path.name!r}: {exc}") from exc
+
+
+def close_idle_connections() -> None:
+    """
+    Закрывает соединения с БД перед запуском дочерних процессов, чтобы те
+    их не унаследовали. Соединение внутри transaction.atomic остаётся
+    открытым: закрытие пометило бы транзакцию к откату и сбросило бы
+    on_commit. Дочерние процессы к БД не обращаются и завершаются через
+    os._exit, поэтому унаследованное соединение они не закрывают.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def parse_source_into(path: str, queue, batch_size: int) -> None:
+    """
+    Разбирает файл в процессе-воркере и передаёт строки пачками через
+    ограниченную очередь: пока родитель не заберёт пачку, воркер ждёт,
+    поэтому файл целиком в памяти не накапливается.
+    """
+    django.setup()
+    try:
+        with read_source(Path(path)) as rows:
+            batch = []
+            for row in rows:
+                # кортеж вместо dataclass: вдвое меньше работы для pickle
+                batch.append(astuple(row))
+                if len(batch) >= batch_size:
+                    queue.put(batch)
+                    batch = []
+            if batch:
+                queue.put(batch)
+    except Exception as exc:
+        # исключение передаётся родителю через ту же очередь
+        queue.put(exc)
+    queue.put(None)
+
+
+def iter_source_rows(paths: list[Path], workers: int = 1) -> Iterator[ProductRow]:
+    """
+    Строки всех файлов в порядке ``paths``.
+
+    При ``workers > 1`` файлы разбираются параллельно в отдельных процессах
+    (openpyxl упирается в CPU), а строки отдаются в исходном порядке файлов,
+    поэтому запись в БД остаётся однопоточной и детерминированной. Одновременно
+    разбирается не больше ``workers`` файлов — текущий и следующие за ним, у
+    каждого очередь на SOURCE_QUEUE_BATCHES пачек, так что в памяти родителя
+    не больше workers × SOURCE_QUEUE_BATCHES × SOURCE_BATCH_SIZE строк.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            with read_source(path) as rows:
+                yield from rows
+        return
+
+    close_idle_connections()
+    context = multiprocessing.get_context()
+    started: list[tuple] = []
+
+    def start(path: Path) -> None:
+        queue = context.Queue(maxsize=SOURCE_QUEUE_BATCHES)
+        process = context.Process(
+            target=parse_source_into, args=(str(path), queue, SOURCE_BATCH_SIZE), daemon=True
+        )
+        process.start()
+        started.append((process, queue))
+
+    try:
+        for path in paths[:workers]:
+            start(path)
+        for index in range(len(paths)):
+            process, queue = started[index]
+            while (batch := queue.get()) is not None:
+                if isinstance(batch, Exception):
+                    raise batch
+                for values in batch:
+                    yield ProductRow(*values)
+            process.join()
+            if index + workers < len(paths):
+                start(paths[index + workers])
+    finally:
+        # при ошибке или недочитанном итераторе воркеры могут ждать места в очереди
+        for process, queue in started:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+            queue.close()
+
+
+def parse_row(row, indexes: dict[str, int]) -> ProductRow | None:
+    if not row[indexes["name"]]:
+        return None
+
+    image_value = row[indexes["image"]]
+    sku_index = indexes.get("sku")
+    return ProductRow(
+        name=_text(row[indexes["name"]]),
+        category=_text(row[indexes["category"]]) or DEFAULT_CATEGORY,
+        manufacturer=_text(row[indexes["manufacturer"]]) or DEFAULT_MANUFACTURER,
+        supplier=_text(row[indexes["supplier"]]) or DEFAULT_SUPPLIER,
+        price=_decimal(row[indexes["price"]]),
+        unit=UNIT_MAP.get(_text(row[indexes["unit"]]).lower(), "pcs"),
+        stock_quantity=_int(row[indexes["stock"]]),
+        discount_percent=_int(row[indexes["discount"]]),
+        description=_text(row[indexes["description"]]),
+        image=f"products/{_text(image_value)}" if image_value else None,
+        sku=(_text(row[sku_index]) or None) if sku_index is not None else None,
+    )
+
+
+class ReferenceResolver:
+    """
+    Справочник «название → объект» для Category/Manufacturer/Supplier.
+
+    Существующие записи читаются одним запросом, недостающие создаются
+    одним bulk_create, поэтому число запросов не зависит от числа строк.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.by_name: dict[str, object] = {}
+
+    def resolve(self, names) -> None:
+        missing = {name for name in names if name not in self.by_name}
+        if not missing:
+            return
+        for obj in self.model.objects.filter(name__in=missing):
+            self.by_name[obj.name] = obj
+        to_create = missing - self.by_name.keys()
+        if to_create:
+            # ignore_conflicts: параллельный импорт мог успеть создать запись
+            self.model.objects.bulk_create(
+                [self.model(name=name) for name in sorted(to_create)],
+                ignore_conflicts=True,
+            )
+            for obj in self.model.objects.filter(name__in=to_create):
+                self.by_name[obj.name] = obj
+
+    def __getitem__(self, name: str):
+        return self.by_name[name]
+
+
+class ProductImporter:
+    """
+    Пакетная запись строк импорта.
+
+    В режиме ``upsert`` строка сопоставляется с существующим товаром по
+    артикулу, а если артикула нет в файле или в БД — по (наименование,
+    производитель, поставщик) среди товаров без артикула. Товар обновляется,
+    только если значения в файле отличаются от текущих.
+    """
+
+    def __init__(self, batch_size: int = 1000, upsert: bool = False):
+        self.batch_size = batch_size
+        self.upsert = upsert
+        self.categories = ReferenceResolver(Category)
+        self.manufacturers = ReferenceResolver(Manufacturer)
+        self.suppliers = ReferenceResolver(Supplier)
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+
+    def resolve_references(self, rows: list[ProductRow]) -> None:
+        self.categories.resolve({row.category for row in rows})
+        self.manufacturers.resolve({row.manufacturer for row in rows})
+        self.suppliers.resolve({row.supplier for row in rows})
+
+    def build_product(self, row: ProductRow) -> Product:
+        product = Product(
+            name=row.name,
+            category=self.categories[row.category],
+            description=row.description,
+            manufacturer=self.manufacturers[row.manufacturer],
+            supplier=self.suppliers[row.supplier],
+            price=row.price,
+            unit=row.unit,
+            stock_quantity=row.stock_quantity,
+            discount_percent=row.discount_percent,
+            image=row.image,
+            sku=row.sku,
+        )
+        # bulk_create не вызывает Product.save()
+        product.search_document = product_search_document(product)
+        return product
+
+    def natural_key(self, row: ProductRow):
+        if row.sku:
+            return row.sku
+        return self.name_key(row)
+
+    def name_key(self, row: ProductRow) -> tuple:
+        return (row.name, self.manufacturers[row.manufacturer].pk, self.suppliers[row.supplier].pk)
+
+    def find_by_names(self, rows: list[ProductRow], fields) -> dict:
+        names = {row.name for row in rows}
+        products = Product.objects.filter(name__in=names, sku__isnull=True).only(*fields).order_by("pk")
+        found = {}
+        for product in products:
+            key = (product.name, product.manufacturer_id, product.supplier_id)
+            # дубликаты от прежних импортов: обновляем самый старый товар
+            found.setdefault(key, product)
+        return found
+
+    def find_existing(self, rows: list[ProductRow]) -> dict:
+        existing = {}
+        fields = ("id", *COMPARED_FIELDS, "image", "image_variants")
+        skus = [row.sku for row in rows if row.sku]
+        if skus:
+            for product in Product.objects.filter(sku__in=skus).only(*fields):
+                existing[product.sku] = product
+        # строка без артикула, а также строка с новым артикулом, которого
+        # ещё нет в БД: товар мог быть загружен из файла без колонки «Артикул»
+        pending = [row for row in rows if not row.sku or row.sku not in existing]
+        if pending:
+            by_name = self.find_by_names(pending, fields)
+            claimed = set()
+            for row in pending:
+                product = by_name.get(self.name_key(row))
+                if product is not None and product.pk not in claimed:
+                    claimed.add(product.pk)
+                    existing[self.natural_key(row)] = product
+        return existing
+
+    @staticmethod
+    def is_changed(product: Product, fresh: Product) -> bool:
+        if (product.image.name or "") != (fresh.image.name or ""):
+            return True
+        return any(getattr(product, field) != getattr(fresh, field) for field in COMPARED_FIELDS)
+
+    def apply_row(self, product: Product, fresh: Product) -> None:
+        if product.image.name != fresh.image.name:
+            # копии старого фото больше не подходят, их пересоздаст generate_variants
+            product.image_variants = {}
+        for field in UPSERT_FIELDS:
+            setattr(product, field, getattr(fresh, field))
+
+    def upsert_batch(self, rows: list[ProductRow]) -> None:
+        # повторный ключ внутри пакета: побеждает последняя строка
+        by_key = {self.natural_key(row): row for row in rows}
+        existing = self.find_existing(list(by_key.values()))
+
+        to_create, to_update = [], []
+        for key, row in by_key.items():
+            product = existing.get(key)
+            fresh = self.build_product(row)
+            if product is None:
+                to_create.append(fresh)
+            elif self.is_changed(product, fresh):
+                self.apply_row(product, fresh)
+                to_update.append(product)
+            else:
+                self.unchanged += 1
+
+        if to_create:
+            Product.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update:
+            Product.objects.bulk_update(
+                to_update, [*UPSERT_FIELDS, "image_variants"], batch_size=self.batch_size
+            )
+        self.index_products([*to_create, *to_update])
+        self.created += len(to_create)
+        self.updated += len(to_update)
+
+    @staticmethod
+    def index_products(products: list[Product]) -> None:
+        # bulk-операции не посылают сигналов post_save, индекс поиска пишем сами
+        index_search_documents((product.pk, product.search_document) for product in products)
+
+    def write_batch(self, rows: list[ProductRow]) -> None:
+        if not rows:
+            return
+        with transaction.atomic():
+            self.resolve_references(rows)
+            if self.upsert:
+                self.upsert_batch(rows)
+                return
+            products = Product.objects.bulk_create(
+                [self.build_product(row) for row in rows],
+                batch_size=self.batch_size,
+            )
+            self.index_products(products)
+        self.created += len(rows)
+
+    def run(self, rows) -> int:
+        batch: list[ProductRow] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.write_batch(batch)
+                batch = []
+        self.write_batch(batch)
+        if self.created or self.updated:
+            # bulk-операции не посылают сигналов post_save
+            bump_catalogue_version()
+        return self.created
@@ -0,0 +1,210 @@
+"""
+Метрики запросов: число SQL-запросов, время в БД, время рендеринга
+шаблонов и полное время ответа для каждого представления.
+
+Обёртка execute_wrapper ставится на каждое соединение один раз при его
+создании и при выключенном сборе (нет текущего запроса) сразу передаёт
+вызов дальше. Метрики текущего запроса хранятся в contextvar, поэтому
+учитываются и запросы async-представлений, которые ORM выполняет в другом
+потоке через sync_to_async.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.template.backends.django import DjangoTemplates, Template
+
+DEFAULT_SAMPLES = 1000
+UNRESOLVED = "<unresolved>"
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    render_time: float = 0.0
+    render_depth: int = 0
+
+    @property
+    def total_time(self) -> float:
+        return time.perf_counter() - self.started
+
+
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar("shop_request_metrics", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def _install_wrapper(connection, **kwargs) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install() -> None:
+    connection_created.connect(_install_wrapper, dispatch_uid="shop.instrumentation")
+    for connection in connections.all(initialized_only=True):
+        _install_wrapper(connection)
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().render(context, request)
+        # вложенный render_to_string уже учтён во внешнем рендеринге
+        metrics.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.render_depth -= 1
+            if not metrics.render_depth:
+                metrics.render_time += time.perf_counter() - started
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """DjangoTemplates, который учитывает время рендеринга в метриках запроса."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+class StatsCollector:
+    """Последние ``samples`` измерений по каждому имени URL в памяти процесса."""
+
+    def __init__(self, samples: int = DEFAULT_SAMPLES):
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._data: dict[str, deque] = defaultdict(lambda: deque(maxlen=self.samples))
+        self._counts: dict[str, int] = defaultdict(int)
+
+    def add(self, view_name: str, metrics: RequestMetrics, total: float) -> None:
+        sample = (total, metrics.db_time, metrics.render_time, metrics.queries)
+        with self._lock:
+            self._data[view_name].append(sample)
+            self._counts[view_name] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._counts.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            data = {name: list(samples) for name, samples in self._data.items()}
+            counts = dict(self._counts)
+        result = {}
+        for name, samples in sorted(data.items()):
+            columns = list(zip(*samples))
+            result[name] = {
+                "requests": counts[name],
+                "samples": len(samples),
+                "total_ms": _distribution(columns[0], scale=1000),
+                "db_ms": _distribution(columns[1], scale=1000),
+                "render_ms": _distribution(columns[2], scale=1000),
+                "queries": _distribution(columns[3]),
+            }
+        return result
+
+
+def _percentile(ordered: list, fraction: float):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _distribution(values, scale: float = 1) -> dict:
+    ordered = sorted(values)
+    return {
+        key: round(_percentile(ordered, fraction) * scale, 2)
+        for key, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))
+    }
+
+
+stats = StatsCollector(getattr(settings, "SHOP_METRICS_SAMPLES", DEFAULT_SAMPLES))
+
+
+def server_timing(metrics: RequestMetrics, total: float) -> str:
+    return (
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries", '
+        f"tpl;dur={metrics.render_time * 1000:.1f}, "
+        f"total;dur={total * 1000:.1f}"
+    )
+
+
+class InstrumentationMiddleware:
+    """
+    Собирает метрики каждого запроса в ``stats`` и при SHOP_SERVER_TIMING
+    добавляет заголовок Server-Timing. Выключается SHOP_METRICS_ENABLED.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self.__acall__(request)
+        if not getattr(settings, "SHOP_METRICS_ENABLED", True):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest):
+        if not getattr(settings, "SHOP_METRICS_ENABLED", True):
+            return await self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request: HttpRequest, response: HttpResponse, metrics: RequestMetrics):
+        total = metrics.total_time
+        match = request.resolver_match
+        stats.add(match.view_name if match else UNRESOLVED, metrics, total)
+        if getattr(settings, "SHOP_SERVER_TIMING", False):
+            response["Server-Timing"] = server_timing(metrics, total)
+        return response
+
+
+def stats_view(request: HttpRequest) -> HttpResponse:
+    if not request.user.is_staff:
+        return JsonResponse({"error": "Доступно только сотрудникам."}, status=403)
+    if request.method == "POST" and request.POST.get("reset"):
+        stats.reset()
+    return JsonResponse(stats.snapshot(), json_dumps_params={"ensure_ascii": False, "indent": 2})
@@ -0,0 +1,113 @@
+import logging
+import traceback
+from datetime import timedelta
+from typing import Callable
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS: dict[str, Callable] = {}
+RETRY_DELAY = timedelta(seconds=30)
+STALE_AFTER = timedelta(minutes=15)
+DONE_RETENTION = timedelta(days=7)
+CLAIM_CANDIDATES = 10
+
+
+class UnknownJob(LookupError):
+    pass
+
+
+def job(name: str):
+    """Регистрирует функцию как обработчик задачи ``name``."""
+
+    def decorator(func: Callable) -> Callable:
+        JOB_HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name: str, /, **payload) -> None:
+    """
+    Ставит задачу в очередь после фиксации текущей транзакции: обработчик не
+    увидит данных, которые ещё могут откатиться. Параметры должны
+    сериализоваться в JSON.
+    """
+    if name not in JOB_HANDLERS:
+        raise UnknownJob(name)
+    transaction.on_commit(lambda: Job.objects.create(name=name, payload=payload))
+
+
+def claim_next() -> Job | None:
+    # задача захватывается условным UPDATE: из нескольких обработчиков его
+    # выполнит только один, без SELECT FOR UPDATE (которого нет в SQLite)
+    now = timezone.now()
+    candidates = (
+        Job.objects.filter(status=JobStatus.PENDING, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("pk", flat=True)[:CLAIM_CANDIDATES]
+    )
+    for pk in candidates:
+        claimed = Job.objects.filter(pk=pk, status=JobStatus.PENDING).update(
+            status=JobStatus.RUNNING, locked_at=now, attempts=F("attempts") + 1
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job: Job) -> bool:
+    try:
+        handler = JOB_HANDLERS.get(job.name)
+        if handler is None:
+            raise UnknownJob(job.name)
+        handler(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning("Задача %s завершилась ошибкой (попытка %s)", job, job.attempts)
+        if job.attempts >= job.max_attempts:
+            changes = {"status": JobStatus.FAILED, "finished_at": timezone.now()}
+        else:
+            # экспоненциальная пауза перед повтором: 30 с, 1 мин, 2 мин...
+            delay = RETRY_DELAY * 2 ** (job.attempts - 1)
+            changes = {"status": JobStatus.PENDING, "run_after": timezone.now() + delay}
+        Job.objects.filter(pk=job.pk).update(last_error=error, locked_at=None, **changes)
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status=JobStatus.DONE, finished_at=timezone.now(), locked_at=None, last_error=""
+    )
+    return True
+
+
+def release_stale(after: timedelta = STALE_AFTER) -> int:
+    # задачи обработчика, который упал, не успев записать результат
+    return Job.objects.filter(
+        status=JobStatus.RUNNING, locked_at__lt=timezone.now() - after
+    ).update(status=JobStatus.PENDING, locked_at=None)
+
+
+def purge_done(after: timedelta = DONE_RETENTION) -> int:
+    deleted, _ = Job.objects.filter(
+        status=JobStatus.DONE, finished_at__lt=timezone.now() - after
+    ).delete()
+    return deleted
+
+
+def run_pending(limit: int | None = None) -> tuple[int, int]:
+    """Выполняет готовые задачи; возвращает (успешно, с ошибкой)."""
+    done = failed = 0
+    while limit is None or done + failed < limit:
+        job = claim_next()
+        if job is None:
+            break
+        if run_job(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
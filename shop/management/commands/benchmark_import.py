@@ -0,0 +1,149 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from shop.synthetic import write_import_file
+
+
+# dry-run — только разбор файла; import — запись в пустую базу;
+# upsert — повторная загрузка того же файла, где все строки без изменений
+MODES = {
+    "parse": ["--dry-run"],
+    "import": [],
+    "upsert": ["--upsert"],
+}
+
+
+def run_measured(command: list[str], env: dict | None = None) -> tuple[float, int | None]:
+    stderr = tempfile.TemporaryFile()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=stderr, env=env
+    )
+    peak_kb = None
+    if hasattr(os, "wait4"):
+        # wait4 возвращает rusage именно этого процесса, а не максимум по всем потомкам
+        _, status, usage = os.wait4(process.pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+        process.returncode = returncode
+        peak_kb = usage.ru_maxrss
+        if sys.platform == "darwin":
+            peak_kb //= 1024
+    else:
+        returncode = process.wait()
+    elapsed = time.perf_counter() - started
+    with stderr:
+        if returncode != 0:
+            stderr.seek(0)
+            raise CommandError(stderr.read().decode("utf-8", "replace"))
+    return elapsed, peak_kb
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер времени и пиковой памяти import_products на синтетических файлах: "
+        "разбор, загрузка в пустую базу и повторная загрузка с --upsert"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000],
+            help="Количество строк в синтетических файлах (по умолчанию: 10000 100000)",
+        )
+        parser.add_argument(
+            "--formats",
+            nargs="+",
+            choices=["xlsx", "csv", "tsv"],
+            default=["xlsx", "csv"],
+            help="Форматы файлов (по умолчанию: xlsx csv)",
+        )
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=list(MODES),
+            default=list(MODES),
+            help="Что замерять: parse — только разбор (--dry-run), import — загрузку в пустую "
+            "базу, upsert — повторную загрузку без изменений (по умолчанию: все)",
+        )
+        parser.add_argument(
+            "--workdir",
+            type=str,
+            help="Каталог для синтетических файлов (по умолчанию: временный, удаляется)",
+        )
+        parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            workdir = Path(options["workdir"] or tmp)
+            workdir.mkdir(parents=True, exist_ok=True)
+            results = []
+            for fmt in options["formats"]:
+                for size in options["sizes"]:
+                    path = workdir / f"products_{size}.{fmt}"
+                    if not path.exists():
+                        write_import_file(path, size)
+                    for mode, seconds, peak_kb in self.measure(path, options["modes"], Path(tmp)):
+                        results.append(
+                            {
+                                "format": fmt,
+                                "rows": size,
+                                "mode": mode,
+                                "seconds": round(seconds, 3),
+                                "rows_per_second": round(size / seconds) if seconds else None,
+                                "peak_rss_mb": round(peak_kb / 1024, 1) if peak_kb else None,
+                            }
+                        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(
+            f"{'формат':<8}{'строк':>10}{'режим':>8}{'время, с':>12}{'строк/с':>12}{'RSS, МБ':>10}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['format']:<8}{result['rows']:>10}{result['mode']:>8}{result['seconds']:>12}"
+                f"{result['rows_per_second'] or '-':>12}{result['peak_rss_mb'] or '-':>10}"
+            )
+
+    def measure(self, path: Path, modes: list[str], tmp: Path):
+        command = [
+            sys.executable,
+            "manage.py",
+            "import_products",
+            "--path",
+            str(path),
+            "--skip-thumbnails",
+        ]
+        if "parse" in modes:
+            yield "parse", *run_measured([*command, *MODES["parse"]])
+        writes = [mode for mode in modes if mode != "parse"]
+        if not writes:
+            return
+        # рабочую БД не трогаем: каждый файл загружается в новую тестовую базу
+        # (SQLite — файл во временном каталоге, чтобы его открыл дочерний процесс)
+        old_name = connection.settings_dict["NAME"]
+        if connection.vendor == "sqlite":
+            connection.settings_dict.setdefault("TEST", {})["NAME"] = str(tmp / "benchmark.sqlite3")
+        test_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            env = {**os.environ, "SHOP_DATABASE_NAME": str(test_name)}
+            # upsert сравнивает с уже загруженными строками, поэтому import
+            # выполняется всегда, а в результаты попадает, только если запрошен
+            for mode in ("import", "upsert")[: 2 if "upsert" in writes else 1]:
+                seconds, peak_kb = run_measured([*command, *MODES[mode]], env=env)
+                if mode in writes:
+                    yield mode, seconds, peak_kb
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,90 @@
+import json
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+
+from shop.models import Category, Manufacturer, Product, Supplier
+from shop.serializers import PRODUCT_FIELDS, ProductListSerializer
+
+
+class NaiveProductSerializer(serializers.ModelSerializer):
+    category = serializers.CharField(source="category.name")
+    manufacturer = serializers.CharField(source="manufacturer.name")
+    supplier = serializers.CharField(source="supplier.name")
+    final_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Product
+        fields = list(PRODUCT_FIELDS)
+
+
+def synthetic_products(count: int) -> list[Product]:
+    # объекты не сохраняются: замеряется только сериализация, без БД
+    category = Category(pk=1, name="Категория")
+    manufacturer = Manufacturer(pk=1, name="Производитель")
+    supplier = Supplier(pk=1, name="Поставщик")
+    return [
+        Product(
+            pk=i,
+            sku=f"SKU{i:07d}",
+            name=f"Товар {i}",
+            description=f"Описание товара {i}",
+            category=category,
+            manufacturer=manufacturer,
+            supplier=supplier,
+            price=Decimal("100.00"),
+            final_price=Decimal("90.00"),
+            discount_percent=10,
+            stock_quantity=i % 500,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def measure(serializer_class, products, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serializer_class(products, many=True).data
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Сравнение скорости сериализации товаров: ProductListSerializer и ModelSerializer"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=10_000, help="Количество товаров (по умолчанию: 10000)"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Число повторов, берётся лучшее (по умолчанию: 5)"
+        )
+        parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+
+    def handle(self, *args, **options):
+        products = synthetic_products(options["count"])
+        results = [
+            {
+                "serializer": serializer_class.__name__,
+                "products": options["count"],
+                "seconds": round(measure(serializer_class, products, options["repeat"]), 4),
+            }
+            for serializer_class in (NaiveProductSerializer, ProductListSerializer)
+        ]
+        baseline = results[0]["seconds"]
+        for result in results:
+            result["speedup"] = round(baseline / result["seconds"], 2) if result["seconds"] else None
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(f"{'сериализатор':<28}{'товаров':>10}{'время, с':>12}{'ускорение':>12}")
+        for result in results:
+            self.stdout.write(
+                f"{result['serializer']:<28}{result['products']:>10}"
+                f"{result['seconds']:>12}{result['speedup']:>12}"
+            )
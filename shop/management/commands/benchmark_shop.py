@@ -0,0 +1,154 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from shop.benchmarks import (
+    BENCHMARK_GROUPS,
+    BenchmarkContext,
+    BenchmarkFailed,
+    BenchmarkRunner,
+    compare,
+    report,
+    run_benchmarks,
+)
+from shop.synthetic import seed_shop
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеры каталога, заказов, импорта и админки на синтетических данных "
+        "во временной тестовой БД; результаты — в JSON для сравнения запусков"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products", type=int, default=10_000, help="Количество товаров (по умолчанию: 10000)"
+        )
+        parser.add_argument(
+            "--suppliers", type=int, default=20, help="Количество поставщиков (по умолчанию: 20)"
+        )
+        parser.add_argument(
+            "--customers", type=int, default=200, help="Количество клиентов (по умолчанию: 200)"
+        )
+        parser.add_argument(
+            "--orders", type=int, default=5_000, help="Количество заказов (по умолчанию: 5000)"
+        )
+        parser.add_argument(
+            "--items-per-order", type=int, default=3, help="Позиций в заказе (по умолчанию: 3)"
+        )
+        parser.add_argument(
+            "--import-rows",
+            type=int,
+            default=1_000,
+            help="Строк в файле для замера import_products (по умолчанию: 1000)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=1, help="Зерно генератора данных (по умолчанию: 1)"
+        )
+        parser.add_argument(
+            "--rounds", type=int, default=5, help="Раундов на замер (по умолчанию: 5)"
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=1, help="Раундов прогрева (по умолчанию: 1)"
+        )
+        parser.add_argument(
+            "--groups",
+            nargs="+",
+            choices=list(BENCHMARK_GROUPS),
+            help="Группы замеров (по умолчанию: все)",
+        )
+        parser.add_argument("--output", type=str, help="Сохранить результаты в JSON-файл")
+        parser.add_argument(
+            "--compare", type=str, help="JSON-файл прошлого запуска для сравнения медиан"
+        )
+        parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+        parser.add_argument(
+            "--noinput",
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Не спрашивать подтверждения перед удалением оставшейся тестовой БД",
+        )
+
+    def handle(self, *args, **options):
+        for name in ("products", "rounds", "import_rows"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} должен быть положительным числом")
+        previous = None
+        if options["compare"]:
+            try:
+                previous = json.loads(Path(options["compare"]).read_text(encoding="utf-8"))
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Не удалось прочитать {options['compare']}: {exc}") from exc
+
+        dataset = {
+            name: options[name]
+            for name in ("products", "suppliers", "customers", "orders", "items_per_order", "seed")
+        }
+        bench = BenchmarkRunner(rounds=options["rounds"], warmup=options["warmup"])
+
+        # рабочую БД не трогаем: данные создаются в тестовой (SQLite — в памяти,
+        # PostgreSQL — отдельная база test_<имя>, нужно право CREATEDB)
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=not options["interactive"], serialize=False
+        )
+        try:
+            with tempfile.TemporaryDirectory() as tmp, override_settings(
+                DEBUG=False, ALLOWED_HOSTS=["testserver"]
+            ):
+                started = time.perf_counter()
+                data = seed_shop(**dataset)
+                self.stderr.write(f"Данные созданы за {time.perf_counter() - started:.1f} с")
+                context = BenchmarkContext(
+                    data=data, workdir=Path(tmp), import_rows=options["import_rows"]
+                )
+                run_benchmarks(bench, context, options["groups"])
+        except BenchmarkFailed as exc:
+            raise CommandError(str(exc)) from exc
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        result = report(bench, {**dataset, "import_rows": options["import_rows"]})
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+        if options["json"]:
+            self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+        else:
+            self.write_table(result["benchmarks"])
+        if previous is not None:
+            self.write_comparison(compare(result, previous))
+
+    def write_table(self, benchmarks: list[dict]) -> None:
+        self.stdout.write(
+            f"{'замер':<44}{'запросов':>10}{'min, мс':>10}{'медиана':>10}{'max, мс':>10}{'σ, мс':>10}"
+        )
+        for item in benchmarks:
+            self.stdout.write(
+                f"{item['name']:<44}{item['queries']:>10}{item['min_ms']:>10.1f}"
+                f"{item['median_ms']:>10.1f}{item['max_ms']:>10.1f}{item['stddev_ms']:>10.1f}"
+            )
+
+    def write_comparison(self, rows: list[dict]) -> None:
+        self.stdout.write("")
+        self.stdout.write(f"{'замер':<44}{'было, мс':>10}{'стало, мс':>11}{'изменение':>11}{'запросов':>12}")
+        for row in rows:
+            change = row["change_percent"]
+            text = f"{change:+.1f}%" if change is not None else "-"
+            if change is not None and change > 10:
+                text = self.style.ERROR(f"{text:>11}")
+            elif change is not None and change < -10:
+                text = self.style.SUCCESS(f"{text:>11}")
+            else:
+                text = f"{text:>11}"
+            self.stdout.write(
+                f"{row['name']:<44}{row['previous_median_ms']:>10.1f}{row['median_ms']:>11.1f}{text}"
+                f"{row['previous_queries']:>6} → {row['queries']:<4}"
+            )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.media import cleanup_media
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаление файлов media/products, не связанных ни с одним товаром, "
+        "и ссылок товаров на отсутствующие файлы"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать найденное, ничего не удаляя и не изменяя",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=60,
+            help="Не трогать файлы моложе указанного числа минут (по умолчанию: 60)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Сколько файлов или товаров проверять одним запросом (по умолчанию: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["min_age"] < 0:
+            raise CommandError("--chunk-size должен быть положительным, --min-age — неотрицательным")
+
+        report = cleanup_media(
+            dry_run=options["dry_run"],
+            min_age=options["min_age"] * 60,
+            chunk_size=options["chunk_size"],
+            log=self.stdout.write if options["verbosity"] >= 2 else None,
+        )
+        action = "Найдено" if options["dry_run"] else "Удалено"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Проверено файлов: {report.scanned}. {action} лишних файлов: {report.orphans} "
+                f"({report.orphan_bytes / 1024 / 1024:.1f} МБ). Товаров без файла фото: "
+                f"{report.dangling_images}, без уменьшенных копий: {report.dangling_variants}"
+            )
+        )
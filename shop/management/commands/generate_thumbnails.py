@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.models import Product
+from shop.thumbnails import generate_variants, without_variants
+
+
+class Command(BaseCommand):
+    help = "Создание уменьшенных копий (WebP и JPEG) для фото существующих товаров"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Количество процессов для обработки фото (по умолчанию: число ядер)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Количество товаров, обрабатываемых за один проход (по умолчанию: 200)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересоздать копии для всех товаров, в том числе повторить для фото, "
+            "файл которых не удалось прочитать",
+        )
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--workers и --batch-size должны быть положительными числами")
+
+        products = Product.objects.all()
+        if not options["force"]:
+            products = without_variants(products)
+
+        started = time.perf_counter()
+        processed, missing = generate_variants(
+            products, workers=options["workers"], batch_size=options["batch_size"]
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обработано товаров: {processed}, из них без файла фото: {missing} "
+                f"за {elapsed:.2f} с"
+            )
+        )
@@ -1,9 +1,17 @@
-from pathlib import Path
+import os
+import time
 
 from django.core.management.base import BaseCommand, CommandError
-from openpyxl import load_workbook
+from django.db import IntegrityError
 
-from shop.models import Category, Manufacturer, Supplier, Product
+from shop.importing import (
+    ImportSourceError,
+    ProductImporter,
+    iter_source_rows,
+    resolve_source_paths,
+)
+from shop.models import Product
+from shop.thumbnails import generate_variants, without_variants
 
 
 class Command(BaseCommand):
@@ -14,119 +22,97 @@ class Command(BaseCommand):
             "--path",
             type=str,
             default="Прил_2_ОЗ_Канцтовары-M1.xlsx",
-            help="Путь к Excel-файлу (по умолчанию: Прил_2_ОЗ_Канцтовары-M1.xlsx)",
+            help="Путь к файлу .xlsx, .csv или .tsv, каталогу с такими файлами или glob-шаблон "
+            "(по умолчанию: Прил_2_ОЗ_Канцтовары-M1.xlsx)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество строк, записываемых в БД одной транзакцией (по умолчанию: 1000)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Количество процессов для разбора файлов (по умолчанию: число ядер)",
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help="Обновлять существующие товары (по артикулу или наименованию, производителю "
+            "и поставщику) вместо создания дубликатов; неизменённые строки не записываются",
+        )
+        parser.add_argument(
+            "--skip-thumbnails",
+            action="store_true",
+            help="Не создавать уменьшенные копии фото (их можно создать позже командой "
+            "generate_thumbnails)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только прочитать и разобрать файлы, ничего не записывая в БД",
         )
 
     def handle(self, *args, **options):
-        file_path = Path(options["path"])
-        if not file_path.exists():
-            raise CommandError(f"Файл не найден: {file_path}")
-
-        wb = load_workbook(filename=str(file_path), data_only=True)
-
-        def find_sheet_with_header(target_header: str):
-            normalized_target = str(target_header).strip().lower()
-            for ws in wb.worksheets:
-                headers = [cell.value for cell in ws[1]]
-                for header in headers:
-                    if header is None:
-                        continue
-                    if str(header).strip().lower() == normalized_target:
-                        return ws, headers
-            available = {
-                ws.title: [cell.value for cell in ws[1]] for ws in wb.worksheets
-            }
+        paths = resolve_source_paths(options["path"])
+        if not paths:
+            raise CommandError(f"Файл не найден: {options['path']}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size должен быть положительным числом")
+        if options["workers"] < 1:
+            raise CommandError("--workers должен быть положительным числом")
+
+        importer = ProductImporter(batch_size=options["batch_size"], upsert=options["upsert"])
+        started = time.perf_counter()
+        try:
+            rows = iter_source_rows(paths, workers=options["workers"])
+            if options["dry_run"]:
+                parsed = sum(1 for _ in rows)
+            else:
+                importer.run(rows)
+        except ImportSourceError as exc:
+            raise CommandError(str(exc)) from exc
+        except IntegrityError as exc:
             raise CommandError(
-                f"Не удалось найти лист с колонкой заголовка {target_header!r}. "
-                f"Найденные заголовки по листам: {available}"
+                f"Ошибка записи в БД: {exc}. Если товары уже загружались, "
+                f"используйте --upsert для обновления вместо повторного создания."
+            ) from exc
+        elapsed = time.perf_counter() - started
+        files = f"файлов: {len(paths)}"
+
+        if options["dry_run"]:
+            rate = parsed / elapsed if elapsed > 0 else 0
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Проверка завершена ({files}). Разобрано строк: {parsed} "
+                    f"за {elapsed:.2f} с ({rate:.0f} строк/с)"
+                )
             )
-
-        ws, headers = find_sheet_with_header("Категория товара")
-
-        def get_index(name: str) -> int:
-            normalized_target = str(name).strip().lower()
-            for idx, header in enumerate(headers):
-                if header is None:
-                    continue
-                if str(header).strip().lower() == normalized_target:
-                    return idx
-            available = ", ".join(str(h) for h in headers)
-            raise CommandError(
-                f"В файле на листе {ws.title!r} нет колонки с заголовком: {name!r}. "
-                f"Найденные заголовки: {available}"
+            return
+
+        processed = importer.created + importer.updated + importer.unchanged
+        rate = processed / elapsed if elapsed > 0 else 0
+        if options["upsert"]:
+            summary = (
+                f"Создано: {importer.created}, обновлено: {importer.updated}, "
+                f"без изменений: {importer.unchanged}"
             )
-
-        idx_category = get_index("Категория товара")
-        idx_name = get_index("Наименование товара")
-        idx_manufacturer = get_index("Производитель")
-        idx_supplier = get_index("Поставщик")
-        idx_price = get_index("Цена")
-        idx_unit = get_index("Единица измерения")
-        idx_stock = get_index("Кол-во на складе")
-        idx_discount = get_index("Действующая скидка")
-        idx_description = get_index("Описание товара")
-        idx_image = get_index("Фото")
-
-        created_products = 0
-
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if not row[idx_name]:
-                continue
-
-            category_name = str(row[idx_category]).strip() if row[idx_category] else "Без категории"
-            manufacturer_name = str(row[idx_manufacturer]).strip() if row[idx_manufacturer] else "Без производителя"
-            supplier_name = str(row[idx_supplier]).strip() if row[idx_supplier] else "Без поставщика"
-
-            category, _ = Category.objects.get_or_create(name=category_name)
-            manufacturer, _ = Manufacturer.objects.get_or_create(name=manufacturer_name)
-            supplier, _ = Supplier.objects.get_or_create(name=supplier_name)
-
-            try:
-                price = float(row[idx_price]) if row[idx_price] is not None else 0
-            except (TypeError, ValueError):
-                price = 0
-
-            unit_raw = (str(row[idx_unit]).strip() if row[idx_unit] is not None else "").lower()
-            unit_map = {
-                "шт": "pcs",
-                "шт.": "pcs",
-                "уп": "pack",
-                "уп.": "pack",
-                "набор": "set",
-            }
-            unit = unit_map.get(unit_raw, "pcs")
-
-            try:
-                stock = int(row[idx_stock]) if row[idx_stock] is not None else 0
-            except (TypeError, ValueError):
-                stock = 0
-
-            try:
-                discount = int(row[idx_discount]) if row[idx_discount] is not None else 0
-            except (TypeError, ValueError):
-                discount = 0
-
-            description = (
-                str(row[idx_description]).strip() if row[idx_description] is not None else ""
+        else:
+            summary = f"Создано товаров: {importer.created}"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Импорт завершён ({files}). {summary} за {elapsed:.2f} с ({rate:.0f} строк/с)"
             )
-            image_value = row[idx_image]
-            image_path = None
-            if image_value:
-                image_path = f"products/{str(image_value).strip()}"
+        )
 
-            Product.objects.create(
-                name=str(row[idx_name]).strip(),
-                category=category,
-                description=description,
-                manufacturer=manufacturer,
-                supplier=supplier,
-                price=price,
-                unit=unit,
-                stock_quantity=stock,
-                discount_percent=discount,
-                image=image_path,
+        if not options["skip_thumbnails"]:
+            # новые товары и товары со сменившимся фото остаются без копий
+            with_photo, missing = generate_variants(
+                without_variants(Product.objects.all()), workers=options["workers"]
             )
-            created_products += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Импорт завершён. Создано товаров: {created_products}"))
-
+            if with_photo:
+                self.stdout.write(
+                    f"Уменьшенные копии фото: {with_photo - missing}, файлы не найдены: {missing}"
+                )
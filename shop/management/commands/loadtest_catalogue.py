@@ -0,0 +1,223 @@
+import asyncio
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+
+DEFAULT_PATHS = ["/products/guest/", "/products/", "/api/products/?page_size=50"]
+HOST = "localhost"
+
+
+def session_cookie(username: str | None) -> str:
+    if not username:
+        return ""
+    user = get_user_model().objects.filter(username=username).first()
+    if user is None:
+        raise CommandError(f"Пользователь не найден: {username}")
+    client = Client()
+    client.force_login(user)
+    return f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(handler: str, path: str, latencies: list[float], statuses: list[int], elapsed: float) -> dict:
+    return {
+        "handler": handler,
+        "path": path,
+        "requests": len(latencies),
+        "errors": sum(1 for status in statuses if status >= 400),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+def run_wsgi(path: str, cookie: str, requests: int, concurrency: int) -> tuple[list, list, float]:
+    # как у многопоточного WSGI-сервера: один запрос занимает поток целиком
+    application = get_wsgi_application()
+    url = urlsplit(path)
+
+    def call() -> tuple[float, int]:
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": url.path,
+            "QUERY_STRING": url.query,
+            "SERVER_NAME": HOST,
+            "SERVER_PORT": "80",
+            "HTTP_HOST": HOST,
+            "HTTP_COOKIE": cookie,
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+            "wsgi.url_scheme": "http",
+        }
+        status = []
+        started = time.perf_counter()
+        response = application(environ, lambda line, headers, exc_info=None: status.append(line))
+        b"".join(response)
+        response.close()
+        return time.perf_counter() - started, int(status[0].split()[0])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: call(), range(concurrency)))  # прогрев
+        started = time.perf_counter()
+        results = list(pool.map(lambda _: call(), range(requests)))
+        elapsed = time.perf_counter() - started
+    return [latency for latency, _ in results], [status for _, status in results], elapsed
+
+
+async def _run_asgi(path: str, cookie: str, requests: int, concurrency: int) -> tuple[list, list, float]:
+    application = get_asgi_application()
+    url = urlsplit(path)
+    headers = [(b"host", HOST.encode())]
+    if cookie:
+        headers.append((b"cookie", cookie.encode()))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call() -> tuple[float, int]:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url.path,
+            "raw_path": url.path.encode(),
+            "query_string": url.query.encode(),
+            "headers": headers,
+            "server": (HOST, 80),
+            "client": ("127.0.0.1", 0),
+        }
+        body_sent = False
+        done = asyncio.Event()
+        status = []
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # обработчик ждёт отключения клиента, пока формирует ответ
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+            elif not message.get("more_body"):
+                done.set()
+
+        async with semaphore:
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            return time.perf_counter() - started, status[0]
+
+    await asyncio.gather(*(call() for _ in range(concurrency)))  # прогрев
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return [latency for latency, _ in results], [status for _, status in results], elapsed
+
+
+def run_asgi(path: str, cookie: str, requests: int, concurrency: int) -> tuple[list, list, float]:
+    return asyncio.run(_run_asgi(path, cookie, requests, concurrency))
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест каталога: пропускная способность и p99 синхронных "
+        "представлений под WSGI и async-представлений под ASGI"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS, help="Адреса для запросов")
+        parser.add_argument(
+            "--requests", type=int, default=500, help="Запросов на адрес (по умолчанию: 500)"
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=50, help="Одновременных запросов (по умолчанию: 50)"
+        )
+        parser.add_argument(
+            "--user",
+            type=str,
+            help="Логин пользователя для страниц, требующих входа (например, менеджера)",
+        )
+        parser.add_argument("--json", action="store_true", help="Вывести результаты в JSON")
+        # режим дочернего процесса: SHOP_ASYNC_VIEWS читается при импорте настроек,
+        # поэтому каждый вариант запускается в отдельном процессе
+        parser.add_argument("--handler", choices=["wsgi", "asgi"], help="Внутренний параметр")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests и --concurrency должны быть положительными числами")
+        if options["handler"]:
+            self.run_handler(options)
+            return
+
+        results = []
+        for handler, async_views in (("wsgi", "0"), ("asgi", "1")):
+            command = [
+                sys.executable,
+                "manage.py",
+                "loadtest_catalogue",
+                "--handler",
+                handler,
+                "--requests",
+                str(options["requests"]),
+                "--concurrency",
+                str(options["concurrency"]),
+                "--paths",
+                *options["paths"],
+            ]
+            if options["user"]:
+                command += ["--user", options["user"]]
+            process = subprocess.run(
+                command,
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "SHOP_ASYNC_VIEWS": async_views},
+                capture_output=True,
+                text=True,
+            )
+            if process.returncode != 0:
+                raise CommandError(process.stderr)
+            results.extend(json.loads(process.stdout))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(
+            f"{'сервер':<8}{'адрес':<34}{'запросов':>10}{'ошибок':>8}{'RPS':>10}"
+            f"{'p50, мс':>10}{'p99, мс':>10}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['handler']:<8}{result['path']:<34}{result['requests']:>10}"
+                f"{result['errors']:>8}{result['rps']:>10}{result['p50_ms']:>10}{result['p99_ms']:>10}"
+            )
+
+    def run_handler(self, options):
+        expected = options["handler"] == "asgi"
+        if settings.SHOP_ASYNC_VIEWS != expected:
+            raise CommandError("SHOP_ASYNC_VIEWS не соответствует --handler")
+        cookie = session_cookie(options["user"])
+        run = run_asgi if expected else run_wsgi
+        results = []
+        for path in options["paths"]:
+            latencies, statuses, elapsed = run(path, cookie, options["requests"], options["concurrency"])
+            results.append(summarize(options["handler"], path, latencies, statuses, elapsed))
+        self.stdout.write(json.dumps(results))
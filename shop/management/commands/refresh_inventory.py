@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from shop.analytics import refresh_inventory_summary
+
+
+class Command(BaseCommand):
+    help = "Обновление сводки по остаткам и продажам (страница «Остатки» и /api/inventory/)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Свернуть продажи заново по всем позициям заказов (после удаления заказов)",
+        )
+
+    def handle(self, *args, **options):
+        report = refresh_inventory_summary(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Сводка обновлена за {report.seconds:.2f} с. Новых позиций заказов: "
+                f"{report.order_items}, строк сводки: {report.summary_rows}, "
+                f"заканчивающихся товаров: {report.low_stock}"
+            )
+        )
@@ -0,0 +1,63 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from shop.jobs import purge_done, release_stale, run_pending
+
+
+class Command(BaseCommand):
+    help = "Обработчик фоновых задач (уменьшенные копии фото, удаление старых файлов)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить готовые задачи и завершиться (например, из cron)",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Пауза между опросами очереди, с (по умолчанию: 1)",
+        )
+        parser.add_argument(
+            "--batch",
+            type=int,
+            default=100,
+            help="Сколько задач выполнить подряд до следующей проверки (по умолчанию: 100)",
+        )
+
+    def handle(self, *args, **options):
+        if options["sleep"] <= 0 or options["batch"] < 1:
+            raise CommandError("--sleep и --batch должны быть положительными числами")
+
+        self.stopping = False
+        # текущая задача доводится до конца, новые не берутся
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        total_done = total_failed = 0
+        released = release_stale()
+        if released:
+            self.stdout.write(f"Возвращено в очередь зависших задач: {released}")
+        while not self.stopping:
+            done, failed = run_pending(limit=options["batch"])
+            total_done += done
+            total_failed += failed
+            if done or failed:
+                continue
+            if options["once"]:
+                break
+            purge_done()
+            release_stale()
+            close_old_connections()
+            time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Выполнено задач: {total_done}, с ошибкой: {total_failed}")
+        )
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,170 @@
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+from django.conf import settings
+from django.db.models import Q
+
+from .caching import bump_product_versions
+from .models import IMAGE_VARIANT_KEYS, ImageVariant, Product
+
+PRODUCT_MEDIA_DIR = "products"
+
+
+@dataclass
+class MediaFile:
+    name: str
+    size: int
+
+
+@dataclass
+class CleanupReport:
+    # только счётчики: найденное не накапливается, чтобы память не росла с числом файлов
+    scanned: int = 0
+    orphans: int = 0
+    orphan_bytes: int = 0
+    dangling_images: int = 0
+    dangling_variants: int = 0
+
+
+def iter_media_files(root: Path, min_age: float = 0) -> Iterator[MediaFile]:
+    """
+    Файлы каталога ``root`` и его подкаталогов. Каталог читается потоково
+    через os.scandir, в памяти только стек вложенных каталогов.
+    Файлы моложе ``min_age`` секунд пропускаются: их могли записать, но ещё
+    не сохранить ссылку в БД.
+    """
+    media_root = Path(settings.MEDIA_ROOT)
+    newest = time.time() - min_age
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime > newest:
+                    continue
+                name = Path(entry.path).relative_to(media_root).as_posix()
+                yield MediaFile(name=name, size=stat.st_size)
+
+
+def _chunks(items, size: int):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def referenced_names(names: list[str]) -> set[str]:
+    """
+    Какие из имён ``names`` указаны у товаров как фото или уменьшенная копия.
+
+    Поиск идёт по индексам фото и каждого ключа image_variants, поэтому
+    память и время проверки пачки не зависят от числа товаров и файлов.
+    """
+    wanted = set(names)
+    products = Product.objects.order_by()
+    referenced = set(products.filter(image__in=names).values_list("image", flat=True))
+    variants = Q()
+    for key in IMAGE_VARIANT_KEYS:
+        variants |= Q(**{f"variant_{key}__in": names})
+    rows = products.alias(
+        **{f"variant_{key}": ImageVariant(key) for key in IMAGE_VARIANT_KEYS}
+    ).filter(variants)
+    for image_variants in rows.values_list("image_variants", flat=True):
+        referenced.update(name for name in image_variants.values() if name in wanted)
+    return referenced
+
+
+def find_orphans(
+    report: CleanupReport, min_age: float, chunk_size: int
+) -> Iterator[list[MediaFile]]:
+    # ссылки проверяются для каждой пачки непосредственно перед удалением:
+    # фото, на которое сослались во время обхода, не будет удалено
+    root = Path(settings.MEDIA_ROOT) / PRODUCT_MEDIA_DIR
+    for chunk in _chunks(iter_media_files(root, min_age), chunk_size):
+        report.scanned += len(chunk)
+        referenced = referenced_names([item.name for item in chunk])
+        orphans = [item for item in chunk if item.name not in referenced]
+        if orphans:
+            yield orphans
+
+
+def find_dangling(chunk_size: int) -> Iterator[tuple[list[int], list[int]]]:
+    """
+    Товары, у которых нет файла фото или одной из копий, пачками по pk:
+    (без фото, без копий).
+    """
+    media_root = Path(settings.MEDIA_ROOT)
+    rows = Product.objects.exclude(image="").exclude(image__isnull=True).values_list(
+        "pk", "image", "image_variants"
+    )
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk).order_by("pk")[:chunk_size])
+        if not batch:
+            return
+        last_pk = batch[-1][0]
+        images, variants = [], []
+        for pk, image, image_variants in batch:
+            if not (media_root / image).is_file():
+                images.append(pk)
+            elif any(not (media_root / name).is_file() for name in image_variants.values()):
+                variants.append(pk)
+        yield images, variants
+
+
+def cleanup_media(
+    dry_run: bool = True,
+    min_age: float = 3600,
+    chunk_size: int = 1000,
+    log: Callable[[str], None] | None = None,
+) -> CleanupReport:
+    """
+    Удаляет файлы media/products, на которые не ссылается ни один товар, и
+    убирает у товаров ссылки на отсутствующие файлы. При ``dry_run`` только
+    считает найденное; подробности передаются в ``log``.
+    """
+    report = CleanupReport()
+    media_root = Path(settings.MEDIA_ROOT)
+    for orphans in find_orphans(report, min_age, chunk_size):
+        report.orphans += len(orphans)
+        report.orphan_bytes += sum(item.size for item in orphans)
+        for item in orphans:
+            if log:
+                log(f"Лишний файл: {item.name}")
+            if not dry_run:
+                (media_root / item.name).unlink(missing_ok=True)
+
+    for images, variants in find_dangling(chunk_size):
+        report.dangling_images += len(images)
+        report.dangling_variants += len(variants)
+        if log:
+            for pk in images:
+                log(f"Нет файла фото: товар #{pk}")
+            for pk in variants:
+                log(f"Нет уменьшенных копий: товар #{pk}")
+        if dry_run:
+            continue
+        if images:
+            Product.objects.filter(pk__in=images).update(image=None, image_variants={})
+        if variants:
+            # копии пересоздаст generate_thumbnails
+            Product.objects.filter(pk__in=variants).update(image_variants={}, image_variants_source="")
+        if images or variants:
+            bump_product_versions([*images, *variants])
+    return report
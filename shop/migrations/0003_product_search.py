@@ -0,0 +1,77 @@
+# Generated by Django 5.2.9 on 2026-10-17 04:16
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+POSTGRES_SEARCH_SQL = [
+    "CREATE INDEX product_search_trgm_idx ON shop_product "
+    "USING gin (search_document gin_trgm_ops)",
+    "ALTER TABLE shop_product ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('russian'::regconfig, search_document)) STORED",
+    "CREATE INDEX product_search_vector_idx ON shop_product USING gin (search_vector)",
+]
+
+POSTGRES_SEARCH_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS product_search_vector_idx",
+    "ALTER TABLE shop_product DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS product_search_trgm_idx",
+]
+
+
+# копия shop.search.build_search_document на момент миграции: код приложения
+# может измениться, а миграция должна давать тот же результат
+def build_search_document(*parts) -> str:
+    return "\n".join(str(part or "").strip().lower() for part in parts)
+
+
+def fill_search_documents(apps, schema_editor):
+    Product = apps.get_model("shop", "Product")
+    products = Product.objects.select_related("category", "manufacturer", "supplier").order_by("pk")
+    batch = []
+    for product in products.iterator(chunk_size=1000):
+        product.search_document = build_search_document(
+            product.name,
+            product.description,
+            product.category.name,
+            product.manufacturer.name,
+            product.supplier.name,
+        )
+        batch.append(product)
+        if len(batch) >= 1000:
+            Product.objects.bulk_update(batch, ["search_document"])
+            batch.clear()
+    if batch:
+        Product.objects.bulk_update(batch, ["search_document"])
+
+
+def create_postgres_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in POSTGRES_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_postgres_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in POSTGRES_SEARCH_REVERSE_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_product_keyset_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Поисковый документ'),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_postgres_search, drop_postgres_search),
+    ]
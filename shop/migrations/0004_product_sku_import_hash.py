@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0003_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='import_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32, verbose_name='Хэш строки импорта'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True, verbose_name='Артикул'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.9 on 2026-10-17 04:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0009_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Сводка')),
+                ('last_order_item_id', models.PositiveBigIntegerField(default=0, verbose_name='Последняя учтённая позиция заказа')),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True, verbose_name='Обновлена')),
+                ('duration', models.FloatField(default=0, verbose_name='Длительность обновления, с')),
+            ],
+            options={
+                'verbose_name': 'Состояние сводки',
+                'verbose_name_plural': 'Состояния сводок',
+            },
+        ),
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('category', 'Категория'), ('supplier', 'Поставщик'), ('manufacturer', 'Производитель'), ('product', 'Товар')], max_length=20, verbose_name='Разрез')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='Наименование')),
+                ('product_count', models.PositiveIntegerField(default=0, verbose_name='Товаров')),
+                ('out_of_stock_count', models.PositiveIntegerField(default=0, verbose_name='Нет на складе')),
+                ('stock_quantity', models.PositiveBigIntegerField(default=0, verbose_name='Остаток, шт.')),
+                ('stock_value', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Стоимость остатка')),
+                ('units_sold', models.PositiveBigIntegerField(default=0, verbose_name='Продано за период, шт.')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Выручка за период')),
+            ],
+            options={
+                'verbose_name': 'Сводка по остаткам',
+                'verbose_name_plural': 'Сводка по остаткам',
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'object_id'), name='inventory_summary_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('quantity', models.PositiveBigIntegerField(default=0, verbose_name='Продано, шт.')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Выручка')),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shop.product', verbose_name='Товар')),
+            ],
+            options={
+                'verbose_name': 'Продажи товара за день',
+                'verbose_name_plural': 'Продажи товаров по дням',
+                'indexes': [models.Index(fields=['day'], name='product_daily_sales_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'day'), name='product_daily_sales_uniq')],
+            },
+        ),
+    ]
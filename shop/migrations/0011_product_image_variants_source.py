@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:26
+
+from django.db import migrations, models
+
+
+def mark_existing_variants(apps, schema_editor):
+    # уже созданные копии относятся к текущему фото
+    Product = apps.get_model("shop", "Product")
+    Product.objects.exclude(image_variants={}).update(image_variants_source=models.F("image"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_inventory_analytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_variants_source',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='Фото уменьшенных копий'),
+        ),
+        migrations.RunPython(mark_existing_variants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:34
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_product_image_variants_source'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='product',
+            name='import_hash',
+        ),
+    ]
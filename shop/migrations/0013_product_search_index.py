@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-17 05:48
+
+from django.db import migrations
+
+# триграммный индекс поиска для SQLite (на PostgreSQL — pg_trgm, миграция 0003);
+# отдельная таблица FTS5, а не external content с триггерами: Django пересоздаёт
+# shop_product при изменении схемы на SQLite, и триггеры бы пропадали
+SQLITE_SEARCH_SQL = [
+    "CREATE VIRTUAL TABLE shop_product_search USING fts5(document, tokenize='trigram')",
+    "INSERT INTO shop_product_search (rowid, document) SELECT id, search_document FROM shop_product",
+]
+
+SQLITE_SEARCH_REVERSE_SQL = [
+    "DROP TABLE IF EXISTS shop_product_search",
+]
+
+
+def create_sqlite_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in SQLITE_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_sqlite_search(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in SQLITE_SEARCH_REVERSE_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0012_remove_product_import_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sqlite_search, drop_sqlite_search),
+    ]
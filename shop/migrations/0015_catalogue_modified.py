@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-17 06:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_catalogue_version(apps, schema_editor):
+    # строка читается каждым запросом к каталогу: создаём её заранее
+    CatalogueVersion = apps.get_model("shop", "CatalogueVersion")
+    CatalogueVersion.objects.get_or_create(name="catalogue")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0014_catalogue_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogueversion',
+            name='modified_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Изменён'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at'], name='product_updated_idx'),
+        ),
+        migrations.RunPython(create_catalogue_version, migrations.RunPython.noop),
+    ]
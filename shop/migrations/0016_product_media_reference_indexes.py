@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-17 06:16
+
+import shop.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0015_catalogue_modified'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['image'], name='product_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(shop.models.ImageVariant('webp_80'), name='product_variant_webp_80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(shop.models.ImageVariant('jpeg_80'), name='product_variant_jpeg_80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(shop.models.ImageVariant('webp_160'), name='product_variant_webp_160_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(shop.models.ImageVariant('jpeg_160'), name='product_variant_jpeg_160_idx'),
+        ),
+    ]
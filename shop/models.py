@@ -1,6 +1,40 @@
+from decimal import Decimal
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from .search import product_search_document
+
+# ключи image_variants (см. shop.thumbnails.variant_key): по каждому есть
+# индекс, чтобы очистка media находила ссылки на копии без обхода таблицы
+IMAGE_VARIANT_KEYS = ("webp_80", "jpeg_80", "webp_160", "jpeg_160")
+
+
+class ImageVariant(models.Func):
+    """
+    Имя уменьшенной копии из image_variants по ключу. Ключ подставляется
+    в SQL литералом, а не параметром: иначе SQLite не узнает в запросе
+    выражение индекса.
+    """
+
+    output_field = models.CharField()
+
+    def __init__(self, key: str):
+        if key not in IMAGE_VARIANT_KEYS:
+            raise ValueError(f"Неизвестный ключ копии: {key!r}")
+        super().__init__(models.F("image_variants"))
+        self.key = key
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        return f"({column} ->> '{self.key}')", params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        return f"JSON_EXTRACT({column}, '$.{self.key}')", params
 
 
 class Category(models.Model):
@@ -46,6 +80,13 @@ class Product(models.Model):
         ("set", "набор"),
     ]
 
+    sku = models.CharField(
+        max_length=50,
+        unique=True,
+        null=True,
+        blank=True,
+        verbose_name="Артикул",
+    )
     name = models.CharField(max_length=200, verbose_name="Наименование товара")
     category = models.ForeignKey(
         Category, on_delete=models.PROTECT, related_name="products", verbose_name="Категория"
@@ -72,35 +113,121 @@ class Product(models.Model):
     )
     stock_quantity = models.PositiveIntegerField(default=0, verbose_name="Количество на складе")
     discount_percent = models.PositiveIntegerField(default=0, verbose_name="Скидка, %")
+    # итоговая цена хранится в БД, чтобы по ней можно было сортировать и
+    # фильтровать через индекс; умножение на 0.01 вместо деления на 100
+    # не даёт SQLite выполнить целочисленное деление, а Round — хранить
+    # неокруглённое значение, которое не совпадёт с курсором пагинации
+    final_price = models.GeneratedField(
+        expression=Round(
+            models.F("price")
+            * (models.Value(100) - models.F("discount_percent"))
+            * models.Value(Decimal("0.01")),
+            2,
+        ),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+        verbose_name="Итоговая цена",
+    )
     image = models.ImageField(
         upload_to="products/",
         blank=True,
         null=True,
         verbose_name="Фото товара",
     )
+    # уменьшенные копии фото: {"webp_80": путь, ...} (см. shop.thumbnails)
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Уменьшенные копии фото",
+    )
+    # фото, для которого последний раз создавались копии (успешно или нет):
+    # копии нужны, только если оно отличается от image, поэтому товары с
+    # отсутствующим или битым файлом не обрабатываются при каждом импорте
+    image_variants_source = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name="Фото уменьшенных копий",
+    )
+    search_document = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name="Поисковый документ",
+    )
+    # версия строки для кэша фрагментов (см. shop.caching): хранится в БД,
+    # чтобы изменения из команд и обработчика задач видели все процессы
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменён")
 
     class Meta:
         verbose_name = "Товар"
         verbose_name_plural = "Товары"
         ordering = ["name"]
+        indexes = [
+            # ключи для постраничного вывода каталога (см. shop.pagination)
+            models.Index(fields=["name", "id"], name="product_name_id_idx"),
+            models.Index(fields=["stock_quantity", "id"], name="product_stock_id_idx"),
+            models.Index(fields=["supplier", "name", "id"], name="product_supplier_name_id_idx"),
+            models.Index(fields=["final_price", "id"], name="product_final_price_id_idx"),
+            models.Index(
+                fields=["final_price", "id"],
+                condition=models.Q(discount_percent__gt=0),
+                name="product_discounted_price_idx",
+            ),
+            # последнее изменение товаров — отметка Last-Modified каталога
+            models.Index(fields=["updated_at"], name="product_updated_idx"),
+            # ссылки на файлы для очистки media (см. shop.media)
+            models.Index(fields=["image"], name="product_image_idx"),
+            *(
+                models.Index(ImageVariant(key), name=f"product_variant_{key}_idx")
+                for key in IMAGE_VARIANT_KEYS
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.search_document = product_search_document(self)
+        extra_fields = {"search_document", "updated_at"}
+        update_fields = kwargs.get("update_fields")
+        # копии старого фото больше не подходят: их сбрасываем здесь, чтобы
+        # это работало для формы, админки и shell; новые копии и удаление
+        # старого файла ставит в очередь сигнал post_save (shop.signals)
+        self._replaced_image = None
+        if not self._state.adding and (update_fields is None or "image" in update_fields):
+            stored = (
+                Product.objects.filter(pk=self.pk).values_list("image", "image_variants").first()
+            )
+            if stored is not None and (stored[0] or "") != (self.image.name or ""):
+                self._replaced_image = stored
+                self.image_variants = {}
+                extra_fields.add("image_variants")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *extra_fields}
+        updating = not self._state.adding
+        super().save(*args, **kwargs)
+        # final_price считает БД: при вставке он возвращается через RETURNING,
+        # а после UPDATE в объекте осталось бы старое значение
+        if updating and (update_fields is None or {"price", "discount_percent"} & set(update_fields)):
+            self.refresh_from_db(fields=["final_price"])
+
     @property
     def has_discount(self) -> bool:
         return self.discount_percent > 0
 
-    @property
-    def final_price(self):
-        if not self.has_discount:
-            return self.price
-        return self.price * (100 - self.discount_percent) / 100
-
     @property
     def is_out_of_stock(self) -> bool:
         return self.stock_quantity == 0
 
+    @property
+    def thumbnail(self) -> dict | None:
+        from .thumbnails import thumbnail_sources
+
+        return thumbnail_sources(self.image_variants)
+
 
 class UserRole(models.TextChoices):
     GUEST = "guest", "Гость"
@@ -133,10 +260,12 @@ class UserProfile(models.Model):
 
 
 class Order(models.Model):
+    # отдельный индекс по FK не нужен: его покрывает (customer, created_at)
     customer = models.ForeignKey(
         get_user_model(),
         on_delete=models.PROTECT,
         related_name="orders",
+        db_index=False,
         verbose_name="Клиент",
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
@@ -145,6 +274,10 @@ class Order(models.Model):
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="order_created_id_idx"),
+            models.Index(fields=["customer", "created_at"], name="order_customer_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"Заказ #{self.pk} от {self.created_at:%Y-%m-%d}"
@@ -154,10 +287,12 @@ class OrderItem(models.Model):
     order = models.ForeignKey(
         Order, on_delete=models.CASCADE, related_name="items", verbose_name="Заказ"
     )
+    # отдельный индекс по FK не нужен: его покрывает (product, order)
     product = models.ForeignKey(
         Product,
         on_delete=models.PROTECT,
         related_name="order_items",
+        db_index=False,
         verbose_name="Товар",
     )
     quantity = models.PositiveIntegerField(verbose_name="Количество")
@@ -173,8 +308,159 @@ class OrderItem(models.Model):
     class Meta:
         verbose_name = "Позиция заказа"
         verbose_name_plural = "Позиции заказа"
+        indexes = [
+            models.Index(fields=["product", "order"], name="orderitem_product_order_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.product} x {self.quantity}"
 
 
+class JobStatus(models.TextChoices):
+    PENDING = "pending", "Ожидает"
+    RUNNING = "running", "Выполняется"
+    DONE = "done", "Выполнена"
+    FAILED = "failed", "Ошибка"
+
+
+class Job(models.Model):
+    """Фоновая задача (см. shop.jobs и команду run_jobs)."""
+
+    name = models.CharField(max_length=100, verbose_name="Задача")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Параметры")
+    status = models.CharField(
+        max_length=10,
+        choices=JobStatus.choices,
+        default=JobStatus.PENDING,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Попыток")
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name="Максимум попыток")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Выполнить после")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Взята в работу")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершена")
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ["-created_at"]
+        indexes = [
+            # выборка очередной задачи обработчиком
+            models.Index(
+                fields=["run_after", "id"],
+                condition=models.Q(status="pending"),
+                name="job_pending_idx",
+            ),
+            models.Index(fields=["status", "finished_at"], name="job_status_finished_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk}"
+
+
+class ProductDailySales(models.Model):
+    """Продажи товара за день: свёртка OrderItem для аналитики (см. shop.analytics)."""
+
+    # отдельный индекс по FK не нужен: его покрывает (product, day)
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="+",
+        db_index=False,
+        verbose_name="Товар",
+    )
+    day = models.DateField(verbose_name="День")
+    quantity = models.PositiveBigIntegerField(default=0, verbose_name="Продано, шт.")
+    revenue = models.DecimalField(
+        max_digits=16, decimal_places=2, default=0, verbose_name="Выручка"
+    )
+
+    class Meta:
+        verbose_name = "Продажи товара за день"
+        verbose_name_plural = "Продажи товаров по дням"
+        constraints = [
+            models.UniqueConstraint(fields=["product", "day"], name="product_daily_sales_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["day"], name="product_daily_sales_day_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} за {self.day}: {self.quantity}"
+
+
+class SummaryDimension(models.TextChoices):
+    CATEGORY = "category", "Категория"
+    SUPPLIER = "supplier", "Поставщик"
+    MANUFACTURER = "manufacturer", "Производитель"
+    # строки отдельных товаров есть только для тех, что заканчиваются
+    PRODUCT = "product", "Товар"
+
+
+class InventorySummary(models.Model):
+    """Остатки и продажи по категории, поставщику или производителю."""
+
+    dimension = models.CharField(
+        max_length=20, choices=SummaryDimension.choices, verbose_name="Разрез"
+    )
+    object_id = models.PositiveBigIntegerField(verbose_name="ID")
+    name = models.CharField(max_length=200, verbose_name="Наименование")
+    product_count = models.PositiveIntegerField(default=0, verbose_name="Товаров")
+    out_of_stock_count = models.PositiveIntegerField(default=0, verbose_name="Нет на складе")
+    stock_quantity = models.PositiveBigIntegerField(default=0, verbose_name="Остаток, шт.")
+    stock_value = models.DecimalField(
+        max_digits=18, decimal_places=2, default=0, verbose_name="Стоимость остатка"
+    )
+    units_sold = models.PositiveBigIntegerField(default=0, verbose_name="Продано за период, шт.")
+    revenue = models.DecimalField(
+        max_digits=18, decimal_places=2, default=0, verbose_name="Выручка за период"
+    )
+
+    class Meta:
+        verbose_name = "Сводка по остаткам"
+        verbose_name_plural = "Сводка по остаткам"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "object_id"], name="inventory_summary_uniq"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_dimension_display()}: {self.name}"
+
+
+class AnalyticsCheckpoint(models.Model):
+    """Состояние обновления сводки: до какой позиции заказа свёрнуты продажи."""
+
+    name = models.CharField(max_length=50, unique=True, verbose_name="Сводка")
+    last_order_item_id = models.PositiveBigIntegerField(
+        default=0, verbose_name="Последняя учтённая позиция заказа"
+    )
+    refreshed_at = models.DateTimeField(null=True, blank=True, verbose_name="Обновлена")
+    duration = models.FloatField(default=0, verbose_name="Длительность обновления, с")
+
+    class Meta:
+        verbose_name = "Состояние сводки"
+        verbose_name_plural = "Состояния сводок"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CatalogueVersion(models.Model):
+    """Версия каталога: меняется при правке справочников, импорте и массовых изменениях."""
+
+    name = models.CharField(max_length=50, unique=True, verbose_name="Каталог")
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Версия")
+    # изменения, не оставляющие следа в updated_at товаров: удаление товара,
+    # правка справочника, импорт и массовое изменение
+    modified_at = models.DateTimeField(default=timezone.now, verbose_name="Изменён")
+
+    class Meta:
+        verbose_name = "Версия каталога"
+        verbose_name_plural = "Версии каталога"
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.version}"
@@ -0,0 +1,183 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    Exists,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .caching import bump_product_versions
+from .models import Order, OrderItem, Product
+
+
+def parse_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+def filter_by_created_date(queryset: QuerySet, date_from: date | None, date_to: date | None) -> QuerySet:
+    # диапазон по самой колонке, а не created_at__date: функция над колонкой
+    # не даёт использовать индекс (customer, created_at)
+    if date_from:
+        start = timezone.make_aware(datetime.combine(date_from, time.min))
+        queryset = queryset.filter(created_at__gte=start)
+    if date_to:
+        end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+        queryset = queryset.filter(created_at__lt=end)
+    return queryset
+
+
+def filter_by_product(queryset: QuerySet, product_id: int) -> QuerySet:
+    # EXISTS вместо JOIN: заказ не размножается по позициям и агрегаты
+    # по items остаются верными; подзапрос идёт по индексу (product, order)
+    return queryset.filter(
+        Exists(OrderItem.objects.filter(order=OuterRef("pk"), product_id=product_id))
+    )
+
+
+def annotate_totals(queryset: QuerySet) -> QuerySet:
+    # коррелированные подзапросы по индексу order_id вместо GROUP BY по всем
+    # заказам: при LIMIT они считаются только для строк текущей страницы,
+    # а сами заказы читаются по индексу (created_at, id) без сортировки
+    items = OrderItem.objects.filter(order=OuterRef("pk")).order_by().values("order")
+    line_total = ExpressionWrapper(
+        F("price_at_order")
+        * F("quantity")
+        * (Value(100) - F("discount_percent_at_order"))
+        * Value(Decimal("0.01")),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    return queryset.annotate(
+        item_count=Coalesce(Subquery(items.annotate(count=Count("pk")).values("count")), 0),
+        total=Subquery(items.annotate(total=Sum(line_total)).values("total")),
+    )
+
+
+# наибольшее значение bigint: большие числа БД не примет как ID
+MAX_ID = 2**63 - 1
+# остаток и количество в позиции — integer в PostgreSQL
+MAX_QUANTITY = 2**31 - 1
+
+
+def parse_id(value) -> int | None:
+    # isdecimal, а не isdigit: «²» — цифра, но int() её не разберёт
+    value = str(value).strip() if value is not None else ""
+    if not value.isdecimal():
+        return None
+    number = int(value)
+    return number if 0 < number <= MAX_ID else None
+
+
+def resolve_product_id(value: str | None) -> int | None:
+    # товар задаётся ID или артикулом
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.isdecimal():
+        return parse_id(value)
+    return Product.objects.filter(sku=value).values_list("pk", flat=True).first()
+
+
+def resolve_customer_id(value: str | None) -> int | None:
+    # клиент задаётся ID или логином (точное совпадение, по уникальному индексу)
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.isdecimal():
+        return parse_id(value)
+    return get_user_model().objects.filter(username=value).values_list("pk", flat=True).first()
+
+
+class OrderError(Exception):
+    pass
+
+
+class InvalidBasket(OrderError):
+    pass
+
+
+class InsufficientStock(OrderError):
+    def __init__(self, product_id: int, requested: int):
+        super().__init__(product_id, requested)
+        self.product_id = product_id
+        self.requested = requested
+
+
+def normalize_basket(lines) -> dict[int, int]:
+    # [(product_id, quantity), ...] -> {product_id: суммарное количество}
+    basket: dict[int, int] = {}
+    for product_id, quantity in lines:
+        try:
+            product_id, quantity = int(product_id), int(quantity)
+        except (TypeError, ValueError) as exc:
+            raise InvalidBasket("Товар и количество должны быть целыми числами.") from exc
+        # значения вне диапазона колонок БД отклонила бы ошибкой запроса (500)
+        if not 0 < product_id <= MAX_ID:
+            raise InvalidBasket(f"Товар #{product_id} не найден.")
+        if quantity <= 0:
+            raise InvalidBasket("Количество должно быть положительным.")
+        quantity += basket.get(product_id, 0)
+        if quantity > MAX_QUANTITY:
+            raise InvalidBasket(f"Количество не может превышать {MAX_QUANTITY}.")
+        basket[product_id] = quantity
+    if not basket:
+        raise InvalidBasket("Корзина пуста.")
+    return basket
+
+
+def place_order(customer, lines) -> Order:
+    """
+    Оформляет заказ и списывает остатки в одной транзакции.
+
+    Каждая позиция списывается условным UPDATE ... WHERE stock_quantity >= n,
+    поэтому при параллельных заказах остаток не уходит в минус: проигравшая
+    транзакция получает 0 обновлённых строк и откатывается целиком.
+    """
+    basket = normalize_basket(lines)
+
+    with transaction.atomic():
+        # строки блокируются в порядке id, чтобы встречные заказы не взаимоблокировались
+        for product_id in sorted(basket):
+            quantity = basket[product_id]
+            updated = Product.objects.filter(pk=product_id, stock_quantity__gte=quantity).update(
+                stock_quantity=F("stock_quantity") - quantity
+            )
+            if not updated:
+                if not Product.objects.filter(pk=product_id).exists():
+                    raise InvalidBasket(f"Товар #{product_id} не найден.")
+                raise InsufficientStock(product_id, quantity)
+
+        # строки уже заблокированы нашим UPDATE: цена и скидка не изменятся до COMMIT
+        products = Product.objects.filter(pk__in=basket).only("id", "price", "discount_percent")
+        order = Order.objects.create(customer=customer)
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    product_id=product.pk,
+                    quantity=basket[product.pk],
+                    price_at_order=product.price,
+                    discount_percent_at_order=product.discount_percent,
+                )
+                for product in products
+            ]
+        )
+        # update() не посылает post_save: строки каталога с остатком устарели
+        transaction.on_commit(lambda: bump_product_versions(basket))
+    return order
@@ -0,0 +1,195 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+PRODUCTS_PER_PAGE = 50
+# меньшие таблицы дешевле посчитать точно, чем показать приблизительное число
+ESTIMATED_COUNT_THRESHOLD = 10_000
+
+PRODUCT_ORDERINGS = {
+    "": ("name", "id"),
+    "stock_asc": ("stock_quantity", "id"),
+    "stock_desc": ("-stock_quantity", "-id"),
+    "price_asc": ("final_price", "id"),
+    "price_desc": ("-final_price", "-id"),
+    # доступна только вместе с поиском: search_rank добавляет search_products
+    "relevance": ("-search_rank", "id"),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    ordering: tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+def encode_cursor(values: list, reverse: bool = False) -> str:
+    # default=str: Decimal и datetime передаются строками, ORM разберёт их при фильтрации
+    payload = json.dumps(
+        {"v": values, "r": reverse}, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> tuple[list, bool]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["v"]
+        reverse = bool(payload.get("r", False))
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    return values, reverse
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод методом поиска по ключу (keyset / seek pagination).
+
+    Вместо OFFSET каждая страница ищется условием «строго после последней
+    строки предыдущей страницы», поэтому стоимость N-й страницы совпадает
+    со стоимостью первой. Последнее поле ``ordering`` должно быть уникальным
+    (обычно ``id``), чтобы курсор однозначно задавал позицию.
+    """
+
+    def __init__(self, queryset: QuerySet, ordering: tuple[str, ...], per_page: int = PRODUCTS_PER_PAGE):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+
+    @staticmethod
+    def _field_name(order: str) -> str:
+        return order.lstrip("-")
+
+    @staticmethod
+    def _flip(order: str) -> str:
+        return order[1:] if order.startswith("-") else f"-{order}"
+
+    def _seek_filter(self, ordering: tuple[str, ...], values: list) -> Q:
+        # (a, b, c) > (x, y, z) раскрывается в
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        condition = Q()
+        for position, order in enumerate(ordering):
+            lookup = "lt" if order.startswith("-") else "gt"
+            term = Q(**{f"{self._field_name(order)}__{lookup}": values[position]})
+            for previous, value in zip(ordering[:position], values[:position]):
+                term &= Q(**{self._field_name(previous): value})
+            condition |= term
+        # по дизъюнкции планировщик не может начать чтение индекса с курсора;
+        # избыточное условие a >= x задаёт ему начало диапазона
+        first = ordering[0]
+        bound = "lte" if first.startswith("-") else "gte"
+        return Q(**{f"{self._field_name(first)}__{bound}": values[0]}) & condition
+
+    def _row_key(self, obj) -> list:
+        return [getattr(obj, self._field_name(order)) for order in self.ordering]
+
+    def _page_queryset(self, cursor: str | None) -> tuple[QuerySet, list | None, bool]:
+        values, reverse = None, False
+        if cursor:
+            values, reverse = decode_cursor(cursor, len(self.ordering))
+
+        ordering = tuple(self._flip(order) for order in self.ordering) if reverse else self.ordering
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            try:
+                queryset = queryset.filter(self._seek_filter(ordering, values))
+            except (TypeError, ValueError) as exc:
+                raise InvalidCursor(cursor) from exc
+        return queryset[: self.per_page + 1], values, reverse
+
+    def _build_page(self, rows: list, values: list | None, reverse: bool) -> KeysetPage:
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if reverse:
+            rows.reverse()
+
+        page = KeysetPage(object_list=rows, ordering=self.ordering)
+        if not rows:
+            return page
+
+        if has_more or reverse:
+            page.next_cursor = encode_cursor(self._row_key(rows[-1]))
+        if values is not None and (has_more or not reverse):
+            page.previous_cursor = encode_cursor(self._row_key(rows[0]), reverse=True)
+        return page
+
+    def get_page(self, cursor: str | None) -> KeysetPage:
+        queryset, values, reverse = self._page_queryset(cursor)
+        return self._build_page(list(queryset), values, reverse)
+
+    async def aget_page(self, cursor: str | None) -> KeysetPage:
+        queryset, values, reverse = self._page_queryset(cursor)
+        return self._build_page([row async for row in queryset], values, reverse)
+
+
+def estimated_count(queryset: QuerySet) -> int | None:
+    """
+    Число строк таблицы по статистике планировщика PostgreSQL
+    (pg_class.reltuples, обновляется VACUUM/ANALYZE); для маленькой или
+    не проанализированной таблицы — точный COUNT(*) тем же запросом.
+    None, если оценка неприменима: другая СУБД или фильтры.
+    """
+    query = queryset.query
+    if query.where or query.distinct or query.combinator or query.is_sliced:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    # COALESCE вычисляет COUNT(*), только если оценки нет: один запрос,
+    # как и у обычного Paginator; reltuples = -1, пока таблицу не анализировали
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COALESCE("
+            f"(SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s) AND reltuples >= %s), "
+            f"(SELECT COUNT(*) FROM {table}))",
+            [table, ESTIMATED_COUNT_THRESHOLD],
+        )
+        return cursor.fetchone()[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator для списков админки по большим таблицам: точный COUNT(*) всей
+    таблицы в PostgreSQL читает её целиком, поэтому без фильтров число строк
+    оценивается (estimated_count). Отфильтрованный список считается точно.
+    В обоих случаях число строк — один запрос, как у обычного Paginator.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        estimate = estimated_count(self.object_list)
+        return super().count if estimate is None else estimate
@@ -0,0 +1,149 @@
+from django.db import connection
+from django.db.models import Case, FloatField, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+SEARCH_SEPARATOR = "\n"
+SEARCH_CONFIG = "russian"
+TRIGRAM_SIZE = 3
+# резервный индекс для SQLite (без pg_trgm), см. index_search_documents
+SEARCH_INDEX_TABLE = "shop_product_search"
+# строк на запрос к индексу: старые сборки SQLite ограничивают число параметров 999
+SEARCH_INDEX_CHUNK_SIZE = 500
+
+
+def normalize(text) -> str:
+    return str(text or "").strip().lower()
+
+
+def build_search_document(*parts) -> str:
+    # поле с разделителем строк: подстрока запроса не может «склеить» два поля,
+    # поэтому contains по документу совпадает с OR из icontains по каждому полю
+    return SEARCH_SEPARATOR.join(normalize(part) for part in parts)
+
+
+def product_search_document(product) -> str:
+    return build_search_document(
+        product.name,
+        product.description,
+        product.category.name,
+        product.manufacturer.name,
+        product.supplier.name,
+    )
+
+
+def index_search_documents(products) -> None:
+    """
+    Записывает поисковые документы в индекс SQLite (пары ``(pk, документ)``).
+
+    Индекс — таблица FTS5 с токенизатором trigram (миграция 0013) в той же
+    БД, поэтому записи из воркера, импорта и других процессов сразу видны
+    всем, а откат транзакции откатывает и индекс.
+    """
+    if connection.vendor != "sqlite":
+        return
+    rows = list(products)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), SEARCH_INDEX_CHUNK_SIZE):
+            chunk = rows[start : start + SEARCH_INDEX_CHUNK_SIZE]
+            _delete_documents(cursor, [pk for pk, _ in chunk])
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_INDEX_TABLE} (rowid, document) VALUES (%s, %s)", chunk
+            )
+
+
+def unindex_products(pks) -> None:
+    if connection.vendor != "sqlite":
+        return
+    pks = list(pks)
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), SEARCH_INDEX_CHUNK_SIZE):
+            _delete_documents(cursor, pks[start : start + SEARCH_INDEX_CHUNK_SIZE])
+
+
+def _delete_documents(cursor, pks: list[int]) -> None:
+    placeholders = ", ".join(["%s"] * len(pks))
+    cursor.execute(f"DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid IN ({placeholders})", pks)
+
+
+def search_products(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Отбирает товары, у которых запрос входит в любое текстовое поле,
+    и добавляет аннотацию ``search_rank`` для сортировки по релевантности.
+    """
+    term = normalize(query)
+    if not term:
+        return queryset
+
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVectorField,
+            TrigramWordSimilarity,
+        )
+
+        # search_vector — генерируемая колонка, создаётся только на PostgreSQL
+        # (см. миграцию 0003), поэтому в модели её нет
+        vector = RawSQL(
+            f"{connection.ops.quote_name(queryset.model._meta.db_table)}.search_vector",
+            [],
+            output_field=SearchVectorField(),
+        )
+        rank = SearchRank(
+            vector, SearchQuery(term, config=SEARCH_CONFIG, search_type="plain")
+        ) + TrigramWordSimilarity(term, "search_document")
+        # double precision: значение ранга попадает в курсор пагинации и должно
+        # без потерь пережить округление при сравнении
+        rank = Cast(rank, FloatField())
+        # LIKE по search_document обслуживается GIN-индексом gin_trgm_ops
+        return queryset.filter(search_document__contains=term).annotate(
+            search_rank=rank
+        )
+
+    # SQLite: подстрока ищется по триграммному индексу FTS5 подзапросом, без
+    # списка id в памяти процесса; contains по документу отсекает строки
+    # индекса, оставшиеся от удалённых товаров (id в SQLite переиспользуются)
+    products = queryset.filter(search_document__contains=term)
+    if (
+        connection.vendor == "sqlite"
+        and len(term) >= TRIGRAM_SIZE
+        and SEARCH_SEPARATOR not in term
+    ):
+        phrase = '"%s"' % term.replace('"', '""')
+        products = products.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH %s",
+                [phrase],
+            )
+        )
+    return products.annotate(
+        search_rank=Case(
+            When(name__icontains=term, then=Value(1.0)),
+            default=Value(0.1),
+            output_field=FloatField(),
+        )
+    )
+
+
+def refresh_search_documents(queryset: QuerySet, batch_size: int = 1000) -> int:
+    products = queryset.select_related("category", "manufacturer", "supplier").order_by("pk")
+    updated = 0
+    batch = []
+    for product in products.iterator(chunk_size=batch_size):
+        product.search_document = product_search_document(product)
+        batch.append(product)
+        if len(batch) >= batch_size:
+            updated += _save_search_documents(batch)
+            batch.clear()
+    if batch:
+        updated += _save_search_documents(batch)
+    return updated
+
+
+def _save_search_documents(products: list) -> int:
+    from .models import Product
+
+    updated = Product.objects.bulk_update(products, ["search_document"])
+    index_search_documents((product.pk, product.search_document) for product in products)
+    return updated
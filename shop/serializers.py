@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+from rest_framework import serializers
+
+
+@dataclass(frozen=True)
+class ProductField:
+    get: Callable
+    columns: tuple[str, ...]
+    related: tuple[str, ...] = field(default_factory=tuple)
+
+
+def _decimal(value) -> str | None:
+    return None if value is None else str(value)
+
+
+# имя поля API -> как получить значение и какие колонки для этого нужны;
+# по колонкам строится only(), поэтому ?fields= сокращает и SELECT
+PRODUCT_FIELDS = {
+    "id": ProductField(lambda p: p.pk, ("id",)),
+    "sku": ProductField(lambda p: p.sku, ("sku",)),
+    "name": ProductField(lambda p: p.name, ("name",)),
+    "category": ProductField(lambda p: p.category.name, ("category__name",), ("category",)),
+    "description": ProductField(lambda p: p.description, ("description",)),
+    "manufacturer": ProductField(
+        lambda p: p.manufacturer.name, ("manufacturer__name",), ("manufacturer",)
+    ),
+    "supplier": ProductField(lambda p: p.supplier.name, ("supplier__name",), ("supplier",)),
+    "price": ProductField(lambda p: _decimal(p.price), ("price",)),
+    "final_price": ProductField(lambda p: _decimal(p.final_price), ("final_price",)),
+    "discount_percent": ProductField(lambda p: p.discount_percent, ("discount_percent",)),
+    "unit": ProductField(lambda p: p.unit, ("unit",)),
+    "stock_quantity": ProductField(lambda p: p.stock_quantity, ("stock_quantity",)),
+    "image": ProductField(lambda p: p.image.url if p.image else None, ("image",)),
+}
+
+
+def parse_fields(value: str | None) -> list[str]:
+    if not value:
+        return list(PRODUCT_FIELDS)
+    requested = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in PRODUCT_FIELDS]
+    if unknown:
+        raise serializers.ValidationError(
+            {"fields": f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(PRODUCT_FIELDS)}"}
+        )
+    # id нужен всегда: по нему строится курсор пагинации
+    return list(dict.fromkeys(["id", *requested]))
+
+
+class ProductListSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор без ModelSerializer: нет интроспекции модели, построения
+    Field-объектов и их вызова на каждое поле каждой строки — значения
+    читаются готовыми функциями из PRODUCT_FIELDS.
+    Набор полей передаётся через context["fields"].
+    """
+
+    def to_representation(self, instance) -> dict:
+        names = self.context.get("fields") or PRODUCT_FIELDS
+        return {name: PRODUCT_FIELDS[name].get(instance) for name in names}
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_catalogue_version, mark_catalogue_modified
+from .jobs import enqueue
+from .models import Category, Manufacturer, Product, Supplier
+from .search import index_search_documents, refresh_search_documents, unindex_products
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance: Product, **kwargs):
+    index_search_documents([(instance.pk, instance.search_document)])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance: Product, **kwargs):
+    unindex_products([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_save, sender=Supplier)
+def reindex_reference_products(sender, instance, created: bool, **kwargs):
+    # название справочника входит в поисковый документ товаров
+    if created:
+        return
+    refresh_search_documents(instance.products.all())
+
+
+@receiver(post_delete, sender=Product)
+def mark_product_deleted(sender, instance: Product, **kwargs):
+    # при сохранении ключ строки и отметку изменения каталога сдвигает
+    # updated_at товара, а удаление следа в таблице товаров не оставляет
+    mark_catalogue_modified()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Manufacturer)
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Manufacturer)
+@receiver(post_delete, sender=Supplier)
+def invalidate_catalogue(sender, **kwargs):
+    # название справочника выводится в строках всех его товаров
+    bump_catalogue_version()
+
+
+@receiver(post_save, sender=Product)
+def schedule_image_jobs(sender, instance: Product, created: bool, **kwargs):
+    # работа с файлами выполняется в фоне (команда run_jobs), время
+    # сохранения не зависит от размера фото и скорости диска
+    replaced = getattr(instance, "_replaced_image", None)
+    if replaced is not None:
+        name, variants = replaced
+        if name:
+            enqueue("delete_replaced_image", name=name, variants=variants)
+    if instance.image and (created or replaced is not None):
+        enqueue("product_thumbnails", product_id=instance.pk)
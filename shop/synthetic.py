@@ -0,0 +1,191 @@
+"""
+Воспроизводимые синтетические данные для тестов и замеров: справочники,
+товары, пользователи всех ролей и заказы с позициями. Всё создаётся через
+bulk_create, поэтому тысячи строк записываются за доли секунды.
+"""
+
+import csv
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .importing import IMPORT_HEADERS
+from .models import Category, Manufacturer, Order, OrderItem, Product, Supplier, UserProfile, UserRole
+from .search import index_search_documents, product_search_document
+
+UNITS = ["pcs", "pack", "set"]
+IMPORT_UNITS = ["шт.", "уп.", "набор"]
+PASSWORD = "password"
+
+
+@dataclass
+class SyntheticData:
+    users: dict[str, object] = field(default_factory=dict)
+    products: int = 0
+    orders: int = 0
+
+
+def _names(model, prefix: str, count: int):
+    model.objects.bulk_create(
+        [model(name=f"{prefix} {i}") for i in range(count)], ignore_conflicts=True
+    )
+    return list(model.objects.filter(name__startswith=f"{prefix} ").order_by("pk"))
+
+
+def create_role_users(prefix: str = "synthetic") -> dict[str, object]:
+    """По пользователю на каждую роль, кроме гостя; администратор — сотрудник с доступом в админку."""
+    User = get_user_model()
+    # один хэш на всех: make_password намеренно медленный
+    password = make_password(PASSWORD)
+    users = {}
+    for role in (UserRole.CLIENT, UserRole.MANAGER, UserRole.ADMIN):
+        is_admin = role == UserRole.ADMIN
+        user, _ = User.objects.get_or_create(
+            username=f"{prefix}-{role}",
+            defaults={"password": password, "is_staff": is_admin, "is_superuser": is_admin},
+        )
+        UserProfile.objects.get_or_create(
+            user=user, defaults={"full_name": f"{role.label} {prefix}", "role": role}
+        )
+        users[role] = user
+    return users
+
+
+def create_customers(count: int, prefix: str = "synthetic-client") -> list:
+    User = get_user_model()
+    password = make_password(PASSWORD)
+    start = User.objects.filter(username__startswith=f"{prefix}-").count()
+    users = User.objects.bulk_create(
+        [User(username=f"{prefix}-{i}", password=password) for i in range(start, start + count)]
+    )
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user, full_name=f"Клиент {user.username}") for user in users]
+    )
+    return users
+
+
+def create_products(
+    count: int,
+    suppliers: int = 20,
+    categories: int = 10,
+    manufacturers: int = 30,
+    seed: int = 1,
+    batch_size: int = 1000,
+) -> int:
+    rnd = random.Random(seed)
+    category_rows = _names(Category, "Категория", categories)
+    manufacturer_rows = _names(Manufacturer, "Производитель", manufacturers)
+    supplier_rows = _names(Supplier, "Поставщик", suppliers)
+    start = Product.objects.count()
+
+    products = []
+    for i in range(start, start + count):
+        product = Product(
+            sku=f"SYN{seed:02d}-{i:07d}",
+            name=f"Товар {i}",
+            description=f"Описание товара {i}",
+            category=rnd.choice(category_rows),
+            manufacturer=rnd.choice(manufacturer_rows),
+            supplier=rnd.choice(supplier_rows),
+            price=Decimal(rnd.randint(100, 100_000)) / 100,
+            unit=rnd.choice(UNITS),
+            stock_quantity=rnd.randint(0, 500),
+            discount_percent=rnd.choice([0, 0, 0, 5, 10, 20]),
+        )
+        product.search_document = product_search_document(product)
+        products.append(product)
+    Product.objects.bulk_create(products, batch_size=batch_size)
+    index_search_documents((product.pk, product.search_document) for product in products)
+    return count
+
+
+def create_orders(
+    count: int, customers: list, items_per_order: int = 3, seed: int = 1, batch_size: int = 1000
+) -> int:
+    rnd = random.Random(seed)
+    product_rows = list(Product.objects.values_list("pk", "price", "discount_percent"))
+    if not product_rows or not customers:
+        return 0
+
+    orders = Order.objects.bulk_create(
+        [Order(customer=rnd.choice(customers)) for _ in range(count)], batch_size=batch_size
+    )
+    # created_at — auto_now_add, поэтому даты разносятся отдельным запросом
+    now = timezone.now()
+    for order in orders:
+        order.created_at = now - timedelta(minutes=rnd.randint(0, 60 * 24 * 365))
+    Order.objects.bulk_update(orders, ["created_at"], batch_size=batch_size)
+
+    items = []
+    for order in orders:
+        for pk, price, discount in rnd.sample(product_rows, min(items_per_order, len(product_rows))):
+            items.append(
+                OrderItem(
+                    order=order,
+                    product_id=pk,
+                    quantity=rnd.randint(1, 5),
+                    price_at_order=price,
+                    discount_percent_at_order=discount,
+                )
+            )
+    OrderItem.objects.bulk_create(items, batch_size=batch_size)
+    return count
+
+
+def seed_shop(
+    products: int = 1000,
+    suppliers: int = 20,
+    customers: int = 50,
+    orders: int = 500,
+    items_per_order: int = 3,
+    seed: int = 1,
+) -> SyntheticData:
+    data = SyntheticData(users=create_role_users())
+    data.products = create_products(products, suppliers=suppliers, seed=seed)
+    buyers = [data.users[UserRole.CLIENT], *create_customers(customers)]
+    data.orders = create_orders(orders, buyers, items_per_order=items_per_order, seed=seed)
+    return data
+
+
+def import_rows(count: int, seed: int = 1):
+    """Строки файла импорта в порядке столбцов IMPORT_HEADERS."""
+    rnd = random.Random(seed)
+    for i in range(count):
+        yield [
+            f"SKU{i:07d}",
+            f"Категория {i % 30}",
+            f"Товар {i}",
+            f"Производитель {i % 200}",
+            f"Поставщик {i % 50}",
+            round(rnd.uniform(1, 1000), 2),
+            rnd.choice(IMPORT_UNITS),
+            rnd.randint(0, 500),
+            rnd.randint(0, 30),
+            f"Описание товара {i}",
+            None,
+        ]
+
+
+def write_import_file(path: Path, count: int, seed: int = 1) -> None:
+    """Файл для import_products: .xlsx, .csv или .tsv по расширению."""
+    if path.suffix == ".xlsx":
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Product")
+        ws.append(IMPORT_HEADERS)
+        for row in import_rows(count, seed):
+            ws.append(row)
+        wb.save(path)
+        return
+    delimiter = "\t" if path.suffix == ".tsv" else ","
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, delimiter=delimiter)
+        writer.writerow(IMPORT_HEADERS)
+        for row in import_rows(count, seed):
+            writer.writerow(["" if value is None else value for value in row])
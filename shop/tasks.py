@@ -0,0 +1,27 @@
+from django.core.files.storage import default_storage
+
+from .analytics import REFRESH_JOB, refresh_inventory_summary
+from .jobs import job
+from .models import Product
+from .thumbnails import delete_variants, refresh_product_variants
+
+
+@job("product_thumbnails")
+def product_thumbnails(product_id: int) -> None:
+    product = Product.objects.filter(pk=product_id).only("id", "image", "image_variants", "image_variants_source").first()
+    if product is not None:
+        refresh_product_variants(product)
+
+
+@job("delete_replaced_image")
+def delete_replaced_image(name: str, variants: dict) -> None:
+    # одно и то же фото может быть у нескольких товаров (например, после импорта)
+    if Product.objects.filter(image=name).exists():
+        return
+    delete_variants(variants, name)
+    default_storage.delete(name)
+
+
+@job(REFRESH_JOB)
+def refresh_inventory(full: bool = False) -> None:
+    refresh_inventory_summary(full=full)
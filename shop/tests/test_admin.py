@@ -0,0 +1,105 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from shop.models import Order, Product, UserRole
+from shop.pagination import ESTIMATED_COUNT_THRESHOLD, EstimatedCountPaginator, estimated_count
+from shop.synthetic import seed_shop
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_shop(products=30, orders=20, customers=3)
+
+    def setUp(self):
+        self.client.force_login(self.data.users[UserRole.ADMIN])
+
+    def changelist(self, model: str, **params) -> list:
+        response = self.client.get(reverse(f"admin:shop_{model}_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return list(response.context["cl"].result_list)
+
+    def test_product_search_by_text_and_sku(self):
+        product = Product.objects.order_by("pk").last()
+        Product.objects.filter(pk=product.pk).update(sku="АРТ-77")
+
+        self.assertEqual(self.changelist("product", q="АРТ-77"), [product])
+        found = self.changelist("product", q=product.name)
+        self.assertIn(product, found)
+        self.assertTrue(all(product.name.lower() in item.name.lower() for item in found))
+
+    def test_order_search_by_number_and_username(self):
+        order = Order.objects.select_related("customer").order_by("pk").first()
+
+        self.assertIn(order, self.changelist("order", q=str(order.pk)))
+        by_customer = self.changelist("order", q=order.customer.username)
+        self.assertEqual(
+            {item.pk for item in by_customer},
+            set(Order.objects.filter(customer=order.customer).values_list("pk", flat=True)),
+        )
+
+    def test_order_search_ignores_non_decimal_digits(self):
+        for term in ("²", str(2**63)):
+            with self.subTest(term=term):
+                self.assertEqual(self.changelist("order", q=term), [])
+
+    def test_order_filter_by_customer_id_or_login(self):
+        order = Order.objects.select_related("customer").order_by("pk").first()
+        expected = set(Order.objects.filter(customer=order.customer).values_list("pk", flat=True))
+
+        for value in (str(order.customer_id), order.customer.username):
+            with self.subTest(value=value):
+                self.assertEqual({item.pk for item in self.changelist("order", customer=value)}, expected)
+        self.assertEqual(self.changelist("order", customer="нет-такого"), [])
+
+    def test_order_list_ignores_non_decimal_digits(self):
+        # «²».isdigit() истинно, но int() его не разбирает; 2**63 не помещается в bigint
+        for value in ("²", str(2**63)):
+            with self.subTest(value=value):
+                self.assertEqual(self.changelist("order", customer=value), [])
+                self.assertEqual(self.changelist("order", product=value), [])
+                self.client.force_login(self.data.users[UserRole.MANAGER])
+                response = self.client.get(reverse("shop:order_list"), {"customer": value, "product": value})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context["orders"]), [])
+                self.client.force_login(self.data.users[UserRole.ADMIN])
+
+    def test_order_page_does_not_list_catalogue(self):
+        order = Order.objects.filter(items__isnull=False).order_by("pk").first()
+        in_order = set(order.items.values_list("product__name", flat=True))
+        other = Product.objects.exclude(name__in=in_order).order_by("pk").first()
+
+        response = self.client.get(reverse("admin:shop_order_change", args=[order.pk]))
+
+        for name in in_order:
+            self.assertContains(response, name)
+        self.assertNotContains(response, f">{other.name}</option>")
+
+    def test_count_is_exact_without_statistics(self):
+        # на SQLite и для отфильтрованных списков оценка не применяется
+        self.assertIsNone(estimated_count(Product.objects.all()))
+        paginator = EstimatedCountPaginator(Product.objects.filter(stock_quantity__gte=0), 10)
+        self.assertEqual(paginator.count, 30)
+
+
+@skipUnless(connection.vendor == "postgresql", "оценка числа строк есть только в PostgreSQL")
+class EstimatedCountTests(TestCase):
+    def test_unfiltered_large_table_uses_statistics(self):
+        seed_shop(products=ESTIMATED_COUNT_THRESHOLD + 100, orders=0, customers=1)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE shop_product")
+
+        with self.assertNumQueries(1):
+            estimate = EstimatedCountPaginator(Product.objects.all(), 10).count
+
+        self.assertAlmostEqual(estimate, Product.objects.count(), delta=ESTIMATED_COUNT_THRESHOLD // 10)
+        self.assertIsNone(estimated_count(Product.objects.filter(stock_quantity__gt=0)))
+
+    def test_small_table_is_counted_in_the_same_query(self):
+        seed_shop(products=30, orders=0, customers=1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Product.objects.all(), 10).count, 30)
@@ -0,0 +1,209 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from shop.analytics import (
+    REFRESH_JOB,
+    inventory_report,
+    refresh_inventory_summary,
+    request_refresh_if_stale,
+)
+from shop.models import (
+    Category,
+    InventorySummary,
+    Job,
+    Manufacturer,
+    Order,
+    OrderItem,
+    Product,
+    ProductDailySales,
+    Supplier,
+    SummaryDimension,
+    UserProfile,
+    UserRole,
+)
+
+
+class InventoryAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = get_user_model().objects.create_user("client", password="x")
+        cls.category = Category.objects.create(name="Бумага")
+        manufacturer = Manufacturer.objects.create(name="SvetoCopy")
+        supplier = Supplier.objects.create(name="ОфисМир")
+        cls.paper = Product.objects.create(
+            name="Бумага A4",
+            category=cls.category,
+            manufacturer=manufacturer,
+            supplier=supplier,
+            price=Decimal("300.00"),
+            stock_quantity=10,
+        )
+        cls.folder = Product.objects.create(
+            name="Папка",
+            category=Category.objects.create(name="Папки"),
+            manufacturer=manufacturer,
+            supplier=supplier,
+            price=Decimal("50.00"),
+            discount_percent=10,
+            stock_quantity=0,
+        )
+
+    def order(self, product, quantity: int, days_ago: int = 1) -> None:
+        order = Order.objects.create(customer=self.customer)
+        Order.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+        OrderItem.objects.create(
+            order=order,
+            product=product,
+            quantity=quantity,
+            price_at_order=product.price,
+            discount_percent_at_order=product.discount_percent,
+        )
+
+    def summary(self, dimension, object_id) -> InventorySummary:
+        return InventorySummary.objects.get(dimension=dimension, object_id=object_id)
+
+    def test_stock_value_and_sales_per_dimension(self):
+        self.order(self.paper, 3)
+        self.order(self.folder, 2)
+        # за пределами окна продаж: в скорость не входит
+        self.order(self.paper, 100, days_ago=90)
+
+        refresh_inventory_summary()
+
+        paper = self.summary(SummaryDimension.CATEGORY, self.category.pk)
+        self.assertEqual(paper.stock_quantity, 10)
+        self.assertEqual(paper.stock_value, Decimal("3000.00"))
+        self.assertEqual(paper.units_sold, 3)
+        self.assertEqual(paper.revenue, Decimal("900.00"))
+        supplier = self.summary(SummaryDimension.SUPPLIER, self.paper.supplier_id)
+        self.assertEqual(supplier.product_count, 2)
+        self.assertEqual(supplier.out_of_stock_count, 1)
+        self.assertEqual(supplier.units_sold, 5)
+        self.assertEqual(supplier.revenue, Decimal("990.00"))
+        self.assertEqual(ProductDailySales.objects.count(), 2)
+
+    def test_refresh_is_incremental(self):
+        self.order(self.paper, 3)
+        self.assertEqual(refresh_inventory_summary().order_items, 1)
+
+        self.order(self.paper, 2)
+        self.assertEqual(refresh_inventory_summary().order_items, 1)
+        self.assertEqual(refresh_inventory_summary().order_items, 0)
+
+        self.assertEqual(ProductDailySales.objects.get().quantity, 5)
+        self.assertEqual(self.summary(SummaryDimension.CATEGORY, self.category.pk).units_sold, 5)
+
+    def test_incremental_refresh_adds_to_matching_product_and_day(self):
+        self.order(self.paper, 3, days_ago=1)
+        self.order(self.folder, 2, days_ago=2)
+        refresh_inventory_summary()
+
+        self.order(self.paper, 2, days_ago=1)
+        self.order(self.paper, 1, days_ago=2)
+        self.order(self.folder, 4, days_ago=1)
+        with mock.patch("shop.analytics.MERGE_BATCH", 1):
+            refresh_inventory_summary()
+
+        today = timezone.localdate()
+        sales = {
+            (row.product_id, (today - row.day).days): row.quantity
+            for row in ProductDailySales.objects.all()
+        }
+        self.assertEqual(
+            sales,
+            {(self.paper.pk, 1): 5, (self.paper.pk, 2): 1, (self.folder.pk, 1): 4, (self.folder.pk, 2): 2},
+        )
+
+    def test_recent_order_items_wait_for_lag(self):
+        self.order(self.paper, 3, days_ago=0)
+
+        self.assertEqual(refresh_inventory_summary().order_items, 0)
+        self.assertEqual(refresh_inventory_summary(lag=timedelta(0)).order_items, 1)
+
+    def test_full_refresh_drops_deleted_orders(self):
+        self.order(self.paper, 3)
+        refresh_inventory_summary()
+        Order.objects.all().delete()
+
+        refresh_inventory_summary(full=True)
+
+        self.assertFalse(ProductDailySales.objects.exists())
+        self.assertEqual(self.summary(SummaryDimension.CATEGORY, self.category.pk).units_sold, 0)
+
+    def test_low_stock_lists_products_running_out(self):
+        # 30 шт. за 30 дней — 1 в день, остатка 10 хватит на 10 дней
+        self.order(self.paper, 30)
+        self.order(self.folder, 1)
+
+        refresh_inventory_summary()
+        report = inventory_report()
+
+        self.assertEqual([row["id"] for row in report["low_stock"]], [self.folder.pk, self.paper.pk])
+        paper = report["low_stock"][1]
+        self.assertEqual(paper["units_per_day"], 1.0)
+        self.assertEqual(paper["days_of_stock"], 10.0)
+
+    def test_report_does_not_write(self):
+        report = inventory_report()
+
+        self.assertTrue(report["stale"])
+        self.assertFalse(report["refresh_pending"])
+        self.assertFalse(Job.objects.exists())
+
+    def test_stale_summary_requests_refresh_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(request_refresh_if_stale())
+        self.assertFalse(request_refresh_if_stale())
+        self.assertEqual(Job.objects.filter(name=REFRESH_JOB).count(), 1)
+        self.assertTrue(inventory_report()["refresh_pending"])
+
+    def test_fresh_summary_does_not_request_refresh(self):
+        refresh_inventory_summary()
+
+        self.assertFalse(inventory_report()["stale"])
+        self.assertFalse(request_refresh_if_stale())
+        self.assertFalse(Job.objects.exists())
+
+
+class InventoryViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.manager = User.objects.create_user("manager", password="x")
+        UserProfile.objects.create(user=cls.manager, full_name="Менеджер", role=UserRole.MANAGER)
+        cls.client_user = User.objects.create_user("client", password="x")
+
+    def test_manager_sees_page_and_json(self):
+        refresh_inventory_summary()
+        self.client.force_login(self.manager)
+
+        self.assertContains(self.client.get(reverse("shop:inventory")), "Остатки на складе")
+        data = self.client.get(reverse("shop:api_inventory")).json()
+        self.assertEqual(data["sales_window_days"], 30)
+        self.assertIn("categories", data)
+
+    def test_refresh_is_requested_by_post(self):
+        self.client.force_login(self.manager)
+
+        self.assertContains(self.client.get(reverse("shop:inventory")), "Обновить сводку")
+        self.assertFalse(Job.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("shop:inventory"))
+        self.assertRedirects(response, reverse("shop:inventory"))
+        self.assertEqual(Job.objects.filter(name=REFRESH_JOB).count(), 1)
+        response = self.client.post(reverse("shop:api_inventory"))
+        self.assertEqual((response.status_code, response.json()), (202, {"refresh_requested": False}))
+
+    def test_client_and_guest_are_denied(self):
+        self.assertEqual(self.client.get(reverse("shop:api_inventory")).status_code, 401)
+        self.client.force_login(self.client_user)
+        self.assertEqual(self.client.get(reverse("shop:api_inventory")).status_code, 403)
+        self.assertRedirects(self.client.get(reverse("shop:inventory")), reverse("shop:product_list"))
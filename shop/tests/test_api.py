@@ -0,0 +1,35 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shop.tests.test_order_placement import make_product
+
+
+class ProductAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = [make_product(f"Товар {i:02d}", stock=i, discount=i % 2 * 10) for i in range(7)]
+
+    def test_cursor_pagination_walks_all_products(self):
+        url = reverse("shop:api_product_list") + "?page_size=3&fields=name"
+        names = []
+        while url:
+            data = self.client.get(url).json()
+            names.extend(row["name"] for row in data["results"])
+            url = data["next"]
+        self.assertEqual(names, sorted(product.name for product in self.products))
+
+    def test_fields_limit_selected_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse("shop:api_product_list"), {"fields": "final_price"}).json()
+        self.assertEqual(set(data["results"][0]), {"id", "final_price"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("description", queries[0]["sql"])
+
+    def test_filters_and_validation(self):
+        url = reverse("shop:api_product_list")
+        data = self.client.get(url, {"discounted": "true", "ordering": "stock_desc"}).json()
+        self.assertEqual([row["stock_quantity"] for row in data["results"]], [5, 3, 1])
+        self.assertEqual(self.client.get(url, {"fields": "secret"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"cursor": "broken"}).status_code, 404)
@@ -0,0 +1,46 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory, TestCase
+from django.urls import reverse
+
+from shop import async_views
+from shop.tests.test_order_placement import make_product
+
+
+class AsyncCatalogueViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            make_product(f"Товар {i}", stock=i, discount=i % 2 * 10)
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    async def test_api_list_matches_sync_view(self):
+        query = {"fields": "name,final_price", "ordering": "price_desc", "page_size": "2"}
+        url = reverse("shop:api_product_list")
+        expected = (await self.async_client.get(url, query)).json()
+
+        response = await async_views.product_list_api(self.factory.get(url, query))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), expected)
+
+    async def test_api_list_rejects_unknown_fields(self):
+        url = reverse("shop:api_product_list")
+        response = await async_views.product_list_api(self.factory.get(url, {"fields": "secret"}))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_guest_catalogue_renders_without_sync_queries(self):
+        request = self.factory.get(reverse("shop:product_list_guest"))
+
+        async def auser():
+            return AnonymousUser()
+
+        request.auser = auser
+        response = await async_views.product_list_guest(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Товар 3", response.content.decode())
+        self.assertTrue(response.has_header("ETag"))
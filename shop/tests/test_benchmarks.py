@@ -0,0 +1,56 @@
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase
+
+from shop.benchmarks import (
+    BENCHMARK_GROUPS,
+    BenchmarkContext,
+    BenchmarkRunner,
+    compare,
+    report,
+    run_benchmarks,
+)
+from shop.models import Product
+from shop.synthetic import seed_shop
+
+
+class BenchmarkSuiteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_shop(products=30, orders=10, customers=5)
+
+    def run_suite(self) -> dict:
+        bench = BenchmarkRunner(rounds=2, warmup=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            context = BenchmarkContext(data=self.data, workdir=Path(tmp), import_rows=20)
+            run_benchmarks(bench, context)
+        return report(bench, {"products": 30})
+
+    def test_every_group_runs_and_reports_statistics(self):
+        result = self.run_suite()
+
+        groups = {item["group"] for item in result["benchmarks"]}
+        self.assertEqual(groups, set(BENCHMARK_GROUPS))
+        for item in result["benchmarks"]:
+            self.assertEqual(item["rounds"], 2)
+            self.assertLessEqual(item["min_ms"], item["median_ms"])
+            self.assertLessEqual(item["median_ms"], item["max_ms"])
+        queries = {item["name"]: item["queries"] for item in result["benchmarks"]}
+        self.assertGreater(queries["product_list[default]"], 0)
+        # тёплая страница гостя — только чтение состояния каталога
+        self.assertEqual(queries["product_list_guest[warm]"], 1)
+
+    def test_import_rounds_are_rolled_back(self):
+        self.run_suite()
+
+        self.assertEqual(Product.objects.count(), 30)
+
+    def test_compare_reports_median_change(self):
+        current = {"benchmarks": [{"name": "a", "median_ms": 15.0, "queries": 3}]}
+        previous = {"benchmarks": [{"name": "a", "median_ms": 10.0, "queries": 4}]}
+
+        (row,) = compare(current, previous)
+
+        self.assertEqual(row["change_percent"], 50.0)
+        self.assertEqual(row["previous_queries"], 4)
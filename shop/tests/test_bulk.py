@@ -0,0 +1,138 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.admin import helpers
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shop.bulk import CONCURRENT_CHANGE_ERROR, apply_bulk_update
+from shop.models import Product, Supplier, UserRole
+from shop.synthetic import seed_shop
+
+
+class BulkUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_shop(products=40, suppliers=2, orders=0, customers=1)
+        cls.supplier = Supplier.objects.order_by("pk").first()
+        cls.products = Product.objects.filter(supplier=cls.supplier)
+
+    def snapshot(self, field: str) -> dict:
+        return dict(Product.objects.values_list("pk", field))
+
+    def test_supplier_discount_is_a_single_update(self):
+        others = dict(Product.objects.exclude(supplier=self.supplier).values_list("pk", "discount_percent"))
+
+        with CaptureQueriesContext(connection) as captured:
+            updated = apply_bulk_update(self.products, "set_discount", 10)
+
+        self.assertEqual(updated, self.products.count())
+        statements = [query["sql"].split()[0] for query in captured]
+        # точка сохранения вокруг UPDATE — не запрос к таблице
+        self.assertEqual([sql for sql in statements if sql not in ("SAVEPOINT", "RELEASE")], ["UPDATE"])
+        self.assertEqual(set(self.products.values_list("discount_percent", flat=True)), {10})
+        self.assertEqual(
+            dict(Product.objects.exclude(supplier=self.supplier).values_list("pk", "discount_percent")),
+            others,
+        )
+
+    def test_price_change_rounds_and_updates_final_price(self):
+        product = self.products.order_by("pk").first()
+        Product.objects.filter(pk=product.pk).update(price=Decimal("10.05"), discount_percent=20)
+
+        apply_bulk_update(Product.objects.filter(pk=product.pk), "change_price", Decimal("10"))
+
+        product.refresh_from_db()
+        self.assertEqual(product.price, Decimal("11.06"))
+        self.assertEqual(product.final_price, Decimal("8.85"))
+
+    def test_adjustments_are_relative(self):
+        stock = self.snapshot("stock_quantity")
+
+        apply_bulk_update(self.products, "adjust_stock", -1)
+
+        for pk, quantity in self.products.values_list("pk", "stock_quantity"):
+            self.assertEqual(quantity, stock[pk] - 1)
+
+    def test_invalid_result_changes_nothing(self):
+        Product.objects.filter(pk=self.products.order_by("pk").first().pk).update(stock_quantity=3)
+        Product.objects.filter(pk=self.products.order_by("pk").last().pk).update(discount_percent=95)
+        stock, discount = self.snapshot("stock_quantity"), self.snapshot("discount_percent")
+
+        cases = [
+            ("adjust_stock", -4, "Количество на складе не может быть отрицательным."),
+            ("adjust_discount", 10, "Скидка не может превышать 100%."),
+            ("set_discount", -1, "Скидка не может быть отрицательной."),
+            ("change_price", Decimal("-101"), "Цена не может быть отрицательной."),
+        ]
+        for operation, value, message in cases:
+            with self.subTest(operation=operation):
+                with self.assertRaisesMessage(ValidationError, message):
+                    apply_bulk_update(self.products, operation, value)
+
+        self.assertEqual(self.snapshot("stock_quantity"), stock)
+        self.assertEqual(self.snapshot("discount_percent"), discount)
+
+    def test_concurrent_change_is_a_validation_error(self):
+        # заказ уменьшил остаток между проверкой крайних значений и UPDATE
+        stock = self.snapshot("stock_quantity")
+
+        with mock.patch("shop.bulk._check_bounds", return_value=True):
+            with self.assertRaisesMessage(ValidationError, CONCURRENT_CHANGE_ERROR):
+                apply_bulk_update(self.products, "adjust_stock", -1000)
+
+        self.assertEqual(self.snapshot("stock_quantity"), stock)
+
+    def test_shop_form_filters_by_supplier(self):
+        self.client.force_login(self.data.users[UserRole.ADMIN])
+
+        response = self.client.post(
+            reverse("shop:product_bulk_update"),
+            {"supplier": self.supplier.pk, "operation": "set_stock", "value": "7"},
+        )
+
+        self.assertRedirects(response, reverse("shop:product_list"))
+        self.assertEqual(set(self.products.values_list("stock_quantity", flat=True)), {7})
+        self.assertNotIn(7, Product.objects.exclude(supplier=self.supplier).values_list("stock_quantity", flat=True))
+
+    def test_shop_form_rejects_fractional_stock(self):
+        self.client.force_login(self.data.users[UserRole.ADMIN])
+
+        response = self.client.post(
+            reverse("shop:product_bulk_update"), {"operation": "adjust_stock", "value": "1.5"}
+        )
+
+        self.assertContains(response, "Значение должно быть целым числом.")
+
+    def test_manager_cannot_use_shop_form(self):
+        self.client.force_login(self.data.users[UserRole.MANAGER])
+        stock = self.snapshot("stock_quantity")
+
+        response = self.client.post(
+            reverse("shop:product_bulk_update"), {"operation": "set_stock", "value": "0"}
+        )
+
+        self.assertRedirects(response, reverse("shop:product_list"))
+        self.assertEqual(self.snapshot("stock_quantity"), stock)
+
+    def test_admin_action_applies_to_filtered_changelist(self):
+        self.client.force_login(self.data.users[UserRole.ADMIN])
+        url = reverse("admin:shop_product_changelist") + f"?supplier__id__exact={self.supplier.pk}"
+        data = {
+            "action": "bulk_update",
+            "select_across": "1",
+            helpers.ACTION_CHECKBOX_NAME: [self.products.first().pk],
+        }
+
+        discount = self.snapshot("discount_percent")
+
+        self.assertContains(self.client.post(url, data), "Массовое изменение товаров")
+        response = self.client.post(url, {**data, "apply": "1", "operation": "adjust_discount", "value": "5"})
+
+        self.assertEqual(response.status_code, 302)
+        supplier_products = set(self.products.values_list("pk", flat=True))
+        for pk, value in self.snapshot("discount_percent").items():
+            self.assertEqual(value, discount[pk] + 5 if pk in supplier_products else discount[pk])
@@ -0,0 +1,154 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+
+from shop import caching
+from shop.bulk import apply_bulk_update
+from shop.caching import render_product_rows
+from shop.importing import ProductImporter, ProductRow
+from shop.models import Category, Product, UserRole
+from shop.orders import place_order
+from shop.tests.test_order_placement import make_product
+
+
+class ProductRowCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pen = make_product("Ручка", stock=10)
+        cls.paper = make_product("Бумага A4", stock=5)
+        Product.objects.filter(pk=cls.pen.pk).update(sku="P-1")
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def rows(self) -> dict[int, str]:
+        products = list(
+            Product.objects.select_related("category", "manufacturer", "supplier").order_by("pk")
+        )
+        return dict(zip((product.pk for product in products), render_product_rows(products, UserRole.CLIENT)))
+
+    def rendered(self) -> int:
+        # сколько строк пришлось отрисовать заново, а не взять из кэша
+        with mock.patch.object(caching, "render_to_string", wraps=caching.render_to_string) as render:
+            self.rows()
+        return render.call_count
+
+    def test_unchanged_rows_come_from_cache(self):
+        self.assertEqual(self.rendered(), 2)
+        self.assertEqual(self.rendered(), 0)
+
+    def test_product_save_invalidates_its_row_only(self):
+        self.rows()
+        self.pen.name = "Ручка гелевая"
+        self.pen.save()
+
+        self.assertEqual(self.rendered(), 1)
+        self.assertIn("Ручка гелевая", self.rows()[self.pen.pk])
+
+    def test_reference_rename_invalidates_all_rows(self):
+        self.rows()
+        category = Category.objects.get(pk=self.pen.category_id)
+        category.name = "Канцтовары"
+        category.save()
+
+        self.assertEqual(self.rendered(), 2)
+        self.assertIn("Канцтовары", self.rows()[self.paper.pk])
+
+    def test_order_invalidates_ordered_rows(self):
+        self.rows()
+        with self.captureOnCommitCallbacks(execute=True):
+            place_order(get_user_model().objects.create_user("client"), [(self.pen.pk, 3)])
+
+        self.assertEqual(self.rendered(), 1)
+        self.assertIn("<td>7</td>", self.rows()[self.pen.pk])
+
+    def test_bulk_update_and_import_invalidate_rows(self):
+        self.rows()
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_bulk_update(Product.objects.filter(pk=self.paper.pk), "set_discount", 20)
+        self.assertIn("<td>20</td>", self.rows()[self.paper.pk])
+
+        row = ProductRow(
+            name="Ручка", category="Бумага", manufacturer="Снегурочка", supplier="ОфисМир",
+            price=Decimal("55.00"), unit="pcs", stock_quantity=10, discount_percent=0,
+            description="", image=None, sku="P-1",
+        )
+        ProductImporter(upsert=True).run([row])
+        self.assertIn("55.00", self.rows()[self.pen.pk])
+
+
+    def test_changes_from_other_processes_invalidate_rows(self):
+        self.rows()
+        # у import_products и run_jobs свой кэш в памяти процесса
+        with mock.patch.object(caching, "cache", LocMemCache("other-process", {})):
+            caching.bump_product_versions([self.pen.pk])
+        self.assertEqual(self.rendered(), 1)
+
+        with mock.patch.object(caching, "cache", LocMemCache("other-process", {})):
+            caching.bump_catalogue_version()
+        self.assertEqual(self.rendered(), 2)
+
+class GuestPageConditionalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pen = make_product("Ручка", stock=10)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.url = reverse("shop:product_list_guest")
+
+    def test_revalidation_returns_304_with_one_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("must-revalidate", response["Cache-Control"])
+        etag, modified = response["ETag"], response["Last-Modified"]
+
+        # только чтение состояния каталога, без выборки товаров
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=modified).status_code, 304)
+
+        # у другой страницы списка (другой адрес) свой ETag
+        other = self.client.get(self.url, {"cursor": "x"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(other.status_code, 304)
+
+    def test_catalogue_change_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.pen.name = "Ручка гелевая"
+        self.pen.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Ручка гелевая")
+
+    def test_changes_from_other_processes_change_etag(self):
+        changes = [
+            lambda: caching.bump_product_versions([self.pen.pk]),
+            caching.bump_catalogue_version,
+            lambda: Product.objects.filter(pk=self.pen.pk).delete(),
+        ]
+        for change in changes:
+            etag = self.client.get(self.url)["ETag"]
+            # у import_products и run_jobs свой кэш в памяти процесса
+            with mock.patch.object(caching, "cache", LocMemCache("other-process", {})):
+                change()
+
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_signed_in_user_gets_no_shared_validators(self):
+        self.client.force_login(get_user_model().objects.create_user("client"))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("ETag"))
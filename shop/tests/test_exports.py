@@ -0,0 +1,104 @@
+import csv
+import io
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from shop.exports import stream_xlsx
+from shop.importing import IMPORT_HEADERS, ProductImporter, iter_source_rows
+from shop.models import Order, OrderItem, Product, Supplier, UserRole
+from shop.synthetic import seed_shop
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_shop(products=60, orders=5, customers=2)
+        product = Product.objects.order_by("pk").first()
+        product.image = "products/pen.png"
+        product.description = "Строка с управляющим символом\x0b"
+        product.save()
+        # товар без артикула и описания: пустые ячейки в начале строки
+        Product.objects.filter(pk=product.pk + 1).update(sku=None, description="")
+
+    def setUp(self):
+        self.client.force_login(self.data.users[UserRole.MANAGER])
+
+    def export(self, name: str, **params) -> bytes:
+        response = self.client.get(reverse(f"shop:{name}"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_product_csv_applies_filters(self):
+        supplier = Supplier.objects.order_by("pk").first()
+
+        content = self.export("product_export", supplier=supplier.pk).decode("utf-8-sig")
+
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], IMPORT_HEADERS)
+        self.assertEqual(len(rows) - 1, Product.objects.filter(supplier=supplier).count())
+        self.assertEqual({row[4] for row in rows[1:]}, {supplier.name})
+
+    def test_product_xlsx_round_trips_through_import(self):
+        fields = [
+            "sku",
+            "name",
+            "category",
+            "manufacturer",
+            "supplier",
+            "price",
+            "unit",
+            "stock_quantity",
+            "discount_percent",
+            "description",
+            "image",
+        ]
+        before = list(Product.objects.order_by("pk").values_list(*fields))
+        content = self.export("product_export", format="xlsx")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "products.xlsx"
+            path.write_bytes(content)
+            importer = ProductImporter(upsert=True)
+            importer.run(iter_source_rows([path]))
+
+        self.assertEqual(importer.created, 0)
+        after = list(Product.objects.order_by("pk").values_list(*fields))
+        # недопустимый в XML символ при выгрузке отбрасывается
+        self.assertEqual(after[0][9], "Строка с управляющим символом")
+        self.assertEqual(after[1:], before[1:])
+        self.assertEqual(after[1][0], None)
+
+    def test_xlsx_keeps_columns_after_empty_cells(self):
+        content = b"".join(stream_xlsx(["A", "B", "C"], [["", "cat", None], [1, "", "name"]], "Лист"))
+
+        rows = list(load_workbook(io.BytesIO(content)).active.iter_rows(min_row=2, values_only=True))
+        self.assertEqual(rows, [(None, "cat", None), (1, None, "name")])
+
+    def test_order_xlsx_has_one_row_per_item(self):
+        content = self.export("order_export", format="xlsx")
+
+        sheet = load_workbook(io.BytesIO(content)).active
+        rows = list(sheet.iter_rows(min_row=2, values_only=True))
+        self.assertEqual(len(rows), OrderItem.objects.count())
+        order = Order.objects.order_by("-created_at", "-id").first()
+        item = order.items.order_by("id").first()
+        order_id, created_at, _, _, _, quantity, price, discount, total = rows[0]
+        self.assertEqual(order_id, order.pk)
+        self.assertEqual(created_at.date(), order.created_at.date())
+        self.assertEqual(quantity, item.quantity)
+        expected = item.price_at_order * item.quantity * (100 - discount) / 100
+        self.assertAlmostEqual(Decimal(str(total)), expected, places=2)
+
+    def test_client_cannot_export(self):
+        self.client.force_login(get_user_model().objects.get(username="synthetic-client"))
+
+        response = self.client.get(reverse("shop:order_export"))
+
+        self.assertRedirects(response, reverse("shop:product_list"))
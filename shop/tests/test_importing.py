@@ -0,0 +1,301 @@
+import csv
+import tempfile
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from shop.bulk import apply_bulk_update
+from shop.importing import (
+    DEFAULT_CATEGORY,
+    DEFAULT_MANUFACTURER,
+    DEFAULT_SUPPLIER,
+    IMPORT_HEADERS,
+    ImportSourceError,
+    ProductImporter,
+    ReferenceResolver,
+    iter_source_rows,
+    read_source,
+)
+from shop.models import Category, Product
+from shop.orders import place_order
+from shop.synthetic import write_import_file
+
+PRODUCT_FIELDS = ["sku", "name", "category__name", "supplier__name", "price", "stock_quantity"]
+
+
+class TempDirMixin:
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def write(self, name: str, text: str) -> Path:
+        path = self.tmp / name
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def write_rows(self, name: str, rows: list[list], headers: list[str] = IMPORT_HEADERS) -> Path:
+        path = self.tmp / name
+        with path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        return path
+
+    def run_import(self, path: Path, upsert: bool = True, batch_size: int = 1000) -> ProductImporter:
+        importer = ProductImporter(batch_size=batch_size, upsert=upsert)
+        importer.run(iter_source_rows([path]))
+        return importer
+
+
+def file_row(sku: str, name: str, price: str = "10.00", stock: int = 5) -> list:
+    return [sku, "Бумага", name, "Снегурочка", "ОфисМир", price, "шт.", stock, 0, "", ""]
+
+
+class CsvSourceTests(TempDirMixin, TestCase):
+    def read(self, path: Path) -> list:
+        with read_source(path) as rows:
+            return list(rows)
+
+    def test_csv_and_tsv_are_parsed_alike(self):
+        rows = [
+            file_row("A-1", "Бумага A4, 500 л."),
+            ["A-2", "Бумага", 'Папка "Дело"', "Снегурочка", "ОфисМир", "12,50", "уп.", "3", "5",
+             "первая строка\nвторая строка", ""],
+        ]
+        csv_rows = self.read(self.write_rows("a.csv", rows))
+        tsv = self.tmp / "a.tsv"
+        with tsv.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle, delimiter="\t")
+            writer.writerow(IMPORT_HEADERS)
+            writer.writerows(rows)
+
+        self.assertEqual(self.read(tsv), csv_rows)
+        self.assertEqual([row.name for row in csv_rows], ["Бумага A4, 500 л.", 'Папка "Дело"'])
+        self.assertEqual(csv_rows[1].description, "первая строка\nвторая строка")
+        self.assertEqual((csv_rows[1].price, csv_rows[1].unit), (Decimal("12.50"), "pack"))
+
+    def test_bom_and_short_rows(self):
+        # Excel сохраняет CSV с BOM; в коротких строках недостающие колонки пустые
+        path = self.tmp / "excel.csv"
+        text = ",".join(IMPORT_HEADERS) + "\nB-1,Бумага,Тетрадь,Снегурочка,ОфисМир,15\n"
+        path.write_bytes(text.encode("utf-8-sig"))
+
+        (row,) = self.read(path)
+
+        self.assertEqual((row.sku, row.name, row.price, row.stock_quantity), ("B-1", "Тетрадь", Decimal("15.00"), 0))
+        self.assertIsNone(row.image)
+
+    def test_missing_column_and_sheet_errors(self):
+        no_name = [header for header in IMPORT_HEADERS if header != "Наименование товара"]
+        with self.assertRaisesMessage(ImportSourceError, "Наименование товара"):
+            self.read(self.write_rows("no-name.csv", [], headers=no_name))
+        with self.assertRaisesMessage(ImportSourceError, "не удалось найти лист"):
+            self.read(self.write("other.csv", "Колонка\n1\n"))
+        with self.assertRaisesMessage(ImportSourceError, "Неподдерживаемый формат"):
+            self.read(self.write("products.json", "[]"))
+
+    def test_rows_are_streamed(self):
+        path = self.tmp / "big.csv"
+        write_import_file(path, 20_000)
+        size = path.stat().st_size
+
+        tracemalloc.start()
+        try:
+            with read_source(path) as rows:
+                count = sum(1 for _ in rows)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(count, 20_000)
+        # память разбора не растёт с размером файла
+        self.assertLess(peak, size / 4)
+
+
+class ParallelSourceTests(TempDirMixin, TestCase):
+    def files(self) -> list[Path]:
+        # одинаковые артикулы с разными ценами: при upsert побеждает последний файл
+        paths = []
+        for seed, name in enumerate(["a.csv", "b.tsv", "c.csv"], start=1):
+            path = self.tmp / name
+            write_import_file(path, 450, seed=seed)
+            paths.append(path)
+        return paths
+
+    def import_all(self, paths: list[Path], workers: int) -> list[tuple]:
+        ProductImporter(batch_size=200, upsert=True).run(iter_source_rows(paths, workers=workers))
+        return list(Product.objects.order_by("sku").values_list(*PRODUCT_FIELDS))
+
+    # маленькие пачки и очередь: воркеры упираются в ограничение очереди
+    @mock.patch("shop.importing.SOURCE_BATCH_SIZE", 50)
+    @mock.patch("shop.importing.SOURCE_QUEUE_BATCHES", 2)
+    def test_workers_keep_file_order(self):
+        paths = self.files()
+
+        serial = list(iter_source_rows(paths, workers=1))
+        self.assertEqual(list(iter_source_rows(paths, workers=2)), serial)
+        self.assertEqual(len(serial), 1350)
+
+        expected = self.import_all(paths, workers=1)
+        Product.objects.all().delete()
+        self.assertEqual(self.import_all(paths, workers=3), expected)
+        self.assertEqual(len(expected), 450)
+
+    def test_workers_keep_open_transaction(self):
+        # TestCase выполняет тест внутри transaction.atomic
+        with (
+            mock.patch.object(connection, "close") as close,
+            self.captureOnCommitCallbacks() as callbacks,
+        ):
+            transaction.on_commit(lambda: None)
+            self.assertEqual(len(list(iter_source_rows(self.files(), workers=2))), 1350)
+
+        close.assert_not_called()
+        self.assertFalse(connection.needs_rollback)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_worker_errors_reach_parent(self):
+        paths = [*self.files(), self.write("d.csv", "Нет,Нужных,Колонок\n1,2,3\n")]
+
+        with self.assertRaisesMessage(ImportSourceError, "d.csv"):
+            list(iter_source_rows(paths, workers=2))
+
+    def test_abandoned_iterator_stops_workers(self):
+        rows = iter_source_rows(self.files(), workers=3)
+        next(rows)
+        rows.close()
+
+
+class UpsertTests(TempDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self.write_rows(
+            "catalogue.csv", [file_row("A-1", "Бумага A4"), file_row("A-2", "Бумага A3", "20.00")]
+        )
+        self.run_import(self.path)
+
+    def counts(self, importer: ProductImporter) -> tuple[int, int, int]:
+        return importer.created, importer.updated, importer.unchanged
+
+    def test_reload_without_changes_writes_nothing(self):
+        with CaptureQueriesContext(connection) as captured:
+            importer = self.run_import(self.path)
+
+        self.assertEqual(self.counts(importer), (0, 0, 2))
+        writes = [q["sql"] for q in captured if q["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")]
+        self.assertEqual(writes, [])
+
+    def test_changed_and_new_rows(self):
+        path = self.write_rows(
+            "next.csv",
+            [file_row("A-1", "Бумага A4", "11.00"), file_row("A-2", "Бумага A3", "20.00"), file_row("A-3", "Папка")],
+        )
+
+        self.assertEqual(self.counts(self.run_import(path)), (1, 1, 1))
+        self.assertEqual(Product.objects.get(sku="A-1").price, Decimal("11.00"))
+
+    def test_reload_restores_values_edited_elsewhere(self):
+        product = Product.objects.get(sku="A-1")
+        product.price = Decimal("99.00")
+        product.save()
+        apply_bulk_update(Product.objects.filter(sku="A-2"), "set_discount", 50)
+        place_order(get_user_model().objects.create_user("client"), [(product.pk, 2)])
+
+        self.assertEqual(self.counts(self.run_import(self.path)), (0, 2, 0))
+        product.refresh_from_db()
+        self.assertEqual((product.price, product.stock_quantity), (Decimal("10.00"), 5))
+        self.assertEqual(Product.objects.get(sku="A-2").discount_percent, 0)
+
+    def test_rows_gaining_sku_update_products_loaded_without_it(self):
+        Product.objects.all().delete()
+        headers = [header for header in IMPORT_HEADERS if header != "Артикул"]
+        self.run_import(self.write_rows("old.csv", [file_row("", "Бумага A4")[1:]], headers=headers))
+
+        importer = self.run_import(self.path)
+
+        self.assertEqual(self.counts(importer), (1, 1, 0))
+        self.assertEqual(
+            list(Product.objects.order_by("sku").values_list("sku", "name")),
+            [("A-1", "Бумага A4"), ("A-2", "Бумага A3")],
+        )
+        self.assertEqual(self.counts(self.run_import(self.path)), (0, 0, 2))
+
+
+class ReferenceResolverTests(TestCase):
+    def test_existing_names_are_reused_and_missing_created_in_bulk(self):
+        existing = Category.objects.create(name="Бумага")
+        resolver = ReferenceResolver(Category)
+
+        # чтение существующих, одна вставка недостающих, чтение созданных
+        with self.assertNumQueries(3):
+            resolver.resolve({"Бумага", "Папки", "Ручки"})
+        with self.assertNumQueries(0):
+            resolver.resolve({"Бумага", "Ручки"})
+
+        self.assertEqual(resolver["Бумага"], existing)
+        self.assertEqual(resolver["Папки"].name, "Папки")
+        self.assertEqual(Category.objects.count(), 3)
+
+    def test_name_created_by_concurrent_import_is_not_duplicated(self):
+        resolver = ReferenceResolver(Category)
+        bulk_create = Category.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # другой импорт создал запись между чтением и вставкой
+            Category.objects.create(name="Папки")
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(Category.objects, "bulk_create", racing_bulk_create):
+            resolver.resolve({"Папки", "Ручки"})
+
+        self.assertEqual(Category.objects.filter(name="Папки").count(), 1)
+        self.assertEqual(resolver["Папки"], Category.objects.get(name="Папки"))
+        self.assertEqual(resolver["Ручки"].name, "Ручки")
+
+
+class BatchImportTests(TempDirMixin, TestCase):
+    def test_rows_are_written_in_batches(self):
+        rows = [file_row(f"B-{i}", f"Тетрадь {i}") for i in range(7)]
+        rows[3][1] = "Тетради"
+
+        with CaptureQueriesContext(connection) as captured:
+            importer = self.run_import(self.write_rows("batch.csv", rows), upsert=False, batch_size=3)
+
+        self.assertEqual(importer.created, 7)
+        inserts = [q["sql"] for q in captured if q["sql"].startswith('INSERT INTO "shop_product"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(
+            set(Category.objects.values_list("name", flat=True)), {"Бумага", "Тетради"}
+        )
+        self.assertEqual(Product.objects.filter(category__name="Бумага").count(), 6)
+
+    def test_bad_values_fall_back_to_defaults(self):
+        rows = [
+            ["C-1", "", "Блокнот", "", "", "дорого", "коробка", "15.0", "", "", ""],
+            # строка без наименования пропускается
+            ["C-2", "Бумага", "", "Снегурочка", "ОфисМир", "10", "шт.", 1, 0, "", ""],
+            ["C-3", "Бумага", "Скрепки", "Снегурочка", "ОфисМир", "12,5", "уп.", "много", 5, "", "clips.jpg"],
+        ]
+
+        importer = self.run_import(self.write_rows("bad.csv", rows), upsert=False)
+
+        self.assertEqual(importer.created, 2)
+        notebook = Product.objects.select_related("category", "manufacturer", "supplier").get(sku="C-1")
+        self.assertEqual(
+            (notebook.category.name, notebook.manufacturer.name, notebook.supplier.name),
+            (DEFAULT_CATEGORY, DEFAULT_MANUFACTURER, DEFAULT_SUPPLIER),
+        )
+        self.assertEqual((notebook.price, notebook.unit, notebook.stock_quantity), (Decimal("0.00"), "pcs", 15))
+        clips = Product.objects.get(sku="C-3")
+        self.assertEqual(
+            (clips.price, clips.unit, clips.stock_quantity, clips.discount_percent, clips.image.name),
+            (Decimal("12.50"), "pack", 0, 5, "products/clips.jpg"),
+        )
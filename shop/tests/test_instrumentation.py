@@ -0,0 +1,41 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shop.instrumentation import stats
+from shop.tests.test_order_placement import make_product
+
+
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        make_product("Ручка", stock=1)
+        cls.staff = get_user_model().objects.create_user("staff", password="x", is_staff=True)
+
+    def setUp(self):
+        stats.reset()
+
+    @override_settings(SHOP_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("shop:product_list_guest"))
+
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+
+    @override_settings(SHOP_SERVER_TIMING=False)
+    def test_header_disabled(self):
+        response = self.client.get(reverse("shop:product_list_guest"))
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_stats_aggregated_per_url_name(self):
+        for _ in range(3):
+            self.client.get(reverse("shop:api_product_list"))
+
+        self.assertEqual(self.client.get(reverse("shop:stats")).status_code, 403)
+        self.client.force_login(self.staff)
+        data = self.client.get(reverse("shop:stats")).json()
+
+        api = data["shop:api_product_list"]
+        self.assertEqual(api["requests"], 3)
+        self.assertEqual(api["queries"]["max"], 1)
+        self.assertLessEqual(api["total_ms"]["p50"], api["total_ms"]["p99"])
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from shop.jobs import claim_next, enqueue, job, release_stale, run_pending
+from shop.models import Job, JobStatus
+
+calls = []
+
+
+@job("test_record")
+def record(value: int) -> None:
+    calls.append(value)
+
+
+@job("test_fail")
+def fail() -> None:
+    raise RuntimeError("диск недоступен")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_after_commit_and_executed(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            enqueue("test_record", value=7)
+        self.assertFalse(Job.objects.exists())
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(calls, [7])
+        self.assertEqual(Job.objects.get().status, JobStatus.DONE)
+
+    def test_job_claimed_only_once(self):
+        Job.objects.create(name="test_record", payload={"value": 1})
+        self.assertIsNotNone(claim_next())
+        self.assertIsNone(claim_next())
+
+    def test_failure_is_retried_with_backoff_then_marked_failed(self):
+        queued = Job.objects.create(name="test_fail", max_attempts=2)
+
+        with self.assertLogs("shop.jobs", "WARNING") as logs:
+            self.assertEqual(run_pending(), (0, 1))
+        self.assertIn("завершилась ошибкой (попытка 1)", logs.output[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, JobStatus.PENDING)
+        self.assertGreater(queued.run_after, timezone.now())
+        self.assertIn("диск недоступен", queued.last_error)
+
+        Job.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        with self.assertLogs("shop.jobs", "WARNING") as logs:
+            run_pending()
+        self.assertIn("завершилась ошибкой (попытка 2)", logs.output[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, JobStatus.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_stale_running_job_is_released(self):
+        Job.objects.create(
+            name="test_record",
+            payload={"value": 3},
+            status=JobStatus.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertEqual(release_stale(), 1)
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(calls, [3])
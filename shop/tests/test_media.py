@@ -0,0 +1,104 @@
+import tempfile
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from shop import media
+from shop.media import cleanup_media, referenced_names
+from shop.models import IMAGE_VARIANT_KEYS, Product
+from shop.tests.test_order_placement import make_product
+from shop.thumbnails import THUMBNAIL_FORMATS, THUMBNAIL_SIZES, variant_key
+
+
+class CleanupMediaTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.root = Path(media.name)
+
+        for name in ("products/kept.jpg", "products/thumbs/kept-80.abc.webp", "products/orphan.jpg"):
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_bytes(b"x")
+        self.kept = make_product("Ручка", stock=1)
+        # копии уже созданы для текущего фото: save() сбросил бы их как устаревшие
+        Product.objects.filter(pk=self.kept.pk).update(
+            image="products/kept.jpg",
+            image_variants={"webp_80": "products/thumbs/kept-80.abc.webp"},
+            image_variants_source="products/kept.jpg",
+        )
+        self.dangling = make_product("Карандаш", stock=1)
+        self.dangling.image = "products/absent.jpg"
+        self.dangling.save()
+
+    def test_dry_run_reports_without_changes(self):
+        report = cleanup_media(dry_run=True, min_age=0)
+
+        self.assertEqual((report.scanned, report.orphans, report.dangling_images), (3, 1, 1))
+        self.assertTrue((self.root / "products/orphan.jpg").exists())
+        self.dangling.refresh_from_db()
+        self.assertEqual(self.dangling.image.name, "products/absent.jpg")
+
+    def test_deletes_orphans_and_clears_dangling_references(self):
+        cleanup_media(dry_run=False, min_age=0)
+
+        self.assertFalse((self.root / "products/orphan.jpg").exists())
+        self.assertTrue((self.root / "products/kept.jpg").exists())
+        self.assertTrue((self.root / "products/thumbs/kept-80.abc.webp").exists())
+        self.dangling.refresh_from_db()
+        self.assertFalse(self.dangling.image)
+
+    def test_small_chunks_keep_referenced_files(self):
+        # ссылки проверяются для каждой пачки обхода каталога
+        for index in range(3):
+            make_product(f"Тетрадь {index}", stock=1)
+        report = cleanup_media(dry_run=False, min_age=0, chunk_size=1)
+
+        self.assertEqual((report.scanned, report.orphans), (3, 1))
+        self.assertFalse((self.root / "products/orphan.jpg").exists())
+        self.assertTrue((self.root / "products/kept.jpg").exists())
+        self.assertTrue((self.root / "products/thumbs/kept-80.abc.webp").exists())
+
+    def test_recent_files_are_skipped(self):
+        report = cleanup_media(dry_run=False, min_age=3600)
+
+        self.assertEqual(report.scanned, 0)
+        self.assertTrue((self.root / "products/orphan.jpg").exists())
+
+    def test_file_referenced_during_walk_is_kept(self):
+        iter_media_files = media.iter_media_files
+
+        def walk(root, min_age):
+            for item in iter_media_files(root, min_age):
+                if item.name == "products/orphan.jpg":
+                    # фото назначили товару, пока обходились предыдущие файлы
+                    Product.objects.filter(pk=self.dangling.pk).update(image=item.name)
+                yield item
+
+        with mock.patch.object(media, "iter_media_files", walk):
+            report = cleanup_media(dry_run=False, min_age=0, chunk_size=1)
+
+        self.assertEqual(report.orphans, 0)
+        self.assertTrue((self.root / "products/orphan.jpg").exists())
+
+    def test_variant_keys_match_thumbnails(self):
+        keys = {variant_key(fmt, size) for size in THUMBNAIL_SIZES for fmt in THUMBNAIL_FORMATS}
+        self.assertEqual(set(IMAGE_VARIANT_KEYS), keys)
+
+    @skipUnless(connection.vendor == "sqlite", "план запроса проверяется на SQLite")
+    def test_references_are_looked_up_by_index(self):
+        names = ["products/kept.jpg", "products/thumbs/kept-80.abc.webp", "products/orphan.jpg"]
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(referenced_names(names), set(names[:2]))
+
+        self.assertEqual(len(captured), 2)
+        with connection.cursor() as cursor:
+            for query in captured:
+                cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+                plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+                self.assertNotIn("SCAN", plan)
@@ -0,0 +1,29 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from shop.tests.test_order_placement import make_product
+
+
+class ProductFinalPriceTests(TestCase):
+    def test_final_price_is_current_after_save(self):
+        product = make_product("Бумага A4", stock=5, price="10.05", discount=0)
+        self.assertEqual(product.final_price, Decimal("10.05"))
+
+        product.discount_percent = 20
+        product.save()
+        self.assertEqual(product.final_price, Decimal("8.04"))
+
+        product.price = Decimal("20.00")
+        product.save(update_fields=["price"])
+        self.assertEqual(product.final_price, Decimal("16.00"))
+
+    def test_unrelated_update_does_not_reload(self):
+        product = make_product("Бумага A4", stock=5)
+
+        product.stock_quantity = 4
+        with CaptureQueriesContext(connection) as queries:
+            product.save(update_fields=["stock_quantity"])
+        self.assertFalse([query for query in queries if query["sql"].startswith("SELECT")])
@@ -0,0 +1,77 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from shop.models import Order, OrderItem, UserProfile, UserRole
+from shop.orders import annotate_totals
+from shop.pagination import KeysetPaginator
+from shop.tests.test_order_placement import make_product
+from shop.views import ORDER_ORDERING, ORDERS_PER_PAGE
+
+
+class OrderListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.manager = User.objects.create_user("manager", password="x")
+        UserProfile.objects.create(user=cls.manager, full_name="Менеджер", role=UserRole.MANAGER)
+        cls.customer = User.objects.create_user("client", password="x")
+        cls.paper = make_product("Бумага А4", stock=10, price="350.00")
+        cls.pen = make_product("Ручка", stock=10, price="25.00")
+
+        cls.order = Order.objects.create(customer=cls.customer)
+        OrderItem.objects.create(
+            order=cls.order, product=cls.paper, quantity=2, price_at_order=Decimal("350.00"),
+            discount_percent_at_order=10,
+        )
+        OrderItem.objects.create(order=cls.order, product=cls.pen, quantity=1, price_at_order=Decimal("25.00"))
+        cls.empty_order = Order.objects.create(customer=cls.customer)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def orders(self, **params) -> dict[int, Order]:
+        response = self.client.get(reverse("shop:order_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return {order.pk: order for order in response.context["orders"]}
+
+    def test_item_count_and_total(self):
+        orders = self.orders()
+
+        # 2 × 350 со скидкой 10% + 25
+        self.assertEqual(orders[self.order.pk].item_count, 2)
+        self.assertEqual(orders[self.order.pk].total, Decimal("655.00"))
+        self.assertEqual(orders[self.empty_order.pk].item_count, 0)
+        self.assertIsNone(orders[self.empty_order.pk].total)
+
+    def test_product_filter_keeps_whole_order_totals(self):
+        orders = self.orders(product=self.pen.pk)
+
+        self.assertEqual(list(orders), [self.order.pk])
+        self.assertEqual(orders[self.order.pk].item_count, 2)
+        self.assertEqual(orders[self.order.pk].total, Decimal("655.00"))
+
+    def test_pages_cover_every_order_once(self):
+        Order.objects.bulk_create(Order(customer=self.customer) for _ in range(ORDERS_PER_PAGE + 3))
+        paginator = KeysetPaginator(annotate_totals(Order.objects.all()), ORDER_ORDERING, ORDERS_PER_PAGE)
+
+        pages = [paginator.get_page(None)]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+
+        self.assertEqual(
+            [order.pk for page in pages for order in page],
+            list(Order.objects.order_by(*ORDER_ORDERING).values_list("pk", flat=True)),
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "план запроса проверяется на SQLite")
+    def test_page_reads_orders_by_index_without_grouping(self):
+        queryset = annotate_totals(Order.objects.order_by(*ORDER_ORDERING))[:ORDERS_PER_PAGE]
+        plan = queryset.explain()
+
+        self.assertIn("USING INDEX order_created_id_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
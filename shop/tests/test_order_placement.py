@@ -0,0 +1,135 @@
+import json
+import threading
+from decimal import Decimal
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from shop.models import Category, Manufacturer, Order, OrderItem, Product, Supplier
+from shop.orders import InsufficientStock, InvalidBasket, place_order
+
+
+def make_product(name: str, stock: int, price: str = "100.00", discount: int = 0) -> Product:
+    return Product.objects.create(
+        name=name,
+        category=Category.objects.get_or_create(name="Бумага")[0],
+        manufacturer=Manufacturer.objects.get_or_create(name="Снегурочка")[0],
+        supplier=Supplier.objects.get_or_create(name="ОфисМир")[0],
+        price=Decimal(price),
+        stock_quantity=stock,
+        discount_percent=discount,
+    )
+
+
+class PlaceOrderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = get_user_model().objects.create_user("client", password="x")
+        cls.paper = make_product("Бумага А4", stock=10, price="350.00", discount=10)
+        cls.pen = make_product("Ручка", stock=3, price="25.00")
+
+    def test_decrements_stock_and_snapshots_prices(self):
+        order = place_order(self.customer, [(self.paper.pk, 4), (self.pen.pk, 1), (self.paper.pk, 1)])
+
+        self.paper.refresh_from_db()
+        self.pen.refresh_from_db()
+        self.assertEqual(self.paper.stock_quantity, 5)
+        self.assertEqual(self.pen.stock_quantity, 2)
+        item = order.items.get(product=self.paper)
+        self.assertEqual(item.quantity, 5)
+        self.assertEqual(item.price_at_order, Decimal("350.00"))
+        self.assertEqual(item.discount_percent_at_order, 10)
+
+    def test_insufficient_stock_rolls_back_whole_order(self):
+        with self.assertRaises(InsufficientStock) as ctx:
+            place_order(self.customer, [(self.paper.pk, 2), (self.pen.pk, 4)])
+
+        self.assertEqual(ctx.exception.product_id, self.pen.pk)
+        self.paper.refresh_from_db()
+        self.assertEqual(self.paper.stock_quantity, 10)
+        self.assertFalse(Order.objects.exists())
+
+    def test_rejects_invalid_basket(self):
+        for lines in (
+            [],
+            [(self.pen.pk, 0)],
+            [("x", 1)],
+            [(10**9, 1)],
+            [(2**63, 1)],
+            [(-1, 1)],
+            [(self.pen.pk, 2**31)],
+            [(self.pen.pk, 2**31 - 1), (self.pen.pk, 1)],
+        ):
+            with self.subTest(lines=lines), self.assertRaises(InvalidBasket):
+                place_order(self.customer, lines)
+
+    def test_endpoint(self):
+        self.client.force_login(self.customer)
+        url = reverse("shop:order_place")
+
+        response = self.client.post(
+            url,
+            json.dumps({"items": [{"product": self.pen.pk, "quantity": 2}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Order.objects.filter(pk=response.json()["order"]).exists())
+
+        response = self.client.post(
+            url,
+            json.dumps({"items": [{"product": self.pen.pk, "quantity": 2}]}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 409)
+
+        response = self.client.post(url, "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        # числа вне диапазона колонок: ответ 400, а не ошибка БД
+        for item in ({"product": 2**64, "quantity": 1}, {"product": self.pen.pk, "quantity": 2**40}):
+            with self.subTest(item=item):
+                response = self.client.post(url, json.dumps({"items": [item]}), content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+
+
+@skipIf(connection.vendor == "sqlite", "SQLite не поддерживает параллельную запись из потоков")
+class ConcurrentPlaceOrderTests(TransactionTestCase):
+    threads = 20
+    attempts_per_thread = 5
+
+    def test_no_overselling_under_concurrency(self):
+        stock = 37
+        product = make_product("Дефицитная ручка", stock=stock)
+        customer = get_user_model().objects.create_user("client", password="x")
+        placed, rejected, errors = [], [], []
+        start = threading.Barrier(self.threads)
+
+        def worker():
+            try:
+                start.wait()
+                for _ in range(self.attempts_per_thread):
+                    try:
+                        place_order(customer, [(product.pk, 1)])
+                        placed.append(1)
+                    except InsufficientStock:
+                        rejected.append(1)
+            except Exception as exc:  # noqa: BLE001 - ошибка из потока проверяется ниже
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        product.refresh_from_db()
+        self.assertEqual(len(placed), stock)
+        self.assertEqual(len(rejected), self.threads * self.attempts_per_thread - stock)
+        self.assertEqual(product.stock_quantity, 0)
+        self.assertEqual(OrderItem.objects.filter(product=product).count(), stock)
@@ -0,0 +1,106 @@
+import base64
+import json
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from shop.models import Product, UserRole
+from shop.pagination import (
+    PRODUCT_ORDERINGS,
+    InvalidCursor,
+    KeysetPaginator,
+    decode_cursor,
+    encode_cursor,
+)
+from shop.synthetic import seed_shop
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_shop(products=23, orders=0, customers=1)
+        # много одинаковых значений сортировки: порядок внутри них задаёт id
+        for index, pk in enumerate(Product.objects.order_by("pk").values_list("pk", flat=True)):
+            Product.objects.filter(pk=pk).update(
+                name=f"Товар {index % 4}", stock_quantity=index % 3, price=10 + index % 2
+            )
+
+    def paginator(self, ordering, per_page: int = 5) -> KeysetPaginator:
+        return KeysetPaginator(Product.objects.all(), ordering, per_page=per_page)
+
+    def test_cursor_round_trip(self):
+        values = ["Бумага «Снегурочка»", "12.50", 7]
+        self.assertEqual(decode_cursor(encode_cursor(values), 3), (values, False))
+        self.assertEqual(decode_cursor(encode_cursor(values, reverse=True), 3), (values, True))
+
+    def test_forward_and_backward_walks_cover_every_row_once(self):
+        for key, ordering in PRODUCT_ORDERINGS.items():
+            if key == "relevance":
+                continue
+            with self.subTest(ordering=ordering):
+                expected = list(Product.objects.order_by(*ordering).values_list("pk", flat=True))
+                paginator = self.paginator(ordering)
+
+                pages = [paginator.get_page(None)]
+                while pages[-1].has_next:
+                    pages.append(paginator.get_page(pages[-1].next_cursor))
+                self.assertEqual([p.pk for page in pages for p in page], expected)
+                self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+                self.assertFalse(pages[0].has_previous)
+
+                # назад от последней страницы — те же страницы в обратном порядке
+                backward = [pages[-1]]
+                while backward[-1].has_previous:
+                    backward.append(paginator.get_page(backward[-1].previous_cursor))
+                self.assertEqual(
+                    [[p.pk for p in page] for page in reversed(backward)],
+                    [[p.pk for p in page] for page in pages],
+                )
+                # со страницы, открытой «назад», снова можно идти вперёд
+                self.assertEqual(
+                    [p.pk for p in paginator.get_page(backward[1].next_cursor)],
+                    [p.pk for p in pages[-1]],
+                )
+
+    def test_invalid_cursors_are_rejected(self):
+        paginator = self.paginator(("stock_quantity", "id"))
+        cursors = [
+            "не base64",
+            "!!!",
+            base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+            raw_cursor([1, 2]),
+            raw_cursor({"v": [1]}),
+            raw_cursor({"v": [1, 2, 3]}),
+            raw_cursor({"v": "12"}),
+            raw_cursor({"v": ["много", 1]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                paginator.get_page(cursor)
+
+    @skipUnless(connection.vendor == "sqlite", "план запроса проверяется на SQLite")
+    def test_seek_starts_index_range_at_cursor(self):
+        queryset, _, _ = self.paginator(("name", "id"))._page_queryset(encode_cursor(["Товар 2", 5]))
+
+        plan = queryset.explain()
+
+        # индекс читается с позиции курсора и уже в нужном порядке:
+        # без полного обхода и без отдельной сортировки
+        self.assertIn("SEARCH shop_product USING INDEX product_name_id_idx (name>?)", plan)
+        self.assertNotIn("SCAN", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_list_view_falls_back_to_first_page(self):
+        self.client.force_login(self.data.users[UserRole.CLIENT])
+
+        first = self.client.get(reverse("shop:product_list"))
+        response = self.client.get(reverse("shop:product_list"), {"cursor": raw_cursor({"v": "x"})})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["products"]), list(first.context["products"]))
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from shop.models import Product, Supplier, UserProfile, UserRole
+from shop.tests.test_order_placement import make_product
+
+
+class ProductListFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.manager = User.objects.create_user("manager", password="x")
+        UserProfile.objects.create(user=cls.manager, full_name="Менеджер", role=UserRole.MANAGER)
+        cls.client_user = User.objects.create_user("client", password="x")
+
+        # итоговые цены: 100, 150, 18, 200
+        cls.album = make_product("Альбом", stock=5, price="100.00")
+        cls.paper = make_product("Бумага", stock=0, price="300.00", discount=50)
+        cls.pencil = make_product("Карандаш", stock=30, price="20.00", discount=10)
+        cls.whatman = make_product("Ватман", stock=5, price="200.00")
+        cls.other_supplier = Supplier.objects.create(name="КанцОпт")
+        Product.objects.filter(pk=cls.whatman.pk).update(supplier=cls.other_supplier)
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def names(self, **params) -> list[str]:
+        response = self.client.get(reverse("shop:product_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [product.name for product in response.context["products"]]
+
+    def test_price_range_uses_final_price(self):
+        # «Бумага» стоит 300, но со скидкой 50% — 150
+        self.assertEqual(self.names(price_min="50", price_max="160"), ["Альбом", "Бумага"])
+        self.assertEqual(self.names(price_min="18,00", price_max="18"), ["Карандаш"])
+        self.assertEqual(self.names(price_max="99.99"), ["Карандаш"])
+
+    def test_invalid_prices_are_ignored(self):
+        everything = ["Альбом", "Бумага", "Ватман", "Карандаш"]
+        for value in ("abc", "-5", "NaN", "Infinity", "²"):
+            with self.subTest(value=value):
+                self.assertEqual(self.names(price_min=value, price_max=value), everything)
+
+    def test_discounted_and_supplier(self):
+        self.assertEqual(self.names(discounted="1"), ["Бумага", "Карандаш"])
+        self.assertEqual(self.names(supplier=self.other_supplier.pk), ["Ватман"])
+        self.assertEqual(self.names(supplier=self.other_supplier.pk, discounted="1"), [])
+        for value in ("²", "x", str(2**63)):
+            with self.subTest(supplier=value):
+                self.assertEqual(self.names(supplier=value), [])
+
+    def test_orderings(self):
+        cases = {
+            "": ["Альбом", "Бумага", "Ватман", "Карандаш"],
+            # равные остатки — по id
+            "stock_asc": ["Бумага", "Альбом", "Ватман", "Карандаш"],
+            "stock_desc": ["Карандаш", "Ватман", "Альбом", "Бумага"],
+            "price_asc": ["Карандаш", "Альбом", "Бумага", "Ватман"],
+            "price_desc": ["Ватман", "Бумага", "Альбом", "Карандаш"],
+            # без поиска релевантности нет: порядок по наименованию
+            "relevance": ["Альбом", "Бумага", "Ватман", "Карандаш"],
+            "unknown": ["Альбом", "Бумага", "Ватман", "Карандаш"],
+        }
+        for ordering, expected in cases.items():
+            with self.subTest(ordering=ordering):
+                self.assertEqual(self.names(ordering=ordering), expected)
+
+    def test_relevance_puts_name_matches_first(self):
+        # «ага» есть в названии «Бумага» и в категории «Бумага» у всех товаров
+        names = self.names(search="ага", ordering="relevance")
+
+        self.assertEqual(names[0], "Бумага")
+        self.assertEqual(sorted(names[1:]), ["Альбом", "Ватман", "Карандаш"])
+
+    def test_client_cannot_filter(self):
+        self.client.force_login(self.client_user)
+
+        self.assertEqual(
+            self.names(discounted="1", ordering="price_desc", supplier="²"),
+            ["Альбом", "Бумага", "Ватман", "Карандаш"],
+        )
@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from shop import urls as shop_urls
+from shop.admin import admin
+from shop.models import Order, Product, UserRole
+from shop.synthetic import seed_shop
+
+ROLES = [UserRole.GUEST, UserRole.CLIENT, UserRole.MANAGER, UserRole.ADMIN]
+
+# число SQL-запросов на страницу по ролям: (гость, клиент, менеджер, администратор);
+# не зависит от объёма данных, превышение — признак N+1
+VIEW_BUDGETS = {
+    "login": (0, 2, 2, 2),
+    "logout": (0, 4, 4, 4),
+    "product_list_guest": (2, 4, 4, 4),
+    "product_list": (0, 4, 5, 5),
+    "product_export": (0, 2, 3, 3),
+    "product_create": (0, 2, 2, 5),
+    "product_update": (0, 2, 2, 6),
+    "product_delete": (0, 2, 2, 4),
+    "product_bulk_update": (0, 2, 2, 5),
+    "order_list": (0, 2, 4, 4),
+    "order_place": (0, 8, 8, 8),
+    "order_export": (0, 2, 3, 3),
+    "inventory": (0, 2, 5, 5),
+    "api_product_list": (1, 3, 3, 3),
+    "api_product_detail": (1, 3, 3, 3),
+    "api_inventory": (0, 2, 5, 5),
+    "stats": (0, 2, 2, 2),
+}
+
+# представления с параметром pk в URL
+DETAIL_VIEWS = {"product_update", "product_delete", "api_product_detail"}
+
+ADMIN_CHANGELIST_BUDGETS = {
+    "category": (0, 2, 2, 5),
+    "manufacturer": (0, 2, 2, 5),
+    "supplier": (0, 2, 2, 5),
+    "product": (0, 2, 2, 7),
+    "userprofile": (0, 2, 2, 5),
+    "order": (0, 2, 2, 4),
+    "job": (0, 2, 2, 6),
+}
+
+# страница заказа: товары выбираются автодополнением, поэтому число запросов
+# не зависит от размера каталога; виджет каждой позиции читает подпись
+# выбранного товара отдельным запросом
+ORDER_CHANGE_BUDGET = 5
+ORDER_CHANGE_BUDGET_PER_ITEM = 1
+
+
+class QueryBudgetMixin:
+    products = 20
+    orders = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_shop(products=cls.products, orders=cls.orders, customers=10)
+        cls.product = Product.objects.order_by("pk").first()
+
+    def login(self, role: str) -> None:
+        self.client.logout()
+        if role != UserRole.GUEST:
+            self.client.force_login(self.data.users[role])
+
+    def request_view(self, name: str):
+        kwargs = {"pk": self.product.pk} if name in DETAIL_VIEWS else {}
+        url = reverse(f"shop:{name}", kwargs=kwargs)
+        if name == "order_place":
+            return self.client.post(
+                url,
+                {"items": [{"product": self.product.pk, "quantity": 1}]},
+                content_type="application/json",
+            )
+        response = self.client.get(url)
+        if response.streaming:
+            # выгрузки читают БД, пока отдаётся тело ответа
+            b"".join(response.streaming_content)
+        return response
+
+    def assert_budget(self, budget: int, request) -> None:
+        # холодный кэш: считаются запросы без кэша строк и страниц
+        cache.clear()
+        with self.assertNumQueries(budget):
+            request()
+
+    def test_every_view_has_a_budget(self):
+        names = {pattern.name for pattern in shop_urls.urlpatterns}
+        self.assertEqual(names, set(VIEW_BUDGETS))
+
+    def test_every_admin_changelist_has_a_budget(self):
+        models = {
+            model._meta.model_name for model in admin.site._registry if model._meta.app_label == "shop"
+        }
+        self.assertEqual(models, set(ADMIN_CHANGELIST_BUDGETS))
+
+    def test_view_budgets(self):
+        for name, budgets in VIEW_BUDGETS.items():
+            for role, budget in zip(ROLES, budgets):
+                with self.subTest(view=name, role=role):
+                    self.login(role)
+                    self.assert_budget(budget, lambda: self.request_view(name))
+
+    def test_admin_changelist_budgets(self):
+        for model_name, budgets in ADMIN_CHANGELIST_BUDGETS.items():
+            url = reverse(f"admin:shop_{model_name}_changelist")
+            for role, budget in zip(ROLES, budgets):
+                with self.subTest(changelist=model_name, role=role):
+                    self.login(role)
+                    self.assert_budget(budget, lambda: self.client.get(url))
+
+    def test_admin_order_change_budget(self):
+        order = Order.objects.filter(items__isnull=False).order_by("pk").first()
+        url = reverse("admin:shop_order_change", args=[order.pk])
+        self.login(UserRole.ADMIN)
+        # ContentType кэшируется на весь процесс: прогрев, чтобы результат
+        # не зависел от порядка тестов
+        self.client.get(url)
+        budget = ORDER_CHANGE_BUDGET + ORDER_CHANGE_BUDGET_PER_ITEM * order.items.count()
+        self.assert_budget(budget, lambda: self.client.get(url))
+
+
+class SmallCatalogueQueryBudgetTests(QueryBudgetMixin, TestCase):
+    products = 20
+    orders = 10
+
+
+class LargeCatalogueQueryBudgetTests(QueryBudgetMixin, TestCase):
+    products = 3000
+    orders = 1500
@@ -0,0 +1,44 @@
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from shop.models import Category, Manufacturer, Order, OrderItem, Product, Supplier
+from shop.orders import filter_by_created_date, filter_by_product
+
+
+@skipUnless(connection.vendor == "postgresql", "планы запросов проверяются на PostgreSQL")
+class OrderFilterQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = get_user_model().objects.create_user("client", password="x")
+        product = Product.objects.create(
+            name="Ручка",
+            category=Category.objects.create(name="Письменные принадлежности"),
+            manufacturer=Manufacturer.objects.create(name="ErichKrause"),
+            supplier=Supplier.objects.create(name="ОфисМир"),
+            price=Decimal("25.00"),
+        )
+        cls.product = product
+        order = Order.objects.create(customer=cls.customer)
+        OrderItem.objects.create(order=order, product=product, quantity=1, price_at_order=product.price)
+
+    def explain(self, queryset) -> str:
+        # на нескольких строках планировщик предпочтёт seq scan,
+        # поэтому запрещаем его и проверяем, что подходящий индекс есть
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_customer_month_uses_customer_created_index(self):
+        queryset = filter_by_created_date(
+            Order.objects.filter(customer=self.customer), date(2025, 4, 1), date(2025, 4, 30)
+        )
+        self.assertIn("order_customer_created_idx", self.explain(queryset))
+
+    def test_product_filter_uses_product_order_index(self):
+        queryset = filter_by_product(Order.objects.all(), self.product.pk)
+        self.assertIn("orderitem_product_order_idx", self.explain(queryset))
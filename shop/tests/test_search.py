@@ -0,0 +1,73 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from shop.models import Category, Product
+from shop.search import search_products
+from shop.synthetic import seed_shop
+
+
+def icontains_chain(term: str):
+    # поиск до появления search_document: OR из icontains по каждому полю
+    return Product.objects.filter(
+        Q(name__icontains=term)
+        | Q(description__icontains=term)
+        | Q(category__name__icontains=term)
+        | Q(manufacturer__name__icontains=term)
+        | Q(supplier__name__icontains=term)
+    )
+
+
+class SearchEquivalenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_shop(products=60, orders=0, customers=1)
+        product = Product.objects.order_by("pk").first()
+        product.name = "Ручка Parker 50% «синяя»"
+        product.description = 'Корпус "Jotter"'
+        product.save()
+
+    def assert_same_matches(self, term: str):
+        found = set(search_products(Product.objects.all(), term).values_list("pk", flat=True))
+        expected = set(icontains_chain(term.strip()).values_list("pk", flat=True))
+        self.assertEqual(found, expected, term)
+        return found
+
+    def test_matches_icontains_chain(self):
+        # SQLite сравнивает без учёта регистра только латиницу, поэтому
+        # кириллические запросы даны в том регистре, в каком они в тексте
+        terms = [
+            "овар 1", "писание товара 2", "атегория", "оставщик 2", "роизводитель",
+            "PARKER", "parker", "50%", '"jotter"', "«синяя»", "12", "5", " ар 3 ",
+            "нет такого", "r 5",
+        ]
+        for term in terms:
+            with self.subTest(term=term):
+                self.assert_same_matches(term)
+        self.assertTrue(self.assert_same_matches("PARKER"))
+
+    def test_sees_writes_without_process_state(self):
+        product = Product.objects.order_by("pk").last()
+        product.name = "Степлер двухсторонний"
+        product.save()
+        self.assertEqual(self.assert_same_matches("двухсторон"), {product.pk})
+
+        category = Category.objects.get(pk=product.category_id)
+        category.name = "Канцтовары особые"
+        category.save()
+        self.assertIn(product.pk, self.assert_same_matches("овары особ"))
+
+        product.delete()
+        self.assertEqual(self.assert_same_matches("двухсторон"), set())
+
+    @skipUnless(connection.vendor == "sqlite", "триграммная таблица FTS5 есть только в SQLite")
+    def test_filters_with_subquery(self):
+        # совпадения не выгружаются списком id в параметры запроса
+        with CaptureQueriesContext(connection) as queries:
+            found = list(search_products(Product.objects.all(), "овар"))
+        self.assertEqual(len(found), icontains_chain("овар").count())
+        self.assertEqual(len(queries), 1)
+        self.assertIn("SELECT rowid FROM shop_product_search", queries[0]["sql"])
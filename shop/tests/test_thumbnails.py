@@ -0,0 +1,108 @@
+import io
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from shop.models import Job, Product
+from shop.tests.test_order_placement import make_product
+from shop.thumbnails import THUMBNAIL_SIZES, generate_variants, render_variants, without_variants
+
+
+def image_bytes(mode: str = "RGBA", size=(1200, 900), fmt: str = "PNG") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 40, 40, 128) if mode == "RGBA" else (200, 40, 40)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class RenderVariantsTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_creates_sized_webp_and_jpeg_with_content_hash(self):
+        name = default_storage.save("products/photo.png", ContentFile(image_bytes()))
+
+        variants = render_variants(name)
+
+        self.assertEqual(len(variants), len(THUMBNAIL_SIZES) * 2)
+        for size in THUMBNAIL_SIZES:
+            for fmt in ("webp", "jpeg"):
+                with default_storage.open(variants[f"{fmt}_{size}"]) as handle, Image.open(handle) as image:
+                    self.assertEqual(image.format, fmt.upper())
+                    self.assertEqual(max(image.size), size)
+        # одинаковое содержимое — те же имена, файлы не пересоздаются
+        self.assertEqual(render_variants(name), variants)
+
+    def test_missing_or_broken_file(self):
+        self.assertIsNone(render_variants("products/absent.jpg"))
+        name = default_storage.save("products/broken.jpg", ContentFile(b"not an image"))
+        self.assertIsNone(render_variants(name))
+
+
+class ProductImageChangeTests(TestCase):
+    def setUp(self):
+        self.product = make_product("Ручка", stock=1)
+        Product.objects.filter(pk=self.product.pk).update(
+            image="products/old.jpg",
+            image_variants={"webp_80": "products/thumbs/old-80.abc.webp"},
+            image_variants_source="products/old.jpg",
+        )
+        self.product.refresh_from_db()
+
+    def test_new_photo_drops_variants_and_schedules_jobs(self):
+        # как при сохранении из админки или shell, без формы магазина
+        self.product.image = "products/new.jpg"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.image_variants, {})
+        self.assertIsNone(self.product.thumbnail)
+        jobs = {job.name: job.payload for job in Job.objects.all()}
+        self.assertEqual(jobs["product_thumbnails"], {"product_id": self.product.pk})
+        self.assertEqual(
+            jobs["delete_replaced_image"],
+            {"name": "products/old.jpg", "variants": {"webp_80": "products/thumbs/old-80.abc.webp"}},
+        )
+
+    def test_other_changes_keep_variants(self):
+        self.product.price = Decimal("12.00")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.image_variants, {"webp_80": "products/thumbs/old-80.abc.webp"})
+        self.assertFalse(Job.objects.exists())
+
+
+class GenerateVariantsTests(TestCase):
+    def test_missing_file_is_not_retried(self):
+        product = make_product("Ручка", stock=1)
+        Product.objects.filter(pk=product.pk).update(image="products/absent.jpg")
+
+        self.assertEqual(generate_variants(without_variants(Product.objects.all())), (1, 1))
+        self.assertEqual(generate_variants(without_variants(Product.objects.all())), (0, 0))
+
+        # новое фото обрабатывается снова
+        Product.objects.filter(pk=product.pk).update(image="products/other.jpg")
+        self.assertEqual(generate_variants(without_variants(Product.objects.all())), (1, 1))
+
+    def test_workers_keep_open_transaction(self):
+        product = make_product("Ручка", stock=1)
+        Product.objects.filter(pk=product.pk).update(image="products/absent.jpg")
+
+        # TestCase выполняет тест внутри transaction.atomic
+        with mock.patch.object(connection, "close") as close:
+            self.assertEqual(generate_variants(Product.objects.all(), workers=2), (1, 1))
+
+        close.assert_not_called()
+        self.assertFalse(connection.needs_rollback)
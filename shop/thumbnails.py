@@ -0,0 +1,171 @@
+import hashlib
+import io
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import django
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .caching import bump_product_versions
+from .importing import close_idle_connections
+from .models import Product
+
+THUMBNAIL_DIR = "products/thumbs"
+# 1x и 2x для ячейки 80×80 в таблице каталога
+THUMBNAIL_SIZES = (80, 160)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+def variant_key(fmt: str, size: int) -> str:
+    return f"{fmt}_{size}"
+
+
+def variant_name(source: str, digest: str, size: int, fmt: str) -> str:
+    # хэш содержимого в имени: файл по этому адресу никогда не меняется,
+    # поэтому его можно отдавать с долгим сроком кэширования
+    return f"{THUMBNAIL_DIR}/{Path(source).stem[:50]}-{size}.{digest}.{fmt}"
+
+
+def _prepare(image: Image.Image, fmt: str) -> Image.Image:
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    if image.mode not in ("RGB", "RGBA"):
+        return image.convert("RGBA")
+    return image
+
+
+def render_variants(name: str) -> dict[str, str] | None:
+    """
+    Уменьшенные копии фото во всех размерах и форматах.
+    Возвращает {"webp_80": путь, ...} или None, если файла нет или это не изображение.
+    """
+    if not name or not default_storage.exists(name):
+        return None
+    with default_storage.open(name, "rb") as handle:
+        data = handle.read()
+    digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+
+    targets = {
+        variant_key(fmt, size): variant_name(name, digest, size, fmt)
+        for size in THUMBNAIL_SIZES
+        for fmt in THUMBNAIL_FORMATS
+    }
+    pending = {key: path for key, path in targets.items() if not default_storage.exists(path)}
+    if not pending:
+        return targets
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEG декодируется сразу в уменьшенном масштабе
+            image.draft("RGB", (max(THUMBNAIL_SIZES) * 2,) * 2)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (UnidentifiedImageError, OSError):
+        return None
+
+    for size in THUMBNAIL_SIZES:
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+        for fmt, (pil_format, params) in THUMBNAIL_FORMATS.items():
+            key = variant_key(fmt, size)
+            if key not in pending:
+                continue
+            buffer = io.BytesIO()
+            _prepare(thumbnail, pil_format).save(buffer, pil_format, **params)
+            # при гонке двух процессов хранилище выберет другое имя — берём его
+            targets[key] = default_storage.save(pending[key], ContentFile(buffer.getvalue()))
+    return targets
+
+
+def thumbnail_sources(variants: dict) -> dict | None:
+    if not variants:
+        return None
+    url = default_storage.url
+
+    def srcset(fmt: str) -> str:
+        return ", ".join(
+            f"{url(variants[variant_key(fmt, size)])} {size // THUMBNAIL_SIZES[0]}x"
+            for size in THUMBNAIL_SIZES
+        )
+
+    return {
+        "src": url(variants[variant_key("jpeg", THUMBNAIL_SIZES[0])]),
+        "jpeg": srcset("jpeg"),
+        "webp": srcset("webp"),
+    }
+
+
+def delete_variants(variants: dict, source: str, exclude_pk: int | None = None) -> None:
+    # имя копии определяется именем и содержимым исходного файла, поэтому
+    # копии общие у товаров с одним и тем же фото
+    if not variants:
+        return
+    if Product.objects.filter(image=source).exclude(pk=exclude_pk).exists():
+        return
+    for path in set(variants.values()):
+        default_storage.delete(path)
+
+
+def without_variants(queryset):
+    """Товары, для текущего фото которых копии ещё не создавались."""
+    return queryset.exclude(image_variants_source=F("image"))
+
+
+def refresh_product_variants(product: Product) -> None:
+    variants = render_variants(product.image.name) if product.image else None
+    product.image_variants = variants or {}
+    product.image_variants_source = product.image.name or ""
+    Product.objects.filter(pk=product.pk).update(
+        image_variants=product.image_variants, image_variants_source=product.image_variants_source
+    )
+    # update() не посылает post_save, строку каталога нужно перерисовать
+    bump_product_versions([product.pk])
+
+
+def generate_variants(queryset, workers: int = 1, batch_size: int = 100) -> tuple[int, int]:
+    """
+    Создаёт копии для всех товаров ``queryset`` с фото.
+    Возвращает (обработано, без файла).
+    """
+    rows = queryset.exclude(image="").exclude(image__isnull=True).values_list("pk", "image")
+    processed = missing = 0
+    pool = None
+    if workers > 1:
+        close_idle_connections()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
+    try:
+        last_pk = 0
+        while True:
+            # постранично по pk: запись в БД не мешает чтению следующей пачки
+            batch = list(rows.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            names = [name for _, name in batch]
+            if pool is None:
+                results = map(render_variants, names)
+            else:
+                results = pool.map(render_variants, names, chunksize=max(1, len(names) // workers))
+            # источник запоминается и при неудаче: отсутствующий файл не
+            # обрабатывается повторно, пока у товара не сменится фото
+            updated = [
+                Product(pk=pk, image_variants=variants or {}, image_variants_source=name)
+                for (pk, name), variants in zip(batch, results)
+            ]
+            Product.objects.bulk_update(updated, ["image_variants", "image_variants_source"])
+            bump_product_versions([product.pk for product in updated])
+            processed += len(updated)
+            missing += sum(1 for product in updated if not product.image_variants)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return processed, missing
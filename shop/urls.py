@@ -1,18 +1,32 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, instrumentation, views
 
 app_name = "shop"
 
+# под ASGI каталог и список API обслуживают async-представления
+if settings.SHOP_ASYNC_VIEWS:
+    catalogue, product_list_api = async_views, async_views.product_list_api
+else:
+    catalogue, product_list_api = views, api.product_list_api
+
 urlpatterns = [
     path("", views.login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
-    path("products/guest/", views.product_list_guest, name="product_list_guest"),
-    path("products/", views.product_list, name="product_list"),
+    path("products/guest/", catalogue.product_list_guest, name="product_list_guest"),
+    path("products/", catalogue.product_list, name="product_list"),
+    path("products/export/", views.product_export, name="product_export"),
     path("products/add/", views.product_create, name="product_create"),
+    path("products/bulk/", views.product_bulk_update, name="product_bulk_update"),
     path("products/<int:pk>/edit/", views.product_update, name="product_update"),
     path("products/<int:pk>/delete/", views.product_delete, name="product_delete"),
     path("orders/", views.order_list, name="order_list"),
+    path("orders/place/", views.order_place, name="order_place"),
+    path("orders/export/", views.order_export, name="order_export"),
+    path("inventory/", views.inventory, name="inventory"),
+    path("api/products/", product_list_api, name="api_product_list"),
+    path("api/products/<int:pk>/", api.product_detail_api, name="api_product_detail"),
+    path("api/inventory/", views.inventory_api, name="api_inventory"),
+    path("internal/stats/", instrumentation.stats_view, name="stats"),
 ]
-
-
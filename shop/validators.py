@@ -0,0 +1,25 @@
+"""
+Проверки значений товара: общие для формы товара и массовых операций (shop.bulk).
+"""
+
+from django.core.exceptions import ValidationError
+
+
+def validate_price(price):
+    if price < 0:
+        raise ValidationError("Цена не может быть отрицательной.")
+    return price
+
+
+def validate_stock_quantity(quantity):
+    if quantity < 0:
+        raise ValidationError("Количество на складе не может быть отрицательным.")
+    return quantity
+
+
+def validate_discount_percent(discount):
+    if discount < 0:
+        raise ValidationError("Скидка не может быть отрицательной.")
+    if discount > 100:
+        raise ValidationError("Скидка не может превышать 100%.")
+    return discount
@@ -1,22 +1,90 @@
+import json
+from decimal import Decimal, InvalidOperation
+
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import AnonymousUser
-from django.db.models import Q
-from django.http import HttpRequest, HttpResponse
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
-from .forms import LoginForm, ProductForm
-from .models import Order, Product, Supplier, UserProfile, UserRole
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_POST
+
+from .analytics import inventory_report, request_refresh_if_stale
+from .bulk import apply_bulk_update
+from .caching import (
+    GUEST_PAGE_TIMEOUT,
+    CatalogueState,
+    catalogue_state,
+    guest_page_etag,
+    guest_page_key,
+    render_product_rows,
+)
+from .exports import ORDER_HEADERS, export_response, order_rows, product_rows
+from .forms import BulkProductUpdateForm, LoginForm, ProductForm
+from .importing import IMPORT_HEADERS
+from .models import Order, OrderItem, Product, Supplier, UserProfile, UserRole
+from .orders import (
+    InsufficientStock,
+    InvalidBasket,
+    annotate_totals,
+    filter_by_created_date,
+    filter_by_product,
+    parse_date,
+    parse_id,
+    place_order,
+    resolve_customer_id,
+    resolve_product_id,
+)
+from .pagination import PRODUCT_ORDERINGS, InvalidCursor, KeysetPaginator
+from .search import search_products
+
+ORDERS_PER_PAGE = 25
+ORDER_ORDERING = ("-created_at", "-id")
+
+
+def _get_user_profile(user) -> UserProfile | None:
+    # профиль приходит вместе с пользователем (shop.backends.ProfileModelBackend)
+    if isinstance(user, AnonymousUser):
+        return None
+    try:
+        return user.profile
+    except UserProfile.DoesNotExist:
+        return None
 
 
 def _get_user_role(user) -> str:
     if isinstance(user, AnonymousUser):
         return UserRole.GUEST
+    profile = _get_user_profile(user)
+    return profile.role if profile else UserRole.CLIENT
+
+
+def _get_user_full_name(user) -> str:
+    profile = _get_user_profile(user)
+    return profile.full_name if profile else user.get_username()
+
+
+def _parse_price(value: str | None) -> Decimal | None:
+    if not value:
+        return None
     try:
-        return user.profile.role
-    except UserProfile.DoesNotExist:
-        return UserRole.CLIENT
+        price = Decimal(value.strip().replace(",", "."))
+    except InvalidOperation:
+        return None
+    return price if price.is_finite() and price >= 0 else None
+
+
+def _paginate_products(request: HttpRequest, products, ordering: str = ""):
+    paginator = KeysetPaginator(products, PRODUCT_ORDERINGS.get(ordering, PRODUCT_ORDERINGS[""]))
+    try:
+        return paginator.get_page(request.GET.get("cursor"))
+    except InvalidCursor:
+        # устаревший или испорченный курсор — показываем первую страницу
+        return paginator.get_page(None)
 
 
 def login_view(request: HttpRequest) -> HttpResponse:
@@ -43,19 +111,89 @@ def logout_view(request: HttpRequest) -> HttpResponse:
     return redirect("shop:login")
 
 
+def _is_shared_guest_request(request: HttpRequest) -> bool:
+    # страница одинакова для всех только у анонимного посетителя без
+    # непоказанных сообщений: иначе в шапке есть кнопка выхода или уведомления
+    return not request.user.is_authenticated and not len(messages.get_messages(request))
+
+
+def _catalogue_state(request: HttpRequest) -> CatalogueState:
+    # ETag, Last-Modified, ключ страницы и строки читают одно состояние
+    # каталога: один запрос к БД на запрос к странице
+    if not hasattr(request, "catalogue_state"):
+        request.catalogue_state = catalogue_state()
+    return request.catalogue_state
+
+
+def _guest_catalogue_etag(request: HttpRequest) -> str | None:
+    if not _is_shared_guest_request(request):
+        return None
+    return guest_page_etag(request.get_full_path(), _catalogue_state(request).modified)
+
+
+def _guest_catalogue_last_modified(request: HttpRequest):
+    if not _is_shared_guest_request(request):
+        return None
+    return _catalogue_state(request).modified
+
+
+@condition(etag_func=_guest_catalogue_etag, last_modified_func=_guest_catalogue_last_modified)
 def product_list_guest(request: HttpRequest) -> HttpResponse:
+    shared = _is_shared_guest_request(request)
+    if shared:
+        # ключ включает отметку изменения каталога: после любой правки
+        # товаров или справочников страница рендерится заново
+        page_key = guest_page_key(request.get_full_path(), _catalogue_state(request).modified)
+        content = cache.get(page_key)
+        if content is not None:
+            response = HttpResponse(content)
+            patch_cache_control(response, max_age=0, must_revalidate=True)
+            return response
+
     products = Product.objects.select_related(
         "category",
         "manufacturer",
         "supplier",
     ).all()
+    page = _paginate_products(request, products)
     context = {
-        "products": products,
+        "products": page,
+        "product_rows": render_product_rows(page, UserRole.GUEST, _catalogue_state(request).version),
         "role": UserRole.GUEST,
         "user_full_name": "Гость",
         "show_filters": False,
     }
-    return render(request, "shop/product_list.html", context)
+    response = render(request, "shop/product_list.html", context)
+    if shared:
+        cache.set(page_key, response.content, GUEST_PAGE_TIMEOUT)
+        patch_cache_control(response, max_age=0, must_revalidate=True)
+    return response
+
+
+def _filter_products(request: HttpRequest, products) -> tuple:
+    # фильтры и сортировка каталога, доступные менеджеру и администратору
+    supplier_filter = request.GET.get("supplier")
+    ordering = request.GET.get("ordering") or ""
+    search = (request.GET.get("search") or "").strip()
+
+    if supplier_filter:
+        supplier_id = parse_id(supplier_filter)
+        products = products.filter(supplier_id=supplier_id) if supplier_id else products.none()
+
+    price_min = _parse_price(request.GET.get("price_min"))
+    if price_min is not None:
+        products = products.filter(final_price__gte=price_min)
+    price_max = _parse_price(request.GET.get("price_max"))
+    if price_max is not None:
+        products = products.filter(final_price__lte=price_max)
+    if request.GET.get("discounted"):
+        products = products.filter(discount_percent__gt=0)
+
+    if search:
+        products = search_products(products, search)
+    elif ordering == "relevance":
+        ordering = ""
+    return products, ordering
 
 
 @login_required
@@ -70,43 +208,41 @@ def product_list(request: HttpRequest) -> HttpResponse:
     show_filters = role in (UserRole.MANAGER, UserRole.ADMIN)
 
     suppliers = None
+    ordering = ""
     if show_filters:
         suppliers = Supplier.objects.all().order_by("name")
-        supplier_id = request.GET.get("supplier")
-        ordering = request.GET.get("ordering")
-        search = request.GET.get("search")
-
-        if supplier_id:
-            products = products.filter(supplier_id=supplier_id)
-
-        if search:
-            products = products.filter(
-                Q(name__icontains=search)
-                | Q(description__icontains=search)
-                | Q(category__name__icontains=search)
-                | Q(manufacturer__name__icontains=search)
-                | Q(supplier__name__icontains=search)
-            )
-
-        if ordering == "stock_asc":
-            products = products.order_by("stock_quantity")
-        elif ordering == "stock_desc":
-            products = products.order_by("-stock_quantity")
+        products, ordering = _filter_products(request, products)
 
+    page = _paginate_products(request, products, ordering)
     context = {
-        "products": products,
+        "products": page,
+        "product_rows": render_product_rows(page, role),
         "role": role,
-        "user_full_name": getattr(
-            getattr(request.user, "profile", None),
-            "full_name",
-            request.user.get_username(),
-        ),
+        "user_full_name": _get_user_full_name(request.user),
         "show_filters": show_filters,
         "suppliers": suppliers,
     }
     return render(request, "shop/product_list.html", context)
 
 
+@login_required
+def product_export(request: HttpRequest) -> HttpResponse:
+    if _get_user_role(request.user) not in (UserRole.MANAGER, UserRole.ADMIN):
+        messages.error(request, "У вас нет прав для выгрузки каталога.")
+        return redirect("shop:product_list")
+
+    products, ordering = _filter_products(request, Product.objects.all())
+    products = products.order_by(*PRODUCT_ORDERINGS.get(ordering, PRODUCT_ORDERINGS[""]))
+    return export_response(
+        request,
+        request.GET.get("format", "csv"),
+        "products",
+        IMPORT_HEADERS,
+        product_rows(products),
+        sheet_name="Product",
+    )
+
+
 def _require_admin(request: HttpRequest) -> str | None:
     role = _get_user_role(request.user)
     if role != UserRole.ADMIN:
@@ -146,19 +282,12 @@ def product_update(request: HttpRequest, pk: int) -> HttpResponse:
         return redirect(redirect_name)
 
     product = get_object_or_404(Product, pk=pk)
-    old_image = product.image.path if product.image else None
 
     if request.method == "POST":
         form = ProductForm(request.POST, request.FILES, instance=product)
         if form.is_valid():
+            # копии нового фото и удаление заменённого создаются в фоне (shop.signals)
             product = form.save()
-            # удаляем старое фото, если загружено новое
-            if old_image and product.image and product.image.path != old_image:
-                from pathlib import Path
-
-                old_path = Path(old_image)
-                if old_path.exists():
-                    old_path.unlink()
             messages.success(request, "Товар успешно изменён.")
             return redirect("shop:product_list")
     else:
@@ -175,6 +304,37 @@ def product_update(request: HttpRequest, pk: int) -> HttpResponse:
     )
 
 
+@login_required
+def product_bulk_update(request: HttpRequest) -> HttpResponse:
+    redirect_name = _require_admin(request)
+    if redirect_name:
+        return redirect(redirect_name)
+
+    if request.method == "POST":
+        form = BulkProductUpdateForm(request.POST)
+        if form.is_valid():
+            products = form.filter_products(Product.objects.all())
+            try:
+                updated = apply_bulk_update(
+                    products, form.cleaned_data["operation"], form.cleaned_data["value"]
+                )
+            except ValidationError as exc:
+                form.add_error("value", exc)
+            else:
+                messages.success(request, f"Изменено товаров: {updated}.")
+                return redirect("shop:product_list")
+    else:
+        form = BulkProductUpdateForm()
+    return render(
+        request,
+        "shop/product_bulk_form.html",
+        {
+            "form": form,
+            "title": "Массовое изменение товаров",
+        },
+    )
+
+
 @login_required
 def product_delete(request: HttpRequest, pk: int) -> HttpResponse:
     redirect_name = _require_admin(request)
@@ -204,6 +364,23 @@ def product_delete(request: HttpRequest, pk: int) -> HttpResponse:
     )
 
 
+def _filter_orders(request: HttpRequest, orders):
+    orders = filter_by_created_date(
+        orders,
+        parse_date(request.GET.get("date_from")),
+        parse_date(request.GET.get("date_to")),
+    )
+    customer_filter = request.GET.get("customer")
+    if customer_filter:
+        customer_id = resolve_customer_id(customer_filter)
+        orders = orders.filter(customer_id=customer_id) if customer_id else orders.none()
+    product_filter = request.GET.get("product")
+    if product_filter:
+        product_id = resolve_product_id(product_filter)
+        orders = filter_by_product(orders, product_id) if product_id else orders.none()
+    return orders
+
+
 @login_required
 def order_list(request: HttpRequest) -> HttpResponse:
     role = _get_user_role(request.user)
@@ -211,23 +388,120 @@ def order_list(request: HttpRequest) -> HttpResponse:
         messages.error(request, "У вас нет прав для просмотра заказов.")
         return redirect("shop:product_list")
 
+    # позиции подгружаются только для заказов текущей страницы и только
+    # с теми колонками, которые выводит шаблон
+    items = OrderItem.objects.select_related("product").only(
+        "id", "order_id", "quantity", "product__id", "product__name"
+    )
     orders = (
         Order.objects.select_related("customer")
-        .prefetch_related("items__product")
-        .all()
+        .only("id", "created_at", "customer__id", "customer__username")
+        .prefetch_related(Prefetch("items", queryset=items))
     )
+
+    orders = annotate_totals(_filter_orders(request, orders))
+
+    paginator = KeysetPaginator(orders, ORDER_ORDERING, per_page=ORDERS_PER_PAGE)
+    try:
+        page = paginator.get_page(request.GET.get("cursor"))
+    except InvalidCursor:
+        page = paginator.get_page(None)
+
     return render(
         request,
         "shop/order_list.html",
         {
-            "orders": orders,
+            "orders": page,
             "role": role,
-            "user_full_name": getattr(
-                getattr(request.user, "profile", None),
-                "full_name",
-                request.user.get_username(),
-            ),
+            "user_full_name": _get_user_full_name(request.user),
         },
     )
 
 
+@login_required
+def order_export(request: HttpRequest) -> HttpResponse:
+    if _get_user_role(request.user) not in (UserRole.MANAGER, UserRole.ADMIN):
+        messages.error(request, "У вас нет прав для выгрузки заказов.")
+        return redirect("shop:product_list")
+
+    orders = _filter_orders(request, Order.objects.all())
+    return export_response(
+        request,
+        request.GET.get("format", "csv"),
+        "orders",
+        ORDER_HEADERS,
+        order_rows(orders),
+        sheet_name="Заказы",
+    )
+
+
+@require_POST
+def order_place(request: HttpRequest) -> HttpResponse:
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Требуется авторизация."}, status=401)
+
+    try:
+        payload = json.loads(request.body)
+        lines = [(item["product"], item["quantity"]) for item in payload["items"]]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse(
+            {"error": 'Ожидается JSON вида {"items": [{"product": id, "quantity": n}]}.'},
+            status=400,
+        )
+
+    try:
+        order = place_order(request.user, lines)
+    except InsufficientStock as exc:
+        return JsonResponse(
+            {"error": "Недостаточно товара на складе.", "product": exc.product_id},
+            status=409,
+        )
+    except InvalidBasket as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    return JsonResponse(
+        {"order": order.pk, "created_at": order.created_at.isoformat()},
+        status=201,
+    )
+
+
+def _can_view_inventory(user) -> bool:
+    return user.is_authenticated and _get_user_role(user) in (UserRole.MANAGER, UserRole.ADMIN)
+
+
+@login_required
+def inventory(request: HttpRequest) -> HttpResponse:
+    if not _can_view_inventory(request.user):
+        messages.error(request, "У вас нет прав для просмотра аналитики остатков.")
+        return redirect("shop:product_list")
+
+    if request.method == "POST":
+        if request_refresh_if_stale():
+            messages.success(request, "Обновление сводки поставлено в очередь.")
+        return redirect("shop:inventory")
+
+    report = inventory_report()
+    return render(
+        request,
+        "shop/inventory.html",
+        {
+            "report": report,
+            "sections": [
+                ("По категориям", report["categories"]),
+                ("По поставщикам", report["suppliers"]),
+                ("По производителям", report["manufacturers"]),
+            ],
+            "role": _get_user_role(request.user),
+            "user_full_name": _get_user_full_name(request.user),
+        },
+    )
+
+
+def inventory_api(request: HttpRequest) -> HttpResponse:
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Требуется авторизация."}, status=401)
+    if not _can_view_inventory(request.user):
+        return JsonResponse({"error": "Недостаточно прав."}, status=403)
+    if request.method == "POST":
+        return JsonResponse({"refresh_requested": request_refresh_if_stale()}, status=202)
+    return JsonResponse(inventory_report())